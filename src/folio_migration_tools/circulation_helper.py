@@ -1,17 +1,20 @@
 import copy
 import json
 import logging
-import re
 import time
 import i18n
+from typing import Optional
 from typing import Set
 
 import httpx
 from folioclient import FolioClient
 from httpx import HTTPError
 
+from folio_migration_tools import regex_patterns
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.migration_report import MigrationReport
+from folio_migration_tools.rate_limiter import RateLimiter
 from folio_migration_tools.transaction_migration.legacy_loan import LegacyLoan
 from folio_migration_tools.transaction_migration.legacy_request import LegacyRequest
 from folio_migration_tools.transaction_migration.transaction_result import (
@@ -27,8 +30,10 @@ class CirculationHelper:
         folio_client: FolioClient,
         service_point_id,
         migration_report: MigrationReport,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
         self.folio_client = folio_client
+        self.rate_limiter = rate_limiter or RateLimiter()
         self.service_point_id = service_point_id
         self.missing_patron_barcodes: Set[str] = set()
         self.missing_item_barcodes: Set[str] = set()
@@ -145,15 +150,16 @@ class CirculationHelper:
                     f"Item Barcode:{legacy_loan.item_barcode}"
                 )
                 return TransactionResult(False, False, "", error_message, error_message)
-            req = httpx.post(url, headers=self.folio_client.okapi_headers, json=data, timeout=None)
+            req = self.rate_limiter.call(
+                httpx.post, url, headers=self.folio_client.okapi_headers, json=data, timeout=None
+            )
             if req.status_code == 422:
                 error_message_from_folio = json.loads(req.text)["errors"][0]["message"]
                 stat_message = error_message_from_folio
                 error_message = error_message_from_folio
                 if "has the item status" in error_message_from_folio:
-                    stat_message = re.findall(
-                        r"(?<=has the item status\s).*(?=\sand cannot be checked out)",
-                        error_message_from_folio,
+                    stat_message = regex_patterns.ITEM_STATUS_IN_CHECKOUT_ERROR.findall(
+                        error_message_from_folio
                     )[0]
                     error_message = (
                         f"{stat_message} for item with barcode {legacy_loan.item_barcode}"
@@ -243,8 +249,12 @@ class CirculationHelper:
 
     @staticmethod
     def create_request(
-        folio_client: FolioClient, legacy_request: LegacyRequest, migration_report: MigrationReport
+        folio_client: FolioClient,
+        legacy_request: LegacyRequest,
+        migration_report: MigrationReport,
+        rate_limiter: Optional[RateLimiter] = None,
     ):
+        rate_limiter = rate_limiter or RateLimiter()
         try:
             path = "/circulation/httpx"
             url = f"{folio_client.okapi_url}{path}"
@@ -259,7 +269,9 @@ class CirculationHelper:
                     "comment": "Migrated from legacy system",
                 }
             }
-            req = httpx.post(url, headers=folio_client.okapi_headers, json=data, timeout=None)
+            req = rate_limiter.call(
+                httpx.post, url, headers=folio_client.okapi_headers, json=data, timeout=None
+            )
             logging.debug(f"POST {req.status_code}\t{url}\t{json.dumps(data)}")
             if str(req.status_code) == "422":
                 message = json.loads(req.text)["errors"][0]["message"]
@@ -287,8 +299,8 @@ class CirculationHelper:
     def load_migrated_user_barcodes(self, user_barcodes, patron_files, folder_structure):
         if any(patron_files):
             for filedef in patron_files:
-                my_path = folder_structure.results_folder / filedef.file_name
-                with open(my_path) as patron_file:
+                my_path = folder_structure.get_results_file_path(filedef.file_name)
+                with open_results_file(my_path, "rb") as patron_file:
                     for row in patron_file:
                         rec = json.loads(row)
                         user_barcodes.add(rec.get("barcode", "None"))
@@ -297,15 +309,22 @@ class CirculationHelper:
     def load_migrated_item_barcodes(self, item_barcodes, item_files, folder_structure):
         if any(item_files):
             for filedef in item_files:
-                my_path = folder_structure.results_folder / filedef.file_name
-                with open(my_path) as item_file:
+                my_path = folder_structure.get_results_file_path(filedef.file_name)
+                with open_results_file(my_path, "rb") as item_file:
                     for row in item_file:
                         rec = json.loads(row)
                         item_barcodes.add(rec.get("barcode", "None"))
             logging.info("Loaded %s barcodes from items", len(item_barcodes))
 
     @staticmethod
-    def extend_open_loan(folio_client: FolioClient, loan, extension_due_date, extend_out_date):
+    def extend_open_loan(
+        folio_client: FolioClient,
+        loan,
+        extension_due_date,
+        extend_out_date,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        rate_limiter = rate_limiter or RateLimiter()
         try:
             loan_to_put = copy.deepcopy(loan)
             del loan_to_put["metadata"]
@@ -313,8 +332,8 @@ class CirculationHelper:
             loan_to_put["loanDate"] = extend_out_date.isoformat()
             url = f"{folio_client.okapi_url}/circulation/loans/{loan_to_put['id']}"
 
-            req = httpx.put(
-                url, headers=folio_client.okapi_headers, json=loan_to_put, timeout=None
+            req = rate_limiter.call(
+                httpx.put, url, headers=folio_client.okapi_headers, json=loan_to_put, timeout=None
             )
             logging.info(
                 "%s\tPUT Extend loan %s to %s\t %s",
@@ -0,0 +1,84 @@
+import gzip
+import io
+from pathlib import Path
+
+from folio_migration_tools.custom_exceptions import TransformationProcessError
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+
+class ForwardSeekingReader(io.BufferedReader):
+    """Buffered reader for streams that can only be read from start to end.
+
+    Seeking forward reads and discards the data up to the offset, so that a task can
+    resume reading a zstd compressed file where an earlier run stopped.
+    """
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Moves forward to the offset in the decompressed data
+
+        Args:
+            offset (int): Offset from the start of the decompressed data
+            whence (int): Only io.SEEK_SET is supported
+
+        Raises:
+            UnsupportedOperation: If the offset is behind the current position
+
+        Returns:
+            int: The new position
+        """
+        if whence != io.SEEK_SET or offset < self.tell():
+            raise io.UnsupportedOperation("zstd compressed files can only be read forwards")
+        remaining = offset - self.tell()
+        while remaining > 0:
+            chunk = self.read(min(remaining, io.DEFAULT_BUFFER_SIZE * 16))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+        return self.tell()
+
+
+def open_results_file(path: Path, mode: str = "rb"):
+    """Opens a results file, compressing or decompressing it if the file name says so.
+
+    Files ending with .gz are read and written with gzip, and files ending with .zst
+    with zstandard. Other files are opened as they are. Compressed files opened for
+    writing are always written as UTF-8 text. zstd compressed files opened for reading
+    can only seek forwards.
+
+    Args:
+        path (Path): Path to the file
+        mode (str): "rb" for reading bytes, or a text mode like "w+" for writing
+
+    Raises:
+        TransformationProcessError: If the file is zstd compressed and zstandard is missing
+
+    Returns:
+        A file object
+    """
+    path = Path(path)
+    writing = "w" in mode or "a" in mode
+    if path.suffix == ".gz":
+        if writing:
+            return gzip.open(path, "wt", encoding="utf-8")
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError as ie:
+            raise TransformationProcessError(
+                "",
+                "Install the zstandard package to read or write zstd compressed files",
+                str(path),
+            ) from ie
+        if writing:
+            writer = zstandard.ZstdCompressor().stream_writer(open(path, "wb"), closefd=True)
+            return io.TextIOWrapper(writer, encoding="utf-8")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return ForwardSeekingReader(reader)
+    if writing:
+        return open(path, mode, encoding="utf-8")
+    return open(path, mode)
@@ -5,6 +5,8 @@ from pathlib import Path
 
 from folio_uuid.folio_namespaces import FOLIONamespaces
 
+from folio_migration_tools.compressed_files import COMPRESSION_SUFFIXES
+
 
 class FolderStructure:
     def __init__(
@@ -14,12 +16,14 @@ class FolderStructure:
         migration_task_name: str,
         iteration_identifier: str,
         add_time_stamp_to_file_names: bool,
+        results_file_compression: str = "none",
     ):
         logging.info("Validating folder structure")
 
         self.object_type: FOLIONamespaces = object_type
         self.migration_task_name = migration_task_name
         self.add_time_stamp_to_file_names = add_time_stamp_to_file_names
+        self.results_file_suffix = COMPRESSION_SUFFIXES.get(results_file_compression, "")
         self.iteration_identifier = iteration_identifier
         self.base_folder = Path(base_path)
         if not self.base_folder.is_dir():
@@ -81,6 +85,11 @@ class FolderStructure:
         self.failed_recs_path = (
             self.results_folder / f"failed_records{self.file_template}{self.time_stamp}.txt"
         )
+        self.checkpoint_path = self.results_folder / f"checkpoint_{self.migration_task_name}.json"
+        # Shared between iterations, so that a task can tell what earlier iterations posted
+        self.posted_hashes_path = (
+            self.base_folder / "iterations" / f"posted_hashes_{self.migration_task_name}.json"
+        )
 
         self.transformation_extra_data_path = (
             self.results_folder / f"extradata{self.file_template}.extradata"
@@ -90,7 +99,8 @@ class FolderStructure:
             self.reports_folder / f"data_issues_log{self.file_template}.tsv"
         )
         self.created_objects_path = (
-            self.results_folder / f"folio_{object_type_string}{self.file_template}.json"
+            self.results_folder
+            / f"folio_{object_type_string}{self.file_template}.json{self.results_file_suffix}"
         )
         self.failed_marc_recs_file = (
             self.results_folder / f"failed_records{self.file_template}.mrc"
@@ -98,8 +108,8 @@ class FolderStructure:
 
         self.migration_reports_file = self.reports_folder / f"report{self.file_template}.md"
 
-        self.srs_records_path = (
-            self.results_folder / f"folio_srs_{object_type_string}{self.file_template}.json"
+        self.srs_records_path = self.results_folder / (
+            f"folio_srs_{object_type_string}{self.file_template}.json{self.results_file_suffix}"
         )
         self.organizations_id_map_path = (
             self.results_folder / f"{str(FOLIONamespaces.organizations.name).lower()}_id_map.json"
@@ -124,6 +134,25 @@ class FolderStructure:
         self.statistical_codes_map_path = self.mapping_files_folder / "statcodes.tsv"
         self.item_statuses_map_path = self.mapping_files_folder / "item_statuses.tsv"
 
+    def get_results_file_path(self, file_name: str) -> Path:
+        """Returns the path to a results file named in a task configuration.
+
+        When results files are compressed, the compression suffix is added to names that
+        lack one, unless only the file with the name as given exists.
+
+        Args:
+            file_name (str): Name of the file in the results folder
+
+        Returns:
+            Path: Path to the file
+        """
+        path = self.results_folder / file_name
+        if self.results_file_suffix and path.suffix not in COMPRESSION_SUFFIXES.values():
+            compressed_path = path.with_name(f"{path.name}{self.results_file_suffix}")
+            if compressed_path.is_file() or not path.is_file():
+                return compressed_path
+        return path
+
     def verify_folder(self, folder_path: Path):
         if not folder_path.is_dir():
             logging.critical("There is no folder located at %s. Exiting.", folder_path)
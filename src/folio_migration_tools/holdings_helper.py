@@ -5,6 +5,7 @@ from uuid import uuid4
 
 from folio_migration_tools import custom_exceptions
 from folio_migration_tools import helper
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.migration_report import MigrationReport
 
 
@@ -76,10 +77,10 @@ class HoldingsHelper:
             "Holdings type id to exclude is set to %s",
             holdings_type_id_to_exclude_from_merging,
         )
-        with open(holdings_file_path) as holdings_file:
+        with open_results_file(holdings_file_path, "rb") as holdings_file:
             prev_holdings = {}
             for row in holdings_file:
-                stored_holding = json.loads(row.split("\t")[-1])
+                stored_holding = json.loads(row.split(b"\t")[-1])
                 stored_key = HoldingsHelper.to_key(
                     stored_holding,
                     fields_criteria,
@@ -0,0 +1,51 @@
+from typing import Dict
+from typing import Tuple
+
+import i18n
+
+translations: Dict[Tuple[str, str], str] = {}
+
+
+def t(key: str, **kwargs) -> str:
+    """Translates a message, looking up messages without arguments only once per locale.
+
+    The per-record code paths report the same handful of messages millions of times,
+    so the translated strings are kept in a catalogue rather than resolved by i18n
+    every time. Messages with arguments are passed on to i18n.t as they are.
+
+    Args:
+        key (str): The message, as written in the translations file
+        **kwargs: Arguments to interpolate into the message
+
+    Returns:
+        str: The translated message
+    """
+    if kwargs:
+        return i18n.t(key, **kwargs)
+    return translate(i18n.get("locale"), key)
+
+
+def translate(locale: str, key: str) -> str:
+    """Looks up a message in the catalogue, or in i18n the first time it is seen.
+
+    A message that i18n could not find is not kept, since the translations may not be
+    loaded yet. It is looked up again the next time.
+
+    Args:
+        locale (str): The locale to translate to
+        key (str): The message, as written in the translations file
+
+    Returns:
+        str: The translated message
+    """
+    try:
+        return translations[(locale, key)]
+    except KeyError:
+        translation = i18n.t(key, locale=locale)
+        if translation != key or is_translated(locale, key):
+            translations[(locale, key)] = translation
+        return translation
+
+
+def is_translated(locale: str, key: str) -> bool:
+    return i18n.translations.has(key, locale) or i18n.translations.has(key, i18n.get("fallback"))
@@ -21,6 +21,18 @@ class HridHandling(str, Enum):
     preserve001 = "preserve001"
 
 
+class MarcFileFormat(str, Enum):
+    """Enum determining how the MARC transformers read a file.
+    - marc21: ISO 2709 binary MARC21
+    - marcxml: MARCXML, with or without the MARC21 slim namespace
+    - marcjson: MARC-in-JSON, one record per line
+    """
+
+    marc21 = "marc21"
+    marcxml = "marcxml"
+    marcjson = "marcjson"
+
+
 class FileDefinition(BaseModel):
     file_name: Annotated[
         str,
@@ -35,6 +47,13 @@ class FileDefinition(BaseModel):
     discovery_suppressed: Annotated[bool, Field(title="Discovery suppressed")] = False
     staff_suppressed: Annotated[bool, Field(title="Staff suppressed")] = False
     service_point_id: Annotated[str, Field(title="Service point ID")] = ""
+    marc_file_format: Annotated[
+        MarcFileFormat,
+        Field(
+            title="MARC file format",
+            description="Format of the file. Only used by the MARC transformers",
+        ),
+    ] = MarcFileFormat.marc21
 
 
 class IlsFlavour(str, Enum):
@@ -59,6 +78,18 @@ class FolioRelease(str, Enum):
     orchid = "orchid"
 
 
+class ResultsFileCompression(str, Enum):
+    """Enum determining how the transformers compress the records they create.
+    - none: Plain JSON lines
+    - gzip: Adds .gz to the file names
+    - zstd: Adds .zst to the file names. Requires the zstandard package
+    """
+
+    none = "none"
+    gzip = "gzip"
+    zstd = "zstd"
+
+
 class LibraryConfiguration(BaseModel):
     okapi_url: str
     tenant_id: str
@@ -88,3 +119,32 @@ class LibraryConfiguration(BaseModel):
     )
     iteration_identifier: str
     add_time_stamp_to_file_names: Optional[bool] = False
+    results_file_compression: Annotated[
+        ResultsFileCompression,
+        Field(
+            description=(
+                "Compression of the created objects and SRS records files written by the "
+                "transformers. BatchPoster reads compressed files by their file name ending"
+            )
+        ),
+    ] = ResultsFileCompression.none
+    max_requests_per_second: Annotated[
+        float,
+        Field(
+            description=(
+                "Maximum number of requests per second that a task sends when writing to "
+                "FOLIO. 0 means no limit"
+            ),
+            ge=0,
+        ),
+    ] = 0
+    max_concurrent_requests: Annotated[
+        int,
+        Field(
+            description=(
+                "Maximum number of write requests that a task has waiting for FOLIO "
+                "at the same time. 0 means no limit"
+            ),
+            ge=0,
+        ),
+    ] = 0
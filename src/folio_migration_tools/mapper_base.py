@@ -4,7 +4,6 @@ import json
 import logging
 import sys
 import uuid
-import i18n
 from datetime import datetime
 from datetime import timezone
 from pathlib import Path
@@ -13,6 +12,7 @@ from folio_uuid.folio_namespaces import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
@@ -228,10 +228,10 @@ class MapperBase:
         self.migration_report.add("FieldMappingErrors", error)
         error.id = error.id or index_or_id
         error.log_it()
-        self.migration_report.add_general_statistics(i18n.t("Field Mapping Errors found"))
+        self.migration_report.add_general_statistics(i18n_cache.t("Field Mapping Errors found"))
 
     def handle_transformation_process_error(self, idx, error: TransformationProcessError):
-        self.migration_report.add_general_statistics(i18n.t("Transformation process error"))
+        self.migration_report.add_general_statistics(i18n_cache.t("Transformation process error"))
         logging.critical("%s\t%s", idx, error)
         print(f"\n{error.message}: {error.data_value}")
         sys.exit(1)
@@ -240,7 +240,7 @@ class MapperBase:
         self, records_processed: int, error: TransformationRecordFailedError
     ):
         self.migration_report.add(
-            "GeneralStatistics", i18n.t("FAILED Records failed due to an error")
+            "GeneralStatistics", i18n_cache.t("FAILED Records failed due to an error")
         )
         error.index_or_id = error.index_or_id or records_processed
         error.log_it()
@@ -318,7 +318,7 @@ class MapperBase:
             for id_string in legacy_map.values():
                 legacy_map_file.write(f"{json.dumps(id_string)}\n")
                 self.migration_report.add(
-                    "GeneralStatistics", i18n.t("Unique ID:s written to legacy map")
+                    "GeneralStatistics", i18n_cache.t("Unique ID:s written to legacy map")
                 )
         logging.info("Wrote legacy id map to %s", path)
 
@@ -373,7 +373,7 @@ class MapperBase:
     def add_legacy_id_to_admin_note(self, folio_record: dict, legacy_id: str):
         if not legacy_id:
             raise TransformationFieldMappingError(
-                legacy_id, i18n.t("Legacy id is empty"), legacy_id
+                legacy_id, i18n_cache.t("Legacy id is empty"), legacy_id
             )
         if "administrativeNotes" not in folio_record:
             folio_record["administrativeNotes"] = []
@@ -441,7 +441,9 @@ class MapperBase:
                 )
                 if bound_with_holding.get("hrid", ""):
                     bound_with_holding["hrid"] = f'{bound_with_holding["hrid"]}_bw_{bwidx}'
-            self.migration_report.add_general_statistics(i18n.t("Bound-with holdings created"))
+            self.migration_report.add_general_statistics(
+                i18n_cache.t("Bound-with holdings created")
+            )
             yield bound_with_holding
 
     def generate_boundwith_holding_uuid(self, holding_uuid, instance_uuid):
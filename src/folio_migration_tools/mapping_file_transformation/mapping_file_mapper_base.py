@@ -2,13 +2,13 @@ import csv
 import itertools
 import json
 import logging
-import re
 import uuid
 import i18n
 from functools import reduce
 from pathlib import Path
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Set
 from uuid import UUID
 
@@ -16,6 +16,8 @@ from folio_uuid.folio_uuid import FOLIONamespaces
 from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 
+from folio_migration_tools import i18n_cache
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
@@ -27,6 +29,7 @@ from folio_migration_tools.mapping_file_transformation.ref_data_mapping import (
 from folio_migration_tools.migration_report import MigrationReport
 
 empty_vals = ["Not mapped", None, ""]
+legacy_value_cache_size = 10000
 
 
 class MappingFileMapperBase(MapperBase):
@@ -52,6 +55,7 @@ class MappingFileMapperBase(MapperBase):
         self.empty_vals = empty_vals
         self.folio_keys = self.get_mapped_folio_properties_from_map(self.record_map)
         self.field_map = self.setup_field_map(ignore_legacy_identifier)
+        self.compile_mapping_plan()
         self.validate_map()
         try:
             self.mapped_from_values = {
@@ -80,7 +84,7 @@ class MappingFileMapperBase(MapperBase):
                 # or k["folio_field"] != "legacyIdentifier"
                 or k["value"] not in self.empty_vals
             ):
-                clean_folio_field = re.sub(r"\[\d+\]", "", k["folio_field"])
+                clean_folio_field = regex_patterns.ARRAY_INDEX.sub("", k["folio_field"])
                 self.legacy_record_mappings[k["folio_field"]] = list(
                     self.get_map_entries_by_folio_prop_name(
                         clean_folio_field, self.record_map["data"]
@@ -101,6 +105,26 @@ class MappingFileMapperBase(MapperBase):
             json.dumps(self.folio_keys, indent=4, sort_keys=True),
         )
         csv.register_dialect("tsv", delimiter="\t")
+        self.compile_regex_rules()
+
+    def compile_regex_rules(self):
+        """Compiles the regexGetFirstMatchOrEmpty rules in the mapping file up front,
+        so that invalid patterns halt the task before any records are mapped.
+
+        Raises:
+            TransformationProcessError: If a rule is not a valid regular expression
+        """
+        for mapping_file_entry in self.record_map["data"]:
+            if pattern := mapping_file_entry.get("rules", {}).get("regexGetFirstMatchOrEmpty"):
+                try:
+                    regex_patterns.first_match_or_empty_pattern(pattern)
+                except TransformationProcessError as tpe:
+                    raise TransformationProcessError(
+                        "",
+                        f"Invalid regexGetFirstMatchOrEmpty rule for "
+                        f"{mapping_file_entry.get('folio_field', '')}: {tpe.message}",
+                        pattern,
+                    ) from tpe
 
     def setup_statistical_codes_map(self, statistical_codes_map):
         if statistical_codes_map:
@@ -155,6 +179,88 @@ class MappingFileMapperBase(MapperBase):
             del field_map["legacyIdentifier"]
         return field_map
 
+    def compile_mapping_plan(self):
+        """Indexes the mapping file by FOLIO property, so that mapping a row does not have to
+        scan the mapping file or the list of mapped FOLIO properties for every property.
+
+        The legacy field of every FOLIO property is looked up here. The map entries of a
+        property and the mapped properties under an array path are looked up the first time
+        a row needs them, and reused for all the rows after that.
+        """
+        self.folio_keys_set: Set[str] = set(self.folio_keys)
+        self.legacy_fields_by_folio_prop: Dict[str, str] = {}
+        for k in self.record_map["data"]:
+            self.legacy_fields_by_folio_prop.setdefault(k["folio_field"], k["legacy_field"])
+        self.map_entries_by_folio_prop: Dict[str, List[dict]] = {}
+        self.folio_keys_by_prefix: Dict[str, List[str]] = {}
+        self.array_item_paths: Dict[str, Set[str]] = {}
+        self.mapped_schema_properties: Optional[Dict[str, dict]] = None
+        self.legacy_value_caches: Dict[int, dict] = {}
+
+    def get_mapped_schema_properties(self) -> Dict[str, dict]:
+        """Returns the properties of the schema that do_map needs to visit.
+
+        These are the properties that have an entry in the mapping file, on the property
+        itself or on anything below it, and the required properties. Properties that
+        map_property would skip anyway are left out. The view is taken the first time
+        a row is mapped, after the subclasses have finished setting up the schema.
+
+        Returns:
+            Dict[str, dict]: The schema properties by name, in schema order
+        """
+        if self.mapped_schema_properties is None:
+            mapped_roots = {
+                regex_patterns.ARRAY_INDEX.sub("", k["folio_field"]).split(".")[0]
+                for k in self.record_map["data"]
+            }
+            required = self.schema.get("required", [])
+            self.mapped_schema_properties = {
+                property_name: property
+                for property_name, property in self.schema["properties"].items()
+                if (property_name in mapped_roots or property_name in required)
+                and not skip_property(property_name, property)
+            }
+            logging.info(
+                "Mapping %s of %s schema properties",
+                len(self.mapped_schema_properties),
+                len(self.schema["properties"]),
+            )
+        return self.mapped_schema_properties
+
+    def get_map_entries(self, folio_prop_name: str) -> List[dict]:
+        try:
+            return self.map_entries_by_folio_prop[folio_prop_name]
+        except KeyError:
+            map_entries = list(
+                self.get_map_entries_by_folio_prop_name(folio_prop_name, self.record_map["data"])
+            )
+            self.map_entries_by_folio_prop[folio_prop_name] = map_entries
+            return map_entries
+
+    def get_legacy_value_cache(self, map_entry: dict) -> Optional[dict]:
+        """Returns the cache of rule results for a map entry with rules, and None otherwise"""
+        if not map_entry.get("rules"):
+            return None
+        return self.legacy_value_caches.setdefault(id(map_entry), {})
+
+    def get_folio_keys_starting_with(self, prefix: str) -> List[str]:
+        try:
+            return self.folio_keys_by_prefix[prefix]
+        except KeyError:
+            folio_keys = [k for k in self.folio_keys if k.startswith(prefix)]
+            self.folio_keys_by_prefix[prefix] = folio_keys
+            return folio_keys
+
+    def get_array_item_paths(self, array_item_prefix: str) -> Set[str]:
+        try:
+            return self.array_item_paths[array_item_prefix]
+        except KeyError:
+            paths = {
+                k.rsplit(".", 1)[0] for k in self.get_folio_keys_starting_with(array_item_prefix)
+            }
+            self.array_item_paths[array_item_prefix] = paths
+            return paths
+
     def validate_map(self):
         # TODO: Add functionality here to validate that the map is complete.
         # That it maps the required fields etc
@@ -242,17 +348,13 @@ class MappingFileMapperBase(MapperBase):
             )
         self.migration_report.add(
             "StatisticalCodeMapping",
-            i18n.t("Mapping not setup"),
+            i18n_cache.t("Mapping not setup"),
         )
         return ""
 
     def get_prop(self, legacy_object, folio_prop_name, index_or_id, schema_default_value):
         legacy_item_keys = self.mapped_from_legacy_data.get(folio_prop_name, [])
-        map_entries = list(
-            MappingFileMapperBase.get_map_entries_by_folio_prop_name(
-                folio_prop_name, self.record_map["data"]
-            )
-        )
+        map_entries = self.get_map_entries(folio_prop_name)
         if not any(map_entries):
             return ""
         elif len(map_entries) > 1:
@@ -266,6 +368,7 @@ class MappingFileMapperBase(MapperBase):
                     self.migration_report,
                     index_or_id,
                     self.library_configuration.multi_field_delimiter,
+                    self.get_legacy_value_cache(map_entry),
                 )
                 for map_entry in map_entries
             ).strip()
@@ -276,6 +379,7 @@ class MappingFileMapperBase(MapperBase):
                 self.migration_report,
                 index_or_id,
                 self.library_configuration.multi_field_delimiter,
+                self.get_legacy_value_cache(map_entries[0]),
             )
             if legacy_value or isinstance(legacy_value, bool):
                 return legacy_value
@@ -300,7 +404,7 @@ class MappingFileMapperBase(MapperBase):
         folio_object, legacy_id = self.instantiate_record(
             legacy_object, index_or_id, object_type, accept_duplicate_ids
         )
-        for property_name, property in self.schema["properties"].items():
+        for property_name, property in self.get_mapped_schema_properties().items():
             try:
                 self.map_property(property_name, property, folio_object, legacy_id, legacy_object)
             except TransformationFieldMappingError as data_error:
@@ -369,7 +473,26 @@ class MappingFileMapperBase(MapperBase):
         migration_report: MigrationReport,
         index_or_id: str = "",
         multi_field_delimiter="",
+        value_cache: Optional[dict] = None,
     ):
+        """Returns the value of a mapping file entry for a legacy record.
+
+        The replaceValues and regexGetFirstMatchOrEmpty rules only depend on the legacy
+        value, so their results can be kept in a value_cache and looked up for every
+        row with the same value. Legacy columns with rules tend to hold a handful of
+        distinct values, like locations, types and statuses.
+
+        Args:
+            legacy_object (dict): The legacy record
+            mapping_file_entry (dict): The mapping file entry
+            migration_report (MigrationReport): The migration report
+            index_or_id (str): The index or id of the legacy record
+            multi_field_delimiter (str): Delimiter between the values of a repeated field
+            value_cache (Optional[dict]): Results of the rules by legacy value, for the entry
+
+        Returns:
+            The value to map
+        """
         # Mapping from value fields has preceedence and does not get involved in post processing
         if mapping_file_entry.get("value", "") or isinstance(
             mapping_file_entry.get("value", ""), bool
@@ -388,30 +511,22 @@ class MappingFileMapperBase(MapperBase):
         # Value mapped from the Legacy field(s)
         value = legacy_object.get(mapping_file_entry["legacy_field"], "")
 
-        if value and mapping_file_entry.get("rules", {}).get("replaceValues", {}):
-            if multi_field_delimiter and multi_field_delimiter in value:
-                replaced_split_values = [
-                    mapping_file_entry["rules"]["replaceValues"].get(sv, "")
-                    for sv in value.split(multi_field_delimiter)
-                ]
-                replaced_val = multi_field_delimiter.join(replaced_split_values)
+        if value and mapping_file_entry.get("rules"):
+            if value_cache is None or not isinstance(value, str):
+                value, replacement = MappingFileMapperBase.apply_value_rules(
+                    mapping_file_entry, value, multi_field_delimiter
+                )
+            elif value in value_cache:
+                value, replacement = value_cache[value]
             else:
-                replaced_val = mapping_file_entry["rules"]["replaceValues"].get(value, "")
-
-            if replaced_val or isinstance(replaced_val, bool):
-                migration_report.add(
-                    "FieldMappingDetails",
-                    (
-                        f"Replaced {value} in {mapping_file_entry['legacy_field']} "
-                        f"with {replaced_val}"
-                    ),
+                legacy_value = value
+                value, replacement = MappingFileMapperBase.apply_value_rules(
+                    mapping_file_entry, value, multi_field_delimiter
                 )
-                value = replaced_val
-        if value and mapping_file_entry.get("rules", {}).get("regexGetFirstMatchOrEmpty", ""):
-            my_pattern = (
-                f'{mapping_file_entry.get("rules", {}).get("regexGetFirstMatchOrEmpty")}|$'
-            )
-            value = re.findall(my_pattern, value)[0]
+                if len(value_cache) < legacy_value_cache_size:
+                    value_cache[legacy_value] = (value, replacement)
+            if replacement:
+                migration_report.add("FieldMappingDetails", replacement)
         if not value and mapping_file_entry.get("fallback_legacy_field", ""):
             migration_report.add(
                 "FieldMappingDetails",
@@ -434,6 +549,41 @@ class MappingFileMapperBase(MapperBase):
             value = mapping_file_entry.get("fallback_value", "")
         return value
 
+    @staticmethod
+    def apply_value_rules(mapping_file_entry: dict, value, multi_field_delimiter=""):
+        """Applies the replaceValues and regexGetFirstMatchOrEmpty rules to a legacy value
+
+        Args:
+            mapping_file_entry (dict): The mapping file entry with the rules
+            value (_type_): The legacy value
+            multi_field_delimiter (str): Delimiter between the values of a repeated field
+
+        Returns:
+            tuple: The value, and the report line of the replacement, or None
+        """
+        replacement = None
+        if value and mapping_file_entry.get("rules", {}).get("replaceValues", {}):
+            if multi_field_delimiter and multi_field_delimiter in value:
+                replaced_split_values = [
+                    mapping_file_entry["rules"]["replaceValues"].get(sv, "")
+                    for sv in value.split(multi_field_delimiter)
+                ]
+                replaced_val = multi_field_delimiter.join(replaced_split_values)
+            else:
+                replaced_val = mapping_file_entry["rules"]["replaceValues"].get(value, "")
+
+            if replaced_val or isinstance(replaced_val, bool):
+                replacement = (
+                    f"Replaced {value} in {mapping_file_entry['legacy_field']} "
+                    f"with {replaced_val}"
+                )
+                value = replaced_val
+        if value and mapping_file_entry.get("rules", {}).get("regexGetFirstMatchOrEmpty", ""):
+            value = regex_patterns.first_match_or_empty(
+                mapping_file_entry["rules"]["regexGetFirstMatchOrEmpty"], value
+            )
+        return value, replacement
+
     @staticmethod
     def get_legacy_vals(legacy_item, legacy_item_keys):
         result_list = []
@@ -519,9 +669,7 @@ class MappingFileMapperBase(MapperBase):
         resulting_array = []
         i = 0
         while True:
-            keys_to_map = {
-                k.rsplit(".", 1)[0] for k in self.folio_keys if k.startswith(f"{prop_name}[{i}")
-            }
+            keys_to_map = self.get_array_item_paths(f"{prop_name}[{i}")
             if not any(keys_to_map):
                 break
             for _ in keys_to_map:
@@ -533,7 +681,7 @@ class MappingFileMapperBase(MapperBase):
                     if not p.get("folio:isVirtual", False)
                 ):
                     prop_path = f"{prop_name}[{i}].{sub_prop_name}"
-                    if prop_path in self.folio_keys:
+                    if prop_path in self.folio_keys_set:
                         # We have reached the end of the prop path?
                         res = self.get_prop(
                             legacy_object,
@@ -575,7 +723,7 @@ class MappingFileMapperBase(MapperBase):
                         in ["string", "number", "integer"]
                     ):
                         # We have not reached the end of the prop path
-                        for array_path in [p for p in self.folio_keys if p.startswith(prop_path)]:
+                        for array_path in self.get_folio_keys_starting_with(prop_path):
                             res = self.get_prop(
                                 legacy_object,
                                 array_path,
@@ -631,9 +779,9 @@ class MappingFileMapperBase(MapperBase):
         return res
 
     def map_string_array_props(self, legacy_object, prop, folio_object, index_or_id):
-        keys_to_map = [k for k in self.folio_keys if k.startswith(prop)]
+        keys_to_map = self.get_folio_keys_starting_with(prop)
         for prop_name in keys_to_map:
-            if prop_name in self.folio_keys and self.has_property(legacy_object, prop_name):
+            if prop_name in self.folio_keys_set and self.has_property(legacy_object, prop_name):
                 if mapped_prop := self.get_prop(legacy_object, prop_name, index_or_id, ""):
                     self.add_values_to_string_array(
                         prop,
@@ -683,53 +831,48 @@ class MappingFileMapperBase(MapperBase):
     @staticmethod
     def _get_delimited_file_reader(source_file, file_name: Path):
         """
-            First, let's count:
+            Sets up a csv.DictReader that counts the rows of the source file while it reads
+            them, so that the file is only read once:
             * The total number of rows in the source file
             * The total number of empty rows in the source file
 
-            Then, we'll return those counts and a csv.DictReader
+            The counts are complete once the reader has been read to the end.
 
         Args:
             source_file (_type_): _description_
             file_name (Path): _description_
 
         Returns:
-            (int, int, DictReader): total rows, empty rows, dict reader
+            (RowCounter, DictReader): row counter, dict reader
         """
-        empty_rows = 0
-        total_rows = -1  # Do not count header row
         if str(file_name).endswith("tsv"):
-            delimiter = "\t"
+            row_counter = RowCounter(source_file, "\t")
+            dict_reader = csv.DictReader(row_counter, dialect="tsv")
         else:
-            delimiter = ","
-        for line in source_file:
-            if not "".join(line.strip().split(delimiter)):  # check for empty rows
-                empty_rows += 1
-            total_rows += 1
-        source_file.seek(0)  # Set file position back to start
-        if str(file_name).endswith("tsv"):
-            dict_reader = csv.DictReader(source_file, dialect="tsv")
-        else:
-            dict_reader = csv.DictReader(source_file)
-        return total_rows, empty_rows, dict_reader
+            row_counter = RowCounter(source_file, ",")
+            dict_reader = csv.DictReader(row_counter)
+        return row_counter, dict_reader
 
     def get_objects(self, source_file, file_name: Path):
-        total_rows, empty_rows, reader = self._get_delimited_file_reader(source_file, file_name)
-        logging.info("Source data file contains %d rows", total_rows)
-        logging.info("Source data file contains %d empty rows", empty_rows)
-        self.migration_report.set(
-            "GeneralStatistics", "Number of rows in {}".format(file_name.name), total_rows
-        )
-        self.migration_report.set(
-            "GeneralStatistics",
-            "Number of empty rows in {}".format(file_name.name),
-            empty_rows,
-        )
+        row_counter, reader = self._get_delimited_file_reader(source_file, file_name)
         try:
             yield from reader
         except Exception as exception:
             logging.error("%s at row %s", exception, reader.line_num)
             raise exception from exception
+        finally:
+            logging.info("Source data file contains %d rows", row_counter.total_rows)
+            logging.info("Source data file contains %d empty rows", row_counter.empty_rows)
+            self.migration_report.set(
+                "GeneralStatistics",
+                "Number of rows in {}".format(file_name.name),
+                row_counter.total_rows,
+            )
+            self.migration_report.set(
+                "GeneralStatistics",
+                "Number of empty rows in {}".format(file_name.name),
+                row_counter.empty_rows,
+            )
 
     def has_property(self, legacy_object, folio_prop_name: str):
         legacy_keys = self.field_map.get(folio_prop_name, [])
@@ -740,7 +883,7 @@ class MappingFileMapperBase(MapperBase):
         )
 
     def has_basic_property(self, legacy_object, folio_prop_name):
-        if folio_prop_name not in self.folio_keys:
+        if folio_prop_name not in self.folio_keys_set:
             return False
         if folio_prop_name in self.mapped_from_values:
             return True
@@ -767,12 +910,9 @@ class MappingFileMapperBase(MapperBase):
         )
 
     def legacy_basic_property(self, folio_prop):
-        if folio_prop not in self.folio_keys:
+        if folio_prop not in self.folio_keys_set:
             return ""
-        return next(
-            (k["legacy_field"] for k in self.record_map["data"] if k["folio_field"] == folio_prop),
-            "",
-        )
+        return self.legacy_fields_by_folio_prop.get(folio_prop, "")
 
     def verify_legacy_record(self, legacy_object, idx):
         if idx == 0:
@@ -871,6 +1011,27 @@ class MappingFileMapperBase(MapperBase):
             folio_object.pop(schema_property_name, [])
 
 
+class RowCounter:
+    """Passes the lines of a delimited file on to a csv reader, counting them on the way.
+
+    Lines where all the fields are empty are counted as empty rows. The header row is not
+    counted.
+    """
+
+    def __init__(self, source_file, delimiter: str):
+        self.source_file = source_file
+        self.delimiter = delimiter
+        self.total_rows = -1  # Do not count header row
+        self.empty_rows = 0
+
+    def __iter__(self):
+        for line in self.source_file:
+            if not line.strip().replace(self.delimiter, ""):  # check for empty rows
+                self.empty_rows += 1
+            self.total_rows += 1
+            yield line
+
+
 def skip_property(property_name, property):
     return bool(
         property_name in ["metadata", "id", "type", "lastCheckIn"]
@@ -917,7 +1078,7 @@ def set_deep2(dictionary, key, value):
     number = 0
     for k in keys:
         if k == keys[0] and k.endswith("]"):
-            m = re.search(r"\[([\d]+)\]", k)
+            m = regex_patterns.ARRAY_INDEX_GROUP.search(k)
             number = int(m[1])
             name = k.split("[")[0]
             dd = dd.setdefault(name, [{}])
@@ -1,7 +1,6 @@
 import json
 import logging
 import os
-import re
 import sys
 import urllib.parse
 import uuid
@@ -12,6 +11,7 @@ from folio_uuid.folio_uuid import FOLIONamespaces
 from folioclient import FolioClient
 from httpx import HTTPError
 
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import LibraryConfiguration
@@ -96,10 +96,10 @@ class CompositeOrderMapper(MappingFileMapperBase):
                 False,
             )
 
-        elif re.compile(r"compositePoLines\[(\d+)\]\.id").fullmatch(folio_prop_name):
+        elif regex_patterns.COMPOSITE_PO_LINE_ID.fullmatch(folio_prop_name):
             return str(uuid.uuid4())
 
-        elif re.compile(r"notes\[\d+\]\.").match(folio_prop_name):
+        elif regex_patterns.NOTES_PROPERTY.match(folio_prop_name):
             return ""
 
         if folio_prop_name.endswith(".locationId"):
@@ -1,13 +1,13 @@
 import json
 import logging
 import os
-import re
 import sys
 
 import httpx
 from folio_uuid.folio_uuid import FOLIONamespaces
 from folioclient import FolioClient
 
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base import (
     MappingFileMapperBase,
@@ -79,30 +79,28 @@ class OrganizationMapper(MappingFileMapperBase):
                 False,
             )
 
-        elif re.compile("addresses\[(\d+)\]\.categories\[(\d+)\]").fullmatch(folio_prop_name):
+        elif regex_patterns.ADDRESS_CATEGORIES.fullmatch(folio_prop_name):
             return self.get_mapped_ref_data_value(
                 self.address_categories_map,
                 *value_tuple,
                 False,
             )
 
-        elif re.compile("emails\[(\d+)\]\.categories\[(\d+)\]").fullmatch(folio_prop_name):
+        elif regex_patterns.EMAIL_CATEGORIES.fullmatch(folio_prop_name):
             return self.get_mapped_ref_data_value(
                 self.email_categories_map,
                 *value_tuple,
                 False,
             )
 
-        elif re.compile("phoneNumbers\[(\d+)\]\.categories\[(\d+)\]").fullmatch(folio_prop_name):
+        elif regex_patterns.PHONE_NUMBER_CATEGORIES.fullmatch(folio_prop_name):
             return self.get_mapped_ref_data_value(
                 self.phone_categories_map,
                 *value_tuple,
                 False,
             )
 
-        elif re.compile("interfaces\[(\d+)\]\.interfaceCredential.interfaceId").fullmatch(
-            folio_prop_name
-        ):
+        elif regex_patterns.INTERFACE_CREDENTIAL_ID.fullmatch(folio_prop_name):
             return "replace_with_interface_id"
 
         return super().get_prop(
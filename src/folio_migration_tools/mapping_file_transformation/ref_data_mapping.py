@@ -1,6 +1,7 @@
 import json
 import logging
 import sys
+from operator import itemgetter
 
 from folioclient import FolioClient
 
@@ -30,16 +31,15 @@ class RefDataMapping(object):
         self.mapped_legacy_keys = []
         self.default_id = ""
         self.default_name = ""
-        self.cached_dict = {}
+        self.cached_dict = {
+            r[self.key_type].lower(): (r["id"], r[self.key_type]) for r in self.ref_data
+        }
+        self.regular_mappings_index: dict = {}
+        self.hybrid_mapping_levels: list = []
         self.setup_mappings()
         logging.info("%s reference data mapping. Done init", self.name)
 
     def get_ref_data_tuple(self, key_value):
-        if ref_object := self.cached_dict.get(key_value.lower().strip(), ()):
-            return ref_object
-        self.cached_dict = {
-            r[self.key_type].lower(): (r["id"], r[self.key_type]) for r in self.ref_data
-        }
         return self.cached_dict.get(key_value.lower().strip(), ())
 
     def setup_mappings(self):
@@ -86,6 +86,12 @@ class RefDataMapping(object):
                 ) from ee
 
         self.post_validate_map()
+        self.regular_mappings_index = self.index_regular_mappings(
+            self.regular_mappings, self.mapped_legacy_keys
+        )
+        self.hybrid_mapping_levels = self.index_hybrid_mappings(
+            self.hybrid_mappings, self.mapped_legacy_keys
+        )
         logging.info(
             f"Loaded {len(self.regular_mappings)} mappings for {len(self.ref_data)} {self.name} "
             "in FOLIO"
@@ -95,43 +101,72 @@ class RefDataMapping(object):
             f"{self.name} in FOLIO"
         )
 
+    @staticmethod
+    def index_regular_mappings(regular_mappings, mapped_legacy_keys) -> dict:
+        """Indexes the regular mappings by their legacy values. The first row wins where
+        several rows have the same legacy values, just like when the rows were searched.
+
+        Args:
+            regular_mappings (list): The mapping rows without wildcards
+            mapped_legacy_keys (list): The legacy columns of the map
+
+        Returns:
+            dict: The mapping rows by the tuple of their legacy values
+        """
+        index: dict = {}
+        for mapping in regular_mappings:
+            index.setdefault(tuple(mapping[k] for k in mapped_legacy_keys), mapping)
+        return index
+
+    @staticmethod
+    def index_hybrid_mappings(hybrid_mappings, mapped_legacy_keys) -> list:
+        """Indexes the hybrid mappings by the legacy columns that are not wildcards.
+
+        A hybrid mapping that matches scores higher the fewer wildcards it has, so the
+        indexes are grouped into levels by the number of columns without wildcards, most
+        specific first. Every row keeps its position in the map, as the first row wins
+        between matches on the same level.
+
+        Args:
+            hybrid_mappings (list): The mapping rows with some wildcards
+            mapped_legacy_keys (list): The legacy columns of the map
+
+        Returns:
+            list: The levels, each a list of (columns, {legacy values: (position, row)})
+        """
+        indexes: dict = {}
+        for position, mapping in enumerate(hybrid_mappings):
+            keys = tuple(k for k in mapped_legacy_keys if mapping[k] != "*")
+            indexes.setdefault(keys, {}).setdefault(
+                tuple(mapping[k] for k in keys), (position, mapping)
+            )
+        levels: dict = {}
+        for keys, index in indexes.items():
+            levels.setdefault(len(keys), []).append((keys, index))
+        return [levels[level] for level in sorted(levels, reverse=True)]
+
     def get_hybrid_mapping(self, legacy_object):
-        obj_key = "_".join(legacy_object[k].strip() for k in self.mapped_legacy_keys)
+        obj_key = tuple(legacy_object[k].strip() for k in self.mapped_legacy_keys)
         if obj_key in self.cache:
             return self.cache[obj_key]
+        prepped_props = dict(zip(self.mapped_legacy_keys, obj_key))
         highest_match = None
-        highest_match_number = 0
-
-        prepped_props = {k: legacy_object[k].strip() for k in self.mapped_legacy_keys}
-        for mapping in self.hybrid_mappings:
-            mismatch = 0
-            match_numbers = []
-            for k in self.mapped_legacy_keys:
-                if mapping[k] == prepped_props[k]:
-                    match_numbers.append(10)
-                elif mapping[k] == "*":
-                    match_numbers.append(1)
-                else:
-                    mismatch += 1
-            summa = sum(match_numbers)
-
-            if mismatch < 1 and summa > highest_match_number and min(match_numbers) > 0:
-                highest_match_number = summa
-                highest_match = mapping
+        for level in self.hybrid_mapping_levels:
+            matches = [
+                match
+                for keys, index in level
+                if (match := index.get(tuple(prepped_props[k] for k in keys)))
+            ]
+            if matches:
+                highest_match = min(matches, key=itemgetter(0))[1]
+                break
         self.cache[obj_key] = highest_match
         return highest_match
 
     def get_ref_data_mapping(self, legacy_object):
-        obj_key = "_".join(legacy_object[k].strip() for k in self.mapped_legacy_keys)
-        if obj_key in self.cache:
-            return self.cache[obj_key]
-        prepped_props = {k: legacy_object[k].strip() for k in self.mapped_legacy_keys}
-        for mapping in self.regular_mappings:
-            match_number = sum(prepped_props[k] == mapping[k] for k in self.mapped_legacy_keys)
-            if match_number == len(self.mapped_legacy_keys):
-                self.cache[obj_key] = mapping
-                return mapping
-        return None
+        return self.regular_mappings_index.get(
+            tuple(legacy_object[k].strip() for k in self.mapped_legacy_keys)
+        )
 
     def is_hybrid_default_mapping(self, mapping):
         legacy_values = [value for key, value in mapping.items() if key in self.mapped_legacy_keys]
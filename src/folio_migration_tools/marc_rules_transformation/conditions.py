@@ -1,11 +1,13 @@
 import logging
-import re
 import i18n
+from collections import OrderedDict
 
 import pymarc
 from folioclient import FolioClient
 from pymarc import field
 
+from folio_migration_tools import i18n_cache
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
@@ -26,6 +28,55 @@ class Conditions:
         "y": "Serial",
     }
 
+    # Conditions that always give the same result and report entries for the same value,
+    # parameter and the parts of the MARC field picked out here. Their results are cached
+    # in get_condition, and the report entries are added again on every cache hit.
+    # Conditions that log data issues for the record are left out.
+    cacheable_conditions = {
+        "set_instance_format_id": lambda value, parameter, marc_field: value,
+        "set_permanent_location_id": lambda value, parameter, marc_field: value,
+        "set_location_id_by_code": lambda value, parameter, marc_field: value,
+        "set_holding_note_type_id_by_name": lambda value, parameter, marc_field: (
+            parameter.get("name")
+        ),
+        "set_holdings_note_type_id": lambda value, parameter, marc_field: parameter.get("name"),
+        "set_authority_note_type_id": lambda value, parameter, marc_field: parameter.get("name"),
+        "set_classification_type_id": lambda value, parameter, marc_field: parameter.get("name"),
+        "set_identifier_type_id_by_name": lambda value, parameter, marc_field: (
+            marc_field.tag,
+            parameter.get("name"),
+        ),
+        "set_contributor_name_type_id": lambda value, parameter, marc_field: (
+            marc_field.tag,
+            parameter.get("name"),
+        ),
+        "set_note_type_id": lambda value, parameter, marc_field: (
+            marc_field.tag,
+            parameter.get("name"),
+        ),
+        "set_publisher_role": lambda value, parameter, marc_field: (
+            marc_field.tag,
+            marc_field.indicator2,
+        ),
+        "set_call_number_type_id": lambda value, parameter, marc_field: (
+            marc_field.indicator1,
+            tuple(marc_field.get_subfields("2")[:1]),
+        ),
+        "set_call_number_type_by_indicator": lambda value, parameter, marc_field: (
+            marc_field.indicator1,
+            tuple(marc_field.get_subfields("2")[:1]),
+        ),
+        "set_electronic_access_relations_id": lambda value, parameter, marc_field: (
+            marc_field.indicator2
+        ),
+        "set_url_relationship": lambda value, parameter, marc_field: marc_field.indicator2,
+        "set_note_staff_only_via_indicator": lambda value, parameter, marc_field: (
+            marc_field.tag,
+            marc_field.indicator1,
+        ),
+    }
+    condition_results_size = 10000
+
     def __init__(
         self,
         folio: FolioClient,
@@ -51,6 +102,7 @@ class Conditions:
             self.setup_reference_data_for_all()
             self.setup_reference_data_for_items_and_holdings(default_call_number_type_name)
         self.condition_cache: dict = {}
+        self.condition_results: OrderedDict = OrderedDict()
 
     def setup_reference_data_for_bibs(self):
         logging.info("Setting up reference data for bib transformation")
@@ -162,6 +214,37 @@ class Conditions:
 
     def get_condition(
         self, name, legacy_id, value, parameter=None, marc_field: field.Field = None
+    ):
+        if name in self.cacheable_conditions:
+            return self.get_cached_condition(name, legacy_id, value, parameter, marc_field)
+        return self.call_condition(name, legacy_id, value, parameter, marc_field)
+
+    def get_cached_condition(
+        self, name, legacy_id, value, parameter=None, marc_field: field.Field = None
+    ):
+        """Returns the result of a condition in cacheable_conditions, from the cache when
+        the same input has been seen before. The report entries that the condition made
+        the first time are added to the migration report again on a cache hit. Results
+        are only cached when the condition did not raise.
+        """
+        key = (name, self.cacheable_conditions[name](value, parameter or {}, marc_field))
+        if key in self.condition_results:
+            self.condition_results.move_to_end(key)
+            result, recording = self.condition_results[key]
+            self.mapper.migration_report.replay(recording)
+            return result
+        self.mapper.migration_report.start_recording()
+        try:
+            result = self.call_condition(name, legacy_id, value, parameter, marc_field)
+        finally:
+            recording = self.mapper.migration_report.stop_recording()
+        self.condition_results[key] = (result, recording)
+        if len(self.condition_results) > self.condition_results_size:
+            self.condition_results.popitem(last=False)
+        return result
+
+    def call_condition(
+        self, name, legacy_id, value, parameter=None, marc_field: field.Field = None
     ):
         try:
             return self.condition_cache.get(name)(legacy_id, value, parameter, marc_field)
@@ -183,7 +266,7 @@ class Conditions:
     ):
         contributor_code_subfield = parameter.get("contributorCodeSubfield", "4")
         for subfield in marc_field.get_subfields(contributor_code_subfield):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = regex_patterns.NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_code(
                 self.folio.contributor_types, "contrib_types_c", normalized_subfield
             )
@@ -216,7 +299,7 @@ class Conditions:
         fallback_name_field = "j" if marc_field.tag in ["111", "711"] else "e"
         contributor_name_subfield = parameter.get("contributorNameSubfield", fallback_name_field)
         for subfield in marc_field.get_subfields(contributor_name_subfield):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = regex_patterns.NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_name(
                 self.folio.contributor_types, "contrib_types_n", normalized_subfield
             )
@@ -246,7 +329,9 @@ class Conditions:
         return ""
 
     def condition_set_holdings_type_id(self, legacy_id, value, parameter, marc_field: field.Field):
-        self.mapper.migration_report.add("HoldingsTypeMapping", i18n.t("Condition in rules hit"))
+        self.mapper.migration_report.add(
+            "HoldingsTypeMapping", i18n_cache.t("Condition in rules hit")
+        )
         return ""
 
     def condition_concat_subfields_by_name(
@@ -295,7 +380,7 @@ class Conditions:
             )
             self.mapper.migration_report.add(
                 "InstanceFormat",
-                i18n.t("Successful match") + f'  - "{value}"->{t[1]}',
+                i18n_cache.t("Successful match") + f'  - "{value}"->{t[1]}',
             )
             return t[0]
         except Exception:
@@ -311,12 +396,11 @@ class Conditions:
     ):
         """Returns the index title according to the rules"""
         ind2 = marc_field.indicator2
-        reg_str = r"[\s:\/]{0,3}$"
         if ind2 not in map(str, range(1, 9)):
-            return re.sub(reg_str, "", value)
+            return regex_patterns.TRAILING_PUNCTUATION.sub("", value)
 
         num_take = int(ind2)
-        return re.sub(reg_str, "", value[num_take:])
+        return regex_patterns.TRAILING_PUNCTUATION.sub("", value[num_take:])
 
     def condition_capitalize(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.capitalize()
@@ -347,7 +431,7 @@ class Conditions:
         self, legacy_id, value, parameter, marc_field: field.Field
     ):
         if "oclc_regex" in parameter:
-            if re.match(parameter["oclc_regex"], value):
+            if regex_patterns.compile_pattern(parameter["oclc_regex"]).match(value):
                 t = self.get_ref_data_tuple_by_name(
                     self.folio.identifier_types,
                     "identifier_types",
@@ -455,7 +539,7 @@ class Conditions:
     def condition_set_receipt_status(self, legacy_id, value, parameter, marc_field: field.Field):
         if len(value) < 7:
             self.mapper.migration_report.add(
-                "ReceiptStatusMapping", i18n.t("008 is too short") + f": {value}"
+                "ReceiptStatusMapping", i18n_cache.t("008 is too short") + f": {value}"
             )
             return ""
         try:
@@ -535,7 +619,7 @@ class Conditions:
         self, legacy_id, value, parameter, marc_field: field.Field
     ):
         for subfield in marc_field.get_subfields("4"):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = regex_patterns.NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_code(
                 self.folio.contributor_types, "contrib_types_c", normalized_subfield
             )
@@ -568,7 +652,7 @@ class Conditions:
                 return t[0]
         subfield_code = "j" if marc_field.tag in ["111", "711"] else "e"
         for subfield in marc_field.get_subfields(subfield_code):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = regex_patterns.NON_ALPHANUMERIC.sub("", subfield.strip())
             t = self.get_ref_data_tuple_by_name(
                 self.folio.contributor_types, "contrib_types_n", normalized_subfield
             )
@@ -659,7 +743,7 @@ class Conditions:
         if t:
             self.mapper.migration_report.add(
                 "CallNumberTypeMapping",
-                i18n.t("Mapped from Indicator 1") + f" {marc_field.indicator1} -> {t[1]}",
+                i18n_cache.t("Mapped from Indicator 1") + f" {marc_field.indicator1} -> {t[1]}",
             )
             return t[0]
 
@@ -677,7 +761,7 @@ class Conditions:
         self, legacy_id, value, parameter, marc_field: field.Field
     ):
         for subfield in marc_field.get_subfields("4", "e"):
-            normalized_subfield = re.sub(r"[^A-Za-z0-9 ]+", "", subfield.strip())
+            normalized_subfield = regex_patterns.NON_ALPHANUMERIC.sub("", subfield.strip())
             for cont_type in self.folio.contributor_types:
                 if normalized_subfield in [cont_type["code"], cont_type["name"]]:
                     return cont_type["name"]
@@ -751,13 +835,14 @@ class Conditions:
             mapped_code = self.ref_data_dicts["legacy_locations"].get("*", "").strip()
             if mapped_code:
                 self.mapper.migration_report.add(
-                    "LocationMapping", i18n.t("Fallback mapping") + f": {value}->{mapped_code}"
+                    "LocationMapping",
+                    i18n_cache.t("Fallback mapping") + f": {value}->{mapped_code}",
                 )
         # Get the FOLIO UUID for the code and return it
         t = self.get_ref_data_tuple_by_code(self.folio.locations, "locations", mapped_code)
         if not t:
             self.mapper.migration_report.add(
-                "LocationMapping", i18n.t("Unmapped code") + f": '{value}'"
+                "LocationMapping", i18n_cache.t("Unmapped code") + f": '{value}'"
             )
             raise TransformationRecordFailedError(
                 legacy_id, "Could not map location from legacy code", value
@@ -773,15 +858,13 @@ class Conditions:
 
     def get_ref_data_tuple(self, ref_data, ref_name, key_value, key_type):
         dict_key = f"{ref_name}{key_type}"
-        # Try get the object from the cache
-        ref_object = self.ref_data_dicts.get(dict_key, {}).get(key_value.lower(), ())
-        if ref_object:
-            return ref_object
-
-        # No cache, we need to add it to the cache.
-        d = {r[key_type].lower(): (r["id"], r["name"]) for r in ref_data}
-        self.ref_data_dicts[dict_key] = d
-        return self.ref_data_dicts.get(dict_key, {}).get(key_value.lower(), ())
+        # Index the reference data the first time it is used. Values that are not in
+        # FOLIO are looked up in the same index, rather than indexing it again
+        if dict_key not in self.ref_data_dicts:
+            self.ref_data_dicts[dict_key] = {
+                r[key_type].lower(): (r["id"], r["name"]) for r in ref_data
+            }
+        return self.ref_data_dicts[dict_key].get(key_value.lower(), ())
 
     def condition_remove_substring(self, legacy_id, value, parameter, marc_field: field.Field):
         return value.replace(parameter["substring"], "")
@@ -834,7 +917,7 @@ class Conditions:
         self.mapper.migration_report.add(
             "StaffOnlyViaIndicator",
             f"{marc_field.tag} indicator1: {ind1} ("
-            + i18n.t("1 is public, all other values are Staff only")
+            + i18n_cache.t("1 is public, all other values are Staff only")
             + ")",
         )
         if ind1 != "1":
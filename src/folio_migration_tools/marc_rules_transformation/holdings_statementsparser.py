@@ -1,13 +1,13 @@
 import calendar
 import contextlib
 import logging
-import re
 import i18n
 from typing import List
 
 from pymarc import Field
 from pymarc import Record
 
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 
 
@@ -134,7 +134,7 @@ class HoldingsStatementsParser:
             return_dict["statement"]["note"] = linked_value_fields["z"]
         if "x" in linked_value_fields:
             return_dict["statement"]["staffNote"] = linked_value_fields["x"]
-        stmt = re.sub(" +", " ", stmt)
+        stmt = regex_patterns.REPEATED_SPACES.sub(" ", stmt)
         return_dict["statement"]["statement"] = stmt
         return return_dict
 
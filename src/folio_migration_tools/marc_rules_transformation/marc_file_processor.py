@@ -1,7 +1,9 @@
+import io
 import logging
 import sys
 import time
 import traceback
+from itertools import islice
 from typing import List
 import i18n
 
@@ -10,6 +12,8 @@ from pymarc import Field
 from pymarc import Record
 from pymarc import Subfield
 
+from folio_migration_tools import i18n_cache
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.folder_structure import FolderStructure
@@ -30,12 +34,15 @@ class MarcFileProcessor:
         self.folder_structure: FolderStructure = folder_structure
         self.mapper: RulesMapperBase = mapper
         self.created_objects_file = created_objects_file
-        self.srs_records_file = open(self.folder_structure.srs_records_path, "w+")
+        self.srs_records_file = open_results_file(self.folder_structure.srs_records_path, "w+")
         self.unique_001s: set = set()
         self.failed_records_count: int = 0
         self.records_count: int = 0
         self.start: float = time.time()
         self.legacy_ids: set = set()
+        self.hrid_start: int = 0
+        self.dispatched_records: int = 0
+        self.worker_processes: int = 1
         if (
             self.object_type == FOLIONamespaces.holdings
             and self.mapper.task_configuration.create_source_records
@@ -82,7 +89,7 @@ class MarcFileProcessor:
                     )
                 Helper.write_to_file(self.created_objects_file, folio_rec)
                 self.mapper.migration_report.add_general_statistics(
-                    i18n.t("Inventory records written to disk")
+                    i18n_cache.t("Inventory records written to disk")
                 )
                 self.exit_on_too_many_exceptions()
 
@@ -116,6 +123,139 @@ class MarcFileProcessor:
                     ):
                         self.mapper.remove_from_id_map(folio_rec.get("formerIds", []))
 
+    def start_chunk(self, record_offset: int):
+        """Prepares the processor in a worker process for transforming a chunk of records.
+
+        The counters, report and id map of the mapper are emptied, so that the chunk result
+        only holds what the chunk added, and the output goes to buffers. Enumerated HRIDs start
+        at the HRID counter plus the number of records read before the chunk, so that the HRIDs
+        only depend on the position of the records in the files.
+
+        Args:
+            record_offset (int): Number of records in all files before the chunk
+        """
+        self.mapper.migration_report.report.clear()
+        self.mapper.mapped_folio_fields.clear()
+        self.mapper.mapped_legacy_fields.clear()
+        self.mapper.marc_field_stats.clear()
+        self.mapper.id_map.clear()
+        self.mapper.parsed_records = 0
+        self.mapper.extradata_writer.cache = []
+        self.legacy_ids = set()
+        self.records_count = 0
+        self.failed_records_count = 0
+        self.set_hrid_counter(self.hrid_start + record_offset)
+        self.created_objects_file = io.StringIO()
+        self.srs_records_file = io.StringIO()
+
+    def get_chunk_result(self, recorder: "ChunkRecorder", failed_marc_records: bytes) -> dict:
+        """Collects the output of a chunk transformed in a worker process.
+
+        The output, report entries and extradata of every record are kept apart, so that the
+        main process can drop records with legacy ids already used by an earlier chunk.
+
+        Args:
+            recorder (ChunkRecorder): The recorder the chunk was read through
+            failed_marc_records (bytes): The records that could not be parsed
+
+        Returns:
+            dict: The output of the records and everything the mapper counted
+        """
+        self.mapper.report_marc_field_stats()
+        created_text = self.created_objects_file.getvalue()
+        srs_text = self.srs_records_file.getvalue()
+        return {
+            "records": [
+                (
+                    id_tuples,
+                    created_text[created_start:created_end],
+                    srs_text[srs_start:srs_end],
+                    report_entries,
+                    extradata,
+                )
+                for (
+                    id_tuples,
+                    (created_start, created_end),
+                    (srs_start, srs_end),
+                    report_entries,
+                    extradata,
+                ) in recorder.records
+            ],
+            "failed_marc_records": failed_marc_records,
+            "extradata": self.mapper.extradata_writer.cache,
+            "migration_report": self.mapper.migration_report,
+            "mapped_folio_fields": self.mapper.mapped_folio_fields,
+            "mapped_legacy_fields": self.mapper.mapped_legacy_fields,
+            "parsed_records": self.mapper.parsed_records,
+            "records_count": self.records_count,
+            "failed_records_count": self.failed_records_count,
+            "hrid_counter": self.get_hrid_counter(),
+        }
+
+    def merge_chunk(self, chunk_result: dict, failed_marc_records_file):
+        """Writes out the records of a chunk transformed by a worker process, in file order.
+
+        Records whose legacy ids were all used by earlier chunks fail, just like they would
+        have when transformed in a single process. Their report entries are taken back out
+        of the merged report and their extradata is not written.
+
+        Args:
+            chunk_result (dict): What get_chunk_result returned in the worker process
+            failed_marc_records_file: The file to write the records that could not be parsed to
+        """
+        self.mapper.migration_report.merge(chunk_result["migration_report"])
+        records = chunk_result["records"]
+        for id_tuples, created_text, srs_text, report_entries, extradata in records:
+            new_ids = [(i, t) for i, t in id_tuples if i not in self.legacy_ids]
+            if id_tuples and not new_ids:
+                self.mapper.migration_report.discard(report_entries)
+                self.mapper.migration_report.add_general_statistics(
+                    i18n_cache.t("Duplicate MARC record identifiers ")
+                )
+                self.mapper.migration_report.add_general_statistics(
+                    i18n_cache.t("Failed records. No unique record identifiers in legacy record")
+                )
+                Helper.log_data_issue(
+                    "-".join(i for i, _ in id_tuples), "Duplicate record identifier(s)", ""
+                )
+                self.failed_records_count += 1
+                continue
+            for legacy_id, id_tuple in new_ids:
+                self.legacy_ids.add(legacy_id)
+                self.mapper.id_map[legacy_id] = id_tuple
+            self.created_objects_file.write(created_text)
+            self.srs_records_file.write(srs_text)
+            self.mapper.extradata_writer.cache.extend(extradata)
+        failed_marc_records_file.write(chunk_result["failed_marc_records"])
+        self.mapper.extradata_writer.cache.extend(chunk_result["extradata"])
+        self.mapper.extradata_writer.write("", {})
+        merge_field_counts(self.mapper.mapped_folio_fields, chunk_result["mapped_folio_fields"])
+        merge_field_counts(self.mapper.mapped_legacy_fields, chunk_result["mapped_legacy_fields"])
+        parsed_before = self.mapper.parsed_records
+        self.mapper.parsed_records += chunk_result["parsed_records"]
+        self.records_count += chunk_result["records_count"]
+        self.failed_records_count += chunk_result["failed_records_count"]
+        self.set_hrid_counter(max(self.get_hrid_counter(), chunk_result["hrid_counter"]))
+        if parsed_before // 10000 != self.mapper.parsed_records // 10000:
+            elapsed = self.mapper.parsed_records / (time.time() - self.start)
+            logging.info(
+                "%s records processed. Recs/sec: %s",
+                f"{self.mapper.parsed_records:,}",
+                "{0:.4g}".format(elapsed),
+            )
+        self.exit_on_too_many_exceptions()
+
+    def get_hrid_counter(self) -> int:
+        if self.object_type == FOLIONamespaces.holdings:
+            return self.mapper.hrid_handler.holdings_hrid_counter
+        return self.mapper.hrid_handler.instance_hrid_counter
+
+    def set_hrid_counter(self, counter: int):
+        if self.object_type == FOLIONamespaces.holdings:
+            self.mapper.hrid_handler.holdings_hrid_counter = counter
+        else:
+            self.mapper.hrid_handler.instance_hrid_counter = counter
+
     def save_srs_record(
         self,
         marc_record: Record,
@@ -158,17 +298,12 @@ class MarcFileProcessor:
             legacy_ids,
             file_def.discovery_suppressed,
         )
-        self.mapper.migration_report.add_general_statistics(i18n.t("SRS records written to disk"))
+        self.mapper.migration_report.add_general_statistics(
+            i18n_cache.t("SRS records written to disk")
+        )
 
     def add_mapped_location_code_to_record(self, marc_record, folio_rec):
-        location_code = next(
-            (
-                location["code"]
-                for location in self.mapper.folio_client.locations
-                if location["id"] == folio_rec["permanentLocationId"]
-            ),
-            None,
-        )
+        location_code = self.mapper.get_location_code(folio_rec["permanentLocationId"])
         if "852" not in marc_record:
             raise TransformationRecordFailedError(
                 "", "No 852 in record when storing new location code", ""
@@ -178,11 +313,11 @@ class MarcFileProcessor:
         while old_b := first_852.delete_subfield("b"):
             first_852.add_subfield("x", old_b, 0)
             self.mapper.migration_report.add(
-                "LocationMapping", i18n.t("Additional 852$b was moved to 852$x")
+                "LocationMapping", i18n_cache.t("Additional 852$b was moved to 852$x")
             )
         first_852.add_subfield("b", location_code, 0)
         self.mapper.migration_report.add(
-            "LocationMapping", i18n.t("Set 852 to FOLIO location code")
+            "LocationMapping", i18n_cache.t("Set 852 to FOLIO location code")
         )
 
     def exit_on_too_many_exceptions(self):
@@ -205,10 +340,10 @@ class MarcFileProcessor:
                 new_ids.add(legacy_id)
             else:
                 migration_report.add_general_statistics(
-                    i18n.t("Duplicate MARC record identifiers ")
+                    i18n_cache.t("Duplicate MARC record identifiers ")
                 )
         if not any(new_ids):
-            s = i18n.t("Failed records. No unique record identifiers in legacy record")
+            s = i18n_cache.t("Failed records. No unique record identifiers in legacy record")
             migration_report.add_general_statistics(s)
             raise TransformationRecordFailedError(
                 "-".join(legacy_ids),
@@ -226,9 +361,10 @@ class MarcFileProcessor:
         )
         self.mapper.save_id_map_file(self.folder_structure.id_map_path, self.mapper.id_map)
         logging.info("%s records processed", self.records_count)
+        self.mapper.report_marc_field_stats()
         with open(self.folder_structure.migration_reports_file, "w+") as report_file:
             self.mapper.migration_report.write_migration_report(
-                i18n.t("MFHD records transformation report"),
+                i18n_cache.t("MFHD records transformation report"),
                 report_file,
                 self.mapper.start_datetime,
             )
@@ -258,3 +394,54 @@ class MarcFileProcessor:
                     "Legacy ID already added to Legacy Id map.",
                     ",".join(filtered_legacy_ids),
                 )
+
+
+class ChunkRecorder:
+    """Stands in for the MarcFileProcessor when reading a chunk in a worker process.
+
+    Keeps track of the legacy ids each record added to the id map, of where the
+    output of each record starts and ends in the buffers of the processor, and of the
+    report entries and extradata of each record. The extradata is taken out of the
+    cache of the writer, so that nothing is written to the extradata file by the worker.
+    """
+
+    def __init__(self, processor: MarcFileProcessor):
+        self.processor = processor
+        self.mapper = processor.mapper
+        self.records: list = []
+
+    def process_record(self, idx: int, marc_record: Record, file_def: FileDefinition):
+        id_count = len(self.mapper.id_map)
+        created_start = self.processor.created_objects_file.tell()
+        srs_start = self.processor.srs_records_file.tell()
+        extradata_start = len(self.mapper.extradata_writer.cache)
+        self.mapper.migration_report.start_recording()
+        try:
+            self.processor.process_record(idx, marc_record, file_def)
+        finally:
+            report_entries = self.mapper.migration_report.stop_recording()
+            extradata = self.mapper.extradata_writer.cache[extradata_start:]
+            del self.mapper.extradata_writer.cache[extradata_start:]
+            self.records.append(
+                (
+                    list(islice(self.mapper.id_map.items(), id_count, None)),
+                    (created_start, self.processor.created_objects_file.tell()),
+                    (srs_start, self.processor.srs_records_file.tell()),
+                    report_entries,
+                    extradata,
+                )
+            )
+
+
+def merge_field_counts(field_counts: dict, other_field_counts: dict):
+    """Adds the mapped field counters of a worker process to the ones of the main process
+
+    Args:
+        field_counts (dict): Counters to add to
+        other_field_counts (dict): Counters from the worker process
+    """
+    for field_name, counts in other_field_counts.items():
+        merged = field_counts.setdefault(field_name, [])
+        merged.extend([0] * (len(counts) - len(merged)))
+        for i, count in enumerate(counts):
+            merged[i] += count
@@ -1,18 +1,46 @@
+import io
+import json
 import logging
+import mmap
+import multiprocessing
 import sys
 import i18n
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from io import IOBase
 from pathlib import Path
-
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from defusedxml.ElementTree import iterparse
+from defusedxml.ElementTree import tostring
+from pymarc import Field
+from pymarc import Leader
 from pymarc import MARCReader
 from pymarc import Record
+from pymarc import Subfield
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.folder_structure import FolderStructure
 from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.library_configuration import HridHandling
+from folio_migration_tools.library_configuration import MarcFileFormat
+from folio_migration_tools.marc_rules_transformation.marc_file_processor import (
+    ChunkRecorder,
+)
 from folio_migration_tools.migration_report import MigrationReport
 
+# Number of records handed to a worker process at a time
+CHUNK_SIZE = 1000
+
+# The processor of the main process, inherited by the forked worker processes
+worker_processor = None
+
+MARCXML_NAMESPACE = "{http://www.loc.gov/MARC21/slim}"
+
 
 class MARCReaderWrapper:
     @staticmethod
@@ -21,6 +49,7 @@ class MARCReaderWrapper:
         processor,
         failed_records_path: Path,
         folder_structure: FolderStructure,
+        pool: ProcessPoolExecutor = None,
     ):
         try:
             with open(failed_records_path, "ab") as failed_marc_records_file:
@@ -28,29 +57,60 @@ class MARCReaderWrapper:
                     folder_structure.legacy_records_folder / file_def.file_name,
                     "rb",
                 ) as marc_file:
-                    reader = MARCReader(marc_file, to_unicode=True, permissive=True)
-                    reader.hide_utf8_warnings = True
-                    reader.force_utf8 = False
                     logging.info("Running %s", file_def.file_name)
-                    MARCReaderWrapper.read_records(
-                        reader, file_def, failed_marc_records_file, processor
-                    )
+                    if pool and file_def.marc_file_format != MarcFileFormat.marc21:
+                        logging.info(
+                            "%s is not MARC21. Transforming the records in a single process",
+                            file_def.file_name,
+                        )
+                    if pool and file_def.marc_file_format == MarcFileFormat.marc21:
+                        MARCReaderWrapper.read_records_in_processes(
+                            marc_file, file_def, failed_marc_records_file, processor, pool
+                        )
+                    else:
+                        reader = MARCReaderWrapper.get_reader(marc_file, file_def)
+                        MARCReaderWrapper.read_records(
+                            reader, file_def, failed_marc_records_file, processor
+                        )
         except TransformationProcessError as tpe:
             logging.critical(tpe)
             sys.exit(1)
         except Exception:
             logging.exception("Failure in Main: %s", file_def.file_name, stack_info=True)
 
+    @staticmethod
+    def get_reader(marc_file, file_def: FileDefinition):
+        """Picks the reader for the format of the file. All readers are permissive, returning
+        None for records that could not be read and keeping the record in current_chunk.
+
+        Args:
+            marc_file: The file, opened in binary mode
+            file_def (FileDefinition): The file definition
+
+        Returns:
+            An iterable of pymarc Records
+        """
+        if file_def.marc_file_format == MarcFileFormat.marcxml:
+            return MARCXMLReader(marc_file)
+        if file_def.marc_file_format == MarcFileFormat.marcjson:
+            return MARCJSONLinesReader(marc_file)
+        reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+        reader.hide_utf8_warnings = True
+        reader.force_utf8 = False
+        return reader
+
     @staticmethod
     def read_records(
         reader,
         source_file: FileDefinition,
         failed_records_file: IOBase,
         processor,
+        start_index: int = 0,
     ):
-        for idx, record in enumerate(reader):
+        idx = start_index - 1
+        for idx, record in enumerate(reader, start_index):
             processor.mapper.migration_report.add_general_statistics(
-                i18n.t("Records in file before parsing")
+                i18n_cache.t("Records in file before parsing")
             )
             try:
                 # None = Something bad happened
@@ -66,17 +126,91 @@ class MARCReaderWrapper:
                 else:
                     MARCReaderWrapper.set_leader(record, processor.mapper.migration_report)
                     processor.mapper.migration_report.add_general_statistics(
-                        i18n.t("Records successfully decoded from MARC21"),
+                        i18n_cache.t("Records successfully decoded from MARC21"),
                     )
                     processor.process_record(idx, record, source_file)
             except TransformationRecordFailedError as error:
                 error.log_it()
                 processor.mapper.migration_report.add_general_statistics(
-                    i18n.t("Records that failed transformation. Check log for details"),
+                    i18n_cache.t("Records that failed transformation. Check log for details"),
                 )
             except ValueError as error:
                 logging.error(error)
-        logging.info("Done reading %s records from file", idx + 1)
+        logging.info("Done reading %s records from file", idx + 1 - start_index)
+
+    @staticmethod
+    def create_process_pool(processor, worker_processes: int):
+        """Sets up the worker processes for transforming records in parallel.
+
+        The workers are forked from this process, so that every worker gets its own copy
+        of the mapper without fetching the reference data from FOLIO again.
+
+        Args:
+            processor (MarcFileProcessor): The processor to copy into the workers
+            worker_processes (int): Number of worker processes
+
+        Returns:
+            ProcessPoolExecutor: The pool, or None if the records are to be transformed here
+        """
+        global worker_processor
+        if worker_processes < 2:
+            return None
+        if processor.mapper.task_configuration.hrid_handling != HridHandling.default:
+            logging.info(
+                "HRIDs from 001 must be checked for duplicates in file order. "
+                "Transforming the records in a single process"
+            )
+            return None
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logging.info("Worker processes are not supported here. Using a single process")
+            return None
+        processor.hrid_start = processor.get_hrid_counter()
+        processor.worker_processes = worker_processes
+        worker_processor = processor
+        logging.info("Transforming records using %s processes", worker_processes)
+        return ProcessPoolExecutor(
+            max_workers=worker_processes, mp_context=multiprocessing.get_context("fork")
+        )
+
+    @staticmethod
+    def read_records_in_processes(
+        marc_file,
+        source_file: FileDefinition,
+        failed_records_file: IOBase,
+        processor,
+        pool: ProcessPoolExecutor,
+    ):
+        """Transforms the records in chunks in the worker processes.
+
+        The results are written out by processor.merge_chunk in the order the chunks were
+        read, so the output is the same from run to run regardless of the number of workers.
+
+        Args:
+            marc_file: The MARC21 file, opened in binary mode
+            source_file (FileDefinition): The file definition
+            failed_records_file (IOBase): File to write records that could not be parsed to
+            processor (MarcFileProcessor): The processor of the main process
+            pool (ProcessPoolExecutor): The worker processes
+        """
+        in_flight: deque = deque()
+        start_index = 0
+        for raw_records in read_raw_records(marc_file, CHUNK_SIZE):
+            if len(in_flight) >= 2 * processor.worker_processes:
+                processor.merge_chunk(in_flight.popleft().result(), failed_records_file)
+            in_flight.append(
+                pool.submit(
+                    transform_chunk,
+                    raw_records,
+                    start_index,
+                    processor.dispatched_records,
+                    source_file,
+                )
+            )
+            start_index += len(raw_records)
+            processor.dispatched_records += len(raw_records)
+        while in_flight:
+            processor.merge_chunk(in_flight.popleft().result(), failed_records_file)
+        logging.info("Done reading %s records from file", start_index)
 
     @staticmethod
     def set_leader(marc_record: Record, migration_report: MigrationReport):
@@ -118,11 +252,245 @@ class MARCReaderWrapper:
             marc_record.leader = f"{marc_record.leader[:11]}2{marc_record.leader[12:]}"
 
 
+class RawMARCReader:
+    """Decodes MARC21 records that have already been split out of the file.
+
+    Behaves like a permissive pymarc.MARCReader: records that cannot be decoded are
+    returned as None, with the record in current_chunk and the error in current_exception.
+    """
+
+    def __init__(self, raw_records: Iterable[bytes]):
+        self.raw_records = raw_records
+        self.current_chunk = b""
+        self.current_exception = None
+
+    def __iter__(self) -> Iterator[Record]:
+        for raw_record in self.raw_records:
+            self.current_chunk = raw_record
+            self.current_exception = None
+            try:
+                record = Record(
+                    data=raw_record, to_unicode=True, force_utf8=False, hide_utf8_warnings=True
+                )
+            except Exception as ee:
+                self.current_exception = ee
+                record = None
+            yield record
+
+
+class MARCXMLReader:
+    """Streams the records out of a MARCXML file.
+
+    The records are removed from the parsed tree once they have been read, so memory
+    use does not grow with the size of the file. Records that cannot be converted are
+    returned as None, with the record XML in current_chunk.
+    """
+
+    def __init__(self, xml_file):
+        self.xml_file = xml_file
+        self.current_chunk = b""
+        self.current_exception = None
+
+    def __iter__(self) -> Iterator[Record]:
+        parents: list = []
+        for event, element in iterparse(self.xml_file, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            if element.tag not in (f"{MARCXML_NAMESPACE}record", "record"):
+                continue
+            try:
+                record = record_from_marcxml(element)
+                self.current_exception = None
+            except Exception as ee:
+                self.current_chunk = tostring(element, encoding="utf-8")
+                self.current_exception = ee
+                record = None
+            if parents:
+                parents[-1].remove(element)
+            yield record
+
+
+class MARCJSONLinesReader:
+    """Reads MARC-in-JSON records, one record per line.
+
+    Records that cannot be converted are returned as None, with the line in current_chunk.
+    """
+
+    def __init__(self, json_file):
+        self.json_file = json_file
+        self.current_chunk = b""
+        self.current_exception = None
+
+    def __iter__(self) -> Iterator[Record]:
+        for line in self.json_file:
+            if not line.strip():
+                continue
+            try:
+                record = record_from_marc_json(json.loads(line))
+                self.current_exception = None
+            except Exception as ee:
+                self.current_chunk = line
+                self.current_exception = ee
+                record = None
+            yield record
+
+
+def record_from_marcxml(element) -> Record:
+    """Builds a pymarc Record from a MARCXML record element
+
+    Args:
+        element (xml.etree.ElementTree.Element): The record element
+
+    Returns:
+        Record: The record
+    """
+    record = Record(to_unicode=True, force_utf8=True)
+    for child in element:
+        name = child.tag.rpartition("}")[2]
+        if name == "leader":
+            record.leader = Leader(child.text or "")
+        elif name == "controlfield":
+            record.add_field(Field(tag=child.get("tag"), data=child.text or ""))
+        elif name == "datafield":
+            record.add_field(
+                Field(
+                    tag=child.get("tag"),
+                    indicators=[child.get("ind1", " "), child.get("ind2", " ")],
+                    subfields=[
+                        Subfield(code=subfield.get("code"), value=subfield.text or "")
+                        for subfield in child
+                        if subfield.tag.rpartition("}")[2] == "subfield"
+                    ],
+                )
+            )
+    return record
+
+
+def record_from_marc_json(marc_json: dict) -> Record:
+    """Builds a pymarc Record from a MARC-in-JSON record
+
+    Args:
+        marc_json (dict): The record, as produced by pymarc's Record.as_dict()
+
+    Returns:
+        Record: The record
+    """
+    record = Record(to_unicode=True, force_utf8=True)
+    record.leader = Leader(marc_json["leader"])
+    for field in marc_json["fields"]:
+        for tag, content in field.items():
+            if isinstance(content, dict):
+                record.add_field(
+                    Field(
+                        tag=tag,
+                        indicators=[content.get("ind1", " "), content.get("ind2", " ")],
+                        subfields=[
+                            Subfield(code=code, value=value)
+                            for subfield in content.get("subfields", [])
+                            for code, value in subfield.items()
+                        ],
+                    )
+                )
+            else:
+                record.add_field(Field(tag=tag, data=content))
+    return record
+
+
+@contextmanager
+def map_marc_file(marc_file):
+    """Memory-maps a MARC21 file for reading, and closes the map when done. Empty files
+    and file objects that are not backed by a file on disk are read into memory instead.
+
+    Args:
+        marc_file: The MARC21 file, opened in binary mode
+
+    Yields:
+        The contents of the file, as an mmap or as bytes
+    """
+    try:
+        data = mmap.mmap(marc_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (io.UnsupportedOperation, ValueError):
+        yield marc_file.read()
+        return
+    with data:
+        yield data
+
+
+def split_marc_records(data) -> Iterator[bytes]:
+    """Splits MARC21 data into records using the record length in the leader.
+
+    Records with a missing or wrong record length are cut at the next end of record
+    character instead, so that a bad record does not take the rest of the file with it.
+
+    Args:
+        data: The MARC21 data, as bytes or an mmap
+
+    Yields:
+        bytes: The next record
+    """
+    position = 0
+    size = len(data)
+    while position < size:
+        record_length = data[position : position + 5]
+        end = position + int(record_length) if record_length.isdigit() else 0
+        if end <= position or end > size or data[end - 1] != 0x1D:
+            end = data.find(b"\x1d", position) + 1 or size
+        raw_record = data[position:end]
+        position = end
+        if raw_record.strip():
+            yield raw_record
+
+
+def read_raw_records(marc_file, chunk_size: int):
+    """Splits a MARC21 file into chunks of records, without parsing the records
+
+    Args:
+        marc_file: The MARC21 file, opened in binary mode
+        chunk_size (int): Number of records in a chunk
+
+    Yields:
+        List[bytes]: The records in the next chunk
+    """
+    records: List[bytes] = []
+    with map_marc_file(marc_file) as data:
+        for raw_record in split_marc_records(data):
+            records.append(raw_record)
+            if len(records) == chunk_size:
+                yield records
+                records = []
+    if records:
+        yield records
+
+
+def transform_chunk(
+    raw_records: List[bytes], start_index: int, record_offset: int, file_def: FileDefinition
+) -> dict:
+    """Transforms a chunk of records in a worker process
+
+    Args:
+        raw_records (List[bytes]): The MARC21 records of the chunk
+        start_index (int): Index in the file of the first record in the chunk
+        record_offset (int): Number of records in all files before the chunk
+        file_def (FileDefinition): The file the records come from
+
+    Returns:
+        dict: The output of the records and everything the mapper counted
+    """
+    worker_processor.start_chunk(record_offset)
+    recorder = ChunkRecorder(worker_processor)
+    failed_marc_records = io.BytesIO()
+    reader = RawMARCReader(raw_records)
+    MARCReaderWrapper.read_records(reader, file_def, failed_marc_records, recorder, start_index)
+    return worker_processor.get_chunk_result(recorder, failed_marc_records.getvalue())
+
+
 def report_failed_parsing(
     reader, source_file, failed_bibs_file, idx, migration_report: MigrationReport
 ):
     migration_report.add_general_statistics(
-        i18n.t("Records with encoding errors - parsing failed"),
+        i18n_cache.t("Records with encoding errors - parsing failed"),
     )
     failed_bibs_file.write(reader.current_chunk)
     raise TransformationRecordFailedError(
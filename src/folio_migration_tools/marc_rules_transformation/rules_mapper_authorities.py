@@ -1,7 +1,6 @@
 """The default mapper, responsible for parsing MARC21 records acording to the
 FOLIO community specifications"""
 import logging
-import re
 import time
 import uuid
 import i18n
@@ -13,6 +12,7 @@ from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 from pymarc import Record
 
+from folio_migration_tools import regex_patterns
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.helper import Helper
 from folio_migration_tools.library_configuration import FileDefinition
@@ -147,13 +147,12 @@ class AuthorityMapper(RulesMapperBase):
 
     def map_source_file_and_natural_id(self, marc_record, folio_authority):
         """Implement source file and natural ID mappings according to MODDICORE-283"""
-        match_prefix_patt = re.compile("^[A-Za-z]+")
         natural_id = None
         source_file_id = None
         has_010 = marc_record.get("010")
         if has_010 and (has_010a := has_010.get_subfields("a")):
             for a_subfield in has_010a:
-                natural_id_prefix = match_prefix_patt.match(a_subfield)
+                natural_id_prefix = regex_patterns.ALPHABETIC_PREFIX.match(a_subfield)
                 if natural_id_prefix and (
                     source_file := self.source_file_mapping.get(natural_id_prefix.group(0), None)
                 ):
@@ -173,7 +172,7 @@ class AuthorityMapper(RulesMapperBase):
             self.migration_report.add_general_statistics(
                 i18n.t("naturalId mapped from %{fro}", fro="001")
             )
-            natural_id_prefix = match_prefix_patt.match(natural_id)
+            natural_id_prefix = regex_patterns.ALPHABETIC_PREFIX.match(natural_id)
             if natural_id_prefix:
                 if source_file := self.source_file_mapping.get(natural_id_prefix.group(0), None):
                     source_file_id = source_file["id"]
@@ -6,6 +6,7 @@ import urllib.parse
 import uuid
 import i18n
 from abc import abstractmethod
+from collections import Counter
 from textwrap import wrap
 from typing import List
 from typing import Tuple
@@ -20,6 +21,7 @@ from pymarc import Leader
 from pymarc import Record
 from pymarc import Subfield
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
@@ -51,6 +53,12 @@ class RulesMapperBase(MapperBase):
         self.conditions = conditions
         self.item_json_schema = ""
         self.mappings: dict = {}
+        self.mapping_plans: dict[int, MappingPlan] = {}
+        self.target_schema_paths: dict[str, list] = {}
+        self.marc_field_stats: Counter = Counter()
+        self.authority_sources_sample_rate: int = getattr(
+            self.task_configuration, "authority_sources_sample_rate", 1
+        )
         self.schema_properties = None
         if hasattr(self.task_configuration, "hrid_handling"):
             self.hrid_handler = HRIDHandler(
@@ -92,6 +100,25 @@ class RulesMapperBase(MapperBase):
                         res.append(v)
                 rec[key] = list(res)
 
+    def get_mapping_plan(self, mapping: dict) -> "MappingPlan":
+        """Returns the compiled plan for a mapping rule, compiling it on first use.
+
+        Plans are keyed on the identity of the mapping dict, since subclasses
+        replace or add mappings after this class has been initialized. The plan
+        keeps a reference to its mapping, so the id cannot be reused.
+
+        Args:
+            mapping (dict): A mapping rule from the mapping-rules
+
+        Returns:
+            MappingPlan: the compiled plan
+        """
+        plan = self.mapping_plans.get(id(mapping))
+        if plan is None:
+            plan = MappingPlan(mapping)
+            self.mapping_plans[id(mapping)] = plan
+        return plan
+
     def map_field_according_to_mapping(
         self, marc_field: pymarc.Field, mappings, folio_record, legacy_ids
     ):
@@ -110,23 +137,17 @@ class RulesMapperBase(MapperBase):
                 tre.log_it()
 
     def handle_normal_mapping(self, mapping, marc_field: pymarc.Field, folio_record, legacy_ids):
-        target = mapping["target"]
-        if mapping.get("ignoreSubsequentSubfields", False):
+        plan = self.get_mapping_plan(mapping)
+        target = plan.target
+        if plan.ignore_subsequent_subfields:
             marc_field = self.remove_repeated_subfields(marc_field)
-        if has_conditions(mapping):
+        if plan.has_conditions:
             values = self.apply_rules(marc_field, mapping, legacy_ids)
             if marc_field.tag == "655":
                 values[0] = f"Genre: {values[0]}"
             self.add_value_to_target(folio_record, target, values)
-        elif has_value_to_add(mapping):
-            value = mapping["rules"][0]["value"]
-            # Stupid construct to avoid bool("false") == True
-            if value == "true":
-                self.add_value_to_target(folio_record, target, [True])
-            elif value == "false":
-                self.add_value_to_target(folio_record, target, [False])
-            else:
-                self.add_value_to_target(folio_record, target, [value])
+        elif plan.has_value_to_add:
+            self.add_value_to_target(folio_record, target, [plan.value_to_add])
         else:
             # Adding stuff without rules/Conditions.
             # Might need more complex mapping for arrays etc
@@ -184,26 +205,14 @@ class RulesMapperBase(MapperBase):
         parameter: dict = None,
     ):
         values: List[str] = []
-        if mapping.get("subfield") and (custom_delimiters := mapping.get("subFieldDelimiter")):
-            delimiter_map = {sub_f: " " for sub_f in mapping.get("subfield")}
-            for custom_delimiter in custom_delimiters:
-                delimiter_map.update(
-                    {sub_f: custom_delimiter["value"] for sub_f in custom_delimiter["subfields"]}
-                )
-            custom_delimited_strings: List[Tuple[str, List[str]]] = []
-            subfields = mapping.get("subfield")
-            for custom_delimiter in custom_delimiters:
-                subfields_for_delimiter = [
-                    sub_f
-                    for sub_f in subfields
-                    if custom_delimiter["subfields"]
-                    and delimiter_map[sub_f] == custom_delimiter["value"]
-                ]
-                subfield_collection: Tuple[str, List[str]] = (custom_delimiter["value"], [])
-                subfield_collection[1].extend(marc_field.get_subfields(*subfields_for_delimiter))
-                custom_delimited_strings.append(subfield_collection)
+        plan = self.get_mapping_plan(mapping)
+        if plan.delimiter_groups:
+            custom_delimited_strings: List[Tuple[str, List[str]]] = [
+                (delimiter, marc_field.get_subfields(*subfields_for_delimiter))
+                for delimiter, subfields_for_delimiter in plan.delimiter_groups
+            ]
             for custom_delimited_string in custom_delimited_strings:
-                if mapping.get("applyRulesOnConcatenatedData", ""):
+                if plan.apply_rules_on_concatenated_data:
                     values.extend(custom_delimited_string[1])
                 else:
                     values.extend(
@@ -221,8 +230,8 @@ class RulesMapperBase(MapperBase):
                         )
                     )
                 values = [custom_delimited_string[0].join(values)]
-        elif mapping.get("subfield", []):
-            values.extend(marc_field.get_subfields(*mapping["subfield"]))
+        elif plan.subfields:
+            values.extend(marc_field.get_subfields(*plan.subfields))
         return values
 
     def get_value_from_condition(
@@ -231,11 +240,11 @@ class RulesMapperBase(MapperBase):
         mapping,
         marc_field,
     ):
-        stripped_conds = mapping["rules"][0]["conditions"][0]["type"].split(",")
-        condition_types = list(map(str.strip, stripped_conds))
-        parameter = mapping["rules"][0]["conditions"][0].get("parameter", {})
+        plan = self.get_mapping_plan(mapping)
+        condition_types = plan.condition_types
+        parameter = plan.parameter
         values: List[str] = []
-        if mapping.get("subfield"):
+        if plan.subfields:
             values.extend(
                 self.handle_sub_field_delimiters(
                     legacy_id, mapping, marc_field, condition_types, parameter
@@ -244,7 +253,7 @@ class RulesMapperBase(MapperBase):
         else:
             values.append(marc_field.format_field() if marc_field else "")
 
-        if not mapping.get("applyRulesOnConcatenatedData", "") and mapping.get("subfield", []):
+        if not plan.apply_rules_on_concatenated_data and plan.subfields:
             return " ".join(
                 dict.fromkeys(
                     [
@@ -291,13 +300,13 @@ class RulesMapperBase(MapperBase):
     def perform_proxy_mapping(self, marc_field):
         proxy_mapping = next(iter(self.mappings.get("880", [])), [])
         if "6" not in marc_field:
-            self.migration_report.add("Field880Mappings", i18n.t("Records without $6"))
+            self.migration_report.add("Field880Mappings", i18n_cache.t("Records without $6"))
             return None
         if not proxy_mapping or not proxy_mapping.get("fieldReplacementBy3Digits", False):
             return None
         if not marc_field["6"][:3] or len(marc_field["6"][:3]) != 3:
             self.migration_report.add(
-                "Field880Mappings", i18n.t("Records with unexpected length in $6")
+                "Field880Mappings", i18n_cache.t("Records with unexpected length in $6")
             )
             return None
         first_three = marc_field["6"][:3]
@@ -312,16 +321,16 @@ class RulesMapperBase(MapperBase):
         )
         self.migration_report.add(
             "Field880Mappings",
-            i18n.t("Source digits")
+            i18n_cache.t("Source digits")
             + f": {marc_field['6']} "
-            + i18n.t("Target field")
+            + i18n_cache.t("Target field")
             + f": {target_field}",
         )
         mappings = self.mappings.get(target_field, {})
         if not mappings:
             self.migration_report.add(
                 "Field880Mappings",
-                i18n.t("Mapping not set up for target field")
+                i18n_cache.t("Mapping not set up for target field")
                 + f": {target_field} ({marc_field['6']})",
             )
         return mappings
@@ -329,8 +338,9 @@ class RulesMapperBase(MapperBase):
     def report_marc_stats(
         self, marc_field: Field, bad_tags, legacy_ids, ignored_subsequent_fields
     ):
-        self.migration_report.add("Trivia", i18n.t("Total number of Tags processed"))
-        self.report_source_and_links(marc_field)
+        self.marc_field_stats[(marc_field.tag, "", "")] += 1
+        if self.parsed_records % self.authority_sources_sample_rate == 0:
+            self.report_source_and_links(marc_field)
         self.report_bad_tags(marc_field, bad_tags, legacy_ids)
         mapped = marc_field.tag in self.mappings
         if marc_field.tag in ignored_subsequent_fields:
@@ -338,47 +348,82 @@ class RulesMapperBase(MapperBase):
         self.report_legacy_mapping(marc_field.tag, True, mapped)
 
     def report_source_and_links(self, marc_field: Field):
+        """Counts the $2 sources and the $0 source codes or base URIs of the field.
+
+        Only the part of the subfield that the source is taken from is counted, so the
+        counts stay few and the subfields are parsed once per distinct prefix, when
+        report_marc_field_stats adds them to the migration report.
+
+        Args:
+            marc_field (Field): The MARC field to count the sources of
+        """
         if marc_field.is_control_field():
             return
-        for subfield_2 in marc_field.get_subfields("2"):
-            self.migration_report.add(
-                "AuthoritySources",
-                i18n.t("Source of heading or term") + f": {subfield_2.split(' ')[0]}",
-            )
-        for subfield_0 in marc_field.get_subfields("0"):
-            code = ""
-            if "(" in subfield_0 and ")" in subfield_0:
-                code = subfield_0[subfield_0.find("(") + 1 : subfield_0.find(")")]
-                code = code.split(" ")[0]
-            elif url := urllib.parse.urlparse(subfield_0):
-                if url.hostname:
-                    code = subfield_0[: subfield_0.find(url.path)]
-            if code:
+        for code, value in marc_field.subfields:
+            if code == "2":
+                self.marc_field_stats[(marc_field.tag, "2", value)] += 1
+            elif code == "0":
+                if (start := value.find("(")) != -1 and (end := value.find(")")) != -1:
+                    prefix = value[: max(start, end) + 1]
+                elif (start := value.find("//")) != -1 and (
+                    end := value.find("/", start + 2)
+                ) != -1:
+                    prefix = value[:end]
+                else:
+                    continue
+                self.marc_field_stats[(marc_field.tag, "0", prefix)] += 1
+
+    def report_marc_field_stats(self):
+        """Adds the MARC field statistics counted since the last call to the migration report"""
+        for (_, code, prefix), count in self.marc_field_stats.items():
+            if not code:
                 self.migration_report.add(
-                    "AuthoritySources", i18n.t("$0 base uri or source code") + f": {code}"
+                    "Trivia", i18n_cache.t("Total number of Tags processed"), count
                 )
+            elif code == "2":
+                self.migration_report.add(
+                    "AuthoritySources",
+                    i18n_cache.t("Source of heading or term") + f": {prefix.split(' ')[0]}",
+                    count,
+                )
+            elif source_code := self.get_authority_source_code(prefix):
+                self.migration_report.add(
+                    "AuthoritySources",
+                    i18n_cache.t("$0 base uri or source code") + f": {source_code}",
+                    count,
+                )
+        self.marc_field_stats.clear()
+
+    @staticmethod
+    def get_authority_source_code(prefix: str) -> str:
+        """Returns the source code or base URI of a $0 prefix counted by report_source_and_links
+
+        Args:
+            prefix (str): The $0 up to its source code, or up to the path of its URI
+
+        Returns:
+            str: The source code in parentheses, or the base URI
+        """
+        if "(" in prefix and ")" in prefix:
+            return prefix[prefix.find("(") + 1 : prefix.find(")")].split(" ")[0]
+        url = urllib.parse.urlparse(prefix)
+        if url.hostname and not (url.query or url.fragment):
+            return prefix
+        return ""
 
     def apply_rules(self, marc_field: pymarc.Field, mapping, legacy_ids):
         try:
-            values = []
-            value = ""
-            if has_conditions(mapping):
+            plan = self.get_mapping_plan(mapping)
+            if plan.has_conditions:
                 value = self.get_value_from_condition(",".join(legacy_ids), mapping, marc_field)
-            elif has_value_to_add(mapping):
-                value = mapping["rules"][0]["value"]
-                if value == "false":
-                    return [False]
-                elif value == "true":
-                    return [True]
-                else:
-                    return [value]
-            elif not mapping.get("rules", []) or not mapping["rules"][0].get("conditions", []):
+            elif plan.has_value_to_add:
+                return [plan.value_to_add]
+            else:
                 values = self.handle_sub_field_delimiters(
                     ",".join(legacy_ids), mapping, marc_field
                 )
                 value = " ".join(values)
-            values = wrap(value, 3) if mapping.get("subFieldSplit", "") else [value]
-            return values
+            return wrap(value, 3) if plan.subfield_split else [value]
         except TransformationProcessError as trpe:
             self.handle_transformation_process_error(self.parsed_records, trpe)
         except TransformationFieldMappingError as fme:
@@ -394,7 +439,7 @@ class RulesMapperBase(MapperBase):
             )
             trfe.log_it()
             self.migration_report.add_general_statistics(
-                i18n.t("Records failed due to an error. See data issues log for details")
+                i18n_cache.t("Records failed due to an error. See data issues log for details")
             )
         except Exception as exception:
             self.handle_generic_exception(self.parsed_records, exception)
@@ -413,19 +458,13 @@ class RulesMapperBase(MapperBase):
     def add_value_to_target(self, rec, target_string, value):
         if not value:
             return
-        targets = target_string.split(".")
-        if len(targets) == 1:
+        if "." not in target_string:
             self.add_value_to_first_level_target(rec, target_string, value)
         else:
             schema_parent = None
             parent = None
             schema_properties = self.schema["properties"]
-            sc_prop = schema_properties
-            for target in targets:  # Iterate over names in hierarcy
-                if target in sc_prop:  # property is on this level
-                    sc_prop = sc_prop[target]  # set current property
-                else:  # next level. take the properties from the items
-                    sc_prop = schema_parent["items"]["properties"][target]
+            for target, sc_prop in self.get_target_schema_path(target_string):
                 if target not in rec and not schema_parent:  # have we added this already?
                     if is_array_of_strings(sc_prop):
                         rec[target] = []
@@ -479,6 +518,29 @@ class RulesMapperBase(MapperBase):
                 schema_parent = sc_prop
                 parent = target
 
+    def get_target_schema_path(self, target_string: str) -> list:
+        """Resolves each name in a dotted target to its node in the schema, once per target.
+
+        Args:
+            target_string (str): a target like "identifiers.value"
+
+        Returns:
+            list: (name, schema property) pairs, in hierarchy order
+        """
+        if target_string not in self.target_schema_paths:
+            schema_path = []
+            schema_parent = None
+            sc_prop = self.schema["properties"]
+            for target in target_string.split("."):  # Iterate over names in hierarcy
+                if target in sc_prop:  # property is on this level
+                    sc_prop = sc_prop[target]  # set current property
+                else:  # next level. take the properties from the items
+                    sc_prop = schema_parent["items"]["properties"][target]
+                schema_path.append((target, sc_prop))
+                schema_parent = sc_prop
+            self.target_schema_paths[target_string] = schema_path
+        return self.target_schema_paths[target_string]
+
     def add_value_to_first_level_target(self, rec, target_string, value):
         sch = self.schema["properties"]
         if (
@@ -491,17 +553,17 @@ class RulesMapperBase(MapperBase):
             except Exception as ee:
                 Helper.log_data_issue("", f"Could not parse catalogedDate: {ee}", value)
                 self.migration_report.add(
-                    "FieldMappingErrors", i18n.t("Could not parse catalogedDate")
+                    "FieldMappingErrors", i18n_cache.t("Could not parse catalogedDate")
                 )
         if not target_string or target_string not in sch:
             raise TransformationFieldMappingError(
                 "",
                 i18n.t("Target string '%{string}' not in Schema!", string=target_string)
-                + i18n.t("Check mapping file against the schema.")
+                + i18n_cache.t("Check mapping file against the schema.")
                 + " "
-                + i18n.t("Target type")
+                + i18n_cache.t("Target type")
                 + f": {sch.get(target_string,{}).get('type','')} "
-                + i18n.t("Value")
+                + i18n_cache.t("Value")
                 + f": {value}",
                 "",
             )
@@ -548,7 +610,7 @@ class RulesMapperBase(MapperBase):
         else:
             req_entity_props = []
         for entity_mapping in entity_mappings:
-            k = entity_mapping["target"].split(".")[-1]
+            k = self.get_mapping_plan(entity_mapping).target_key
             if my_values := [
                 v
                 for v in self.apply_rules(marc_field, entity_mapping, index_or_legacy_id)
@@ -560,7 +622,7 @@ class RulesMapperBase(MapperBase):
                     entity = my_values[0]
             elif "alternativeMapping" in entity_mapping:
                 alt_mapping = entity_mapping["alternativeMapping"]
-                alt_k = alt_mapping["target"].split(".")[-1]
+                alt_k = self.get_mapping_plan(alt_mapping).target_key
                 if alt_values := [
                     v
                     for v in self.apply_rules(marc_field, alt_mapping, index_or_legacy_id)
@@ -630,16 +692,19 @@ class RulesMapperBase(MapperBase):
         folio_record["discoverySuppress"] = file_def.discovery_suppressed
         self.migration_report.add(
             "Suppression",
-            i18n.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
+            i18n_cache.t("Suppressed from discovery") + f' = {folio_record["discoverySuppress"]}',
         )
         if not only_discovery_suppress:
             folio_record["staffSuppress"] = file_def.staff_suppressed
             self.migration_report.add(
-                "Suppression", i18n.t("Staff suppressed") + f' = {folio_record["staffSuppress"]} '
+                "Suppression",
+                i18n_cache.t("Staff suppressed") + f' = {folio_record["staffSuppress"]} ',
             )
 
     def create_preceding_succeeding_titles(self, entity, e_parent, identifier):
-        self.migration_report.add("PrecedingSuccedingTitles", f"{e_parent} " + i18n.t("created"))
+        self.migration_report.add(
+            "PrecedingSuccedingTitles", f"{e_parent} " + i18n_cache.t("created")
+        )
         # TODO: Make these uuids deterministic
         new_entity = {
             "id": str(uuid.uuid4()),
@@ -867,42 +932,133 @@ class RulesMapperBase(MapperBase):
             FOLIONamespaces.edifact: "EDIFACT",
         }
 
-        id_holders = {
-            FOLIONamespaces.instances: {
+        # Only the authority id holder reads the 001, which other records may lack
+        if record_type == FOLIONamespaces.instances:
+            id_holder = {
                 "instanceId": folio_object["id"],
                 "instanceHrid": folio_object.get("hrid", ""),
-            },
-            FOLIONamespaces.holdings: {
+            }
+        elif record_type == FOLIONamespaces.holdings:
+            id_holder = {
                 "holdingsId": folio_object["id"],
                 "holdingsHrid": folio_object.get("hrid", ""),
-            },
-            FOLIONamespaces.authorities: {
+            }
+        elif record_type == FOLIONamespaces.authorities:
+            id_holder = {
                 "authorityId": folio_object["id"],
                 "authorityHrid": marc_record["001"].data,
-            },
-            FOLIONamespaces.edifact: {},
-        }
+            }
+        elif record_type == FOLIONamespaces.edifact:
+            id_holder = {}
+        else:
+            id_holder = None
 
-        my_tuple_json = marc_record.as_json()
-        raw_record = {"id": srs_id, "content": my_tuple_json}
-        parsed_record = {"id": srs_id, "content": json.loads(my_tuple_json)}
-        record = {
+        # The MARC record is serialized once. The string goes into rawRecord as it is, and
+        # is spliced into the envelope as the parsedRecord content, since json.dumps would
+        # give the exact same text for the parsed content.
+        marc_json = json.dumps(marc_record.as_dict())
+        leader_05 = str(marc_record.leader)[5]
+        head = {
             "id": srs_id,
             "deleted": False,
             "matchedId": srs_id,
             "generation": 0,
             "recordType": record_types.get(record_type),
-            "rawRecord": raw_record,
-            "parsedRecord": parsed_record,
+            "rawRecord": {"id": srs_id, "content": marc_json},
+        }
+        tail = {
             "additionalInfo": {"suppressDiscovery": discovery_suppress},
-            "externalIdsHolder": id_holders.get(record_type),
+            "externalIdsHolder": id_holder,
             "metadata": metadata_obj,
             "state": "ACTUAL",
-            "leaderRecordStatus": parsed_record["content"]["leader"][5]
-            if parsed_record["content"]["leader"][5] in [*"acdnposx"]
-            else "d",
+            "leaderRecordStatus": leader_05 if leader_05 in [*"acdnposx"] else "d",
         }
-        return json.dumps(record)
+        parsed_record = f'"parsedRecord": {{"id": {json.dumps(srs_id)}, "content": {marc_json}}}'
+        return f"{json.dumps(head)[:-1]}, {parsed_record}, {json.dumps(tail)[1:]}"
+
+
+class MappingPlan:
+    """The parts of a mapping rule that do not depend on the MARC field, worked out once.
+
+    Args:
+        mapping (dict): A mapping rule from the mapping-rules
+    """
+
+    __slots__ = (
+        "mapping",
+        "target",
+        "target_key",
+        "has_conditions",
+        "has_value_to_add",
+        "value_to_add",
+        "condition_types",
+        "parameter",
+        "subfields",
+        "delimiter_groups",
+        "apply_rules_on_concatenated_data",
+        "subfield_split",
+        "ignore_subsequent_subfields",
+    )
+
+    def __init__(self, mapping: dict):
+        self.mapping = mapping
+        self.target = mapping.get("target", "")
+        self.target_key = self.target.split(".")[-1]
+        self.has_conditions = bool(has_conditions(mapping))
+        self.has_value_to_add = bool(has_value_to_add(mapping))
+        self.value_to_add = None
+        if self.has_value_to_add:
+            value = mapping["rules"][0]["value"]
+            # Stupid construct to avoid bool("false") == True
+            self.value_to_add = {"true": True, "false": False}.get(value, value)
+        self.condition_types: List[str] = []
+        self.parameter: dict = {}
+        if self.has_conditions:
+            condition = mapping["rules"][0]["conditions"][0]
+            self.condition_types = [c.strip() for c in condition.get("type", "").split(",")]
+            self.parameter = condition.get("parameter", {})
+        self.subfields: List[str] = mapping.get("subfield", [])
+        self.delimiter_groups = self.get_delimiter_groups(
+            self.subfields, mapping.get("subFieldDelimiter")
+        )
+        self.apply_rules_on_concatenated_data = bool(
+            mapping.get("applyRulesOnConcatenatedData", "")
+        )
+        self.subfield_split = bool(mapping.get("subFieldSplit", ""))
+        self.ignore_subsequent_subfields = bool(mapping.get("ignoreSubsequentSubfields", False))
+
+    @staticmethod
+    def get_delimiter_groups(
+        subfields: List[str], custom_delimiters
+    ) -> List[Tuple[str, List[str]]]:
+        """Groups the subfields by the delimiter they are to be joined with
+
+        Args:
+            subfields (List[str]): the subfields of the mapping
+            custom_delimiters: the subFieldDelimiter list of the mapping
+
+        Returns:
+            List[Tuple[str, List[str]]]: delimiter and subfields, per custom delimiter
+        """
+        if not subfields or not custom_delimiters:
+            return []
+        delimiter_map = {sub_f: " " for sub_f in subfields}
+        for custom_delimiter in custom_delimiters:
+            delimiter_map.update(
+                {sub_f: custom_delimiter["value"] for sub_f in custom_delimiter["subfields"]}
+            )
+        return [
+            (
+                custom_delimiter["value"],
+                [
+                    sub_f
+                    for sub_f in subfields
+                    if custom_delimiter["subfields"]
+                    and delimiter_map[sub_f] == custom_delimiter["value"]
+                ],
+            )
+            for custom_delimiter in custom_delimiters
+        ]
 
 
 def has_conditions(mapping):
@@ -17,6 +17,7 @@ from folio_uuid.folio_uuid import FolioUUID
 from folioclient import FolioClient
 from pymarc.record import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -50,7 +51,8 @@ class BibsRulesMapper(RulesMapperBase):
         rules_endpoint = "/mapping-rules/marc-bib"
         self.mappings = self.folio_client.folio_get_single_object(rules_endpoint)
         logging.info("Fetching valid language codes...")
-        self.language_codes = list(self.fetch_language_codes())
+        self.language_codes = set(self.fetch_language_codes())
+        self.index_reference_data()
         self.instance_relationships: dict = {}
         self.instance_relationship_types: dict = {}
         self.other_mode_of_issuance_id = get_unspecified_mode_of_issuance(self.folio_client)
@@ -83,7 +85,9 @@ class BibsRulesMapper(RulesMapperBase):
 
     def handle_leader_05(self, marc_record, legacy_ids):
         leader_05 = marc_record.leader[5] or "Empty"
-        self.migration_report.add("RecordStatus", i18n.t("Original value") + f": {leader_05}")
+        self.migration_report.add(
+            "RecordStatus", i18n_cache.t("Original value") + f": {leader_05}"
+        )
         if leader_05 not in ["a", "c", "d", "n", "p"]:
             marc_record.leader = f"{marc_record.leader[:5]}c{marc_record.leader[6:]}"
             self.migration_report.add(
@@ -218,19 +222,29 @@ class BibsRulesMapper(RulesMapperBase):
         if self.task_configuration.update_hrid_settings:
             self.hrid_handler.store_hrid_settings()
 
+    def index_reference_data(self):
+        """Indexes the instance types and formats looked up for every record. The first
+        entry wins where FOLIO has several with the same key, as with a linear search.
+        """
+        self.instance_type_ids_by_name: dict = {}
+        for instance_type in self.folio_client.instance_types:
+            self.instance_type_ids_by_name.setdefault(
+                instance_type["name"].lower().replace(" ", ""), instance_type["id"]
+            )
+        self.instance_formats_by_code: dict = {}
+        self.instance_formats_by_name: dict = {}
+        for instance_format in self.folio_client.instance_formats:
+            self.instance_formats_by_code.setdefault(instance_format["code"], instance_format)
+            self.instance_formats_by_name.setdefault(
+                instance_format["name"].lower(), instance_format
+            )
+
     def get_instance_type_id(self, marc_record, legacy_id):
         return_id = ""
 
         def get_folio_id_by_name(f336a: str):
             match_template = f336a.lower().replace(" ", "")
-            match = next(
-                (
-                    f["id"]
-                    for f in self.folio_client.instance_types
-                    if f["name"].lower().replace(" ", "") == match_template
-                ),
-                "",
-            )
+            match = self.instance_type_ids_by_name.get(match_template, "")
             if match:
                 self.migration_report.add(
                     "RecourceTypeMapping",
@@ -256,7 +270,7 @@ class BibsRulesMapper(RulesMapperBase):
             raise TransformationProcessError("", "No instance_types setup in tenant")
 
         if "336" in marc_record and "b" not in marc_record["336"]:
-            self.migration_report.add("RecourceTypeMapping", i18n.t("Subfield b not in 336"))
+            self.migration_report.add("RecourceTypeMapping", i18n_cache.t("Subfield b not in 336"))
             if "a" in marc_record["336"]:
                 return_id = get_folio_id_by_name(marc_record["336"]["a"])
 
@@ -302,10 +316,10 @@ class BibsRulesMapper(RulesMapperBase):
 
     def get_instance_format_id_by_code(self, legacy_id: str, code: str):
         try:
-            match = next(f for f in self.folio_client.instance_formats if f["code"] == code)
+            match = self.instance_formats_by_code[code]
             self.migration_report.add(
                 "InstanceFormat",
-                i18n.t("Successful match") + f"  - {code}->{match['name']}",
+                i18n_cache.t("Successful match") + f"  - {code}->{match['name']}",
             )
             return match["id"]
         except Exception:
@@ -322,11 +336,7 @@ class BibsRulesMapper(RulesMapperBase):
         f338a = f338a.lower().strip()
         match_template = f"{f337a} -- {f338a}"
         try:
-            match = next(
-                f
-                for f in self.folio_client.instance_formats
-                if f["name"].lower() == match_template
-            )
+            match = self.instance_formats_by_name[match_template]
             self.migration_report.add(
                 "InstanceFormat",
                 i18n.t(
@@ -374,7 +384,7 @@ class BibsRulesMapper(RulesMapperBase):
     ):
         self.migration_report.add(
             "InstanceFormat",
-            i18n.t("338$b is missing. Will try parse from 337$a and 338$a"),
+            i18n_cache.t("338$b is missing. Will try parse from 337$a and 338$a"),
         )
         for a in f_338.get_subfields("a"):
             corresponding_337 = all_337s[field_index] if field_index < len(all_337s) else None
@@ -403,7 +413,7 @@ class BibsRulesMapper(RulesMapperBase):
                         corresponding_337 = all_337s[fidx] if fidx < len(all_337s) else None
                         if not corresponding_337:
                             # No matching 337. No use mapping the 338
-                            s = i18n.t(
+                            s = i18n_cache.t(
                                 "No corresponding 337 to 338 even though 338$b was one character"
                             )
                             Helper.log_data_issue(legacy_id, s, b)
@@ -419,7 +429,7 @@ class BibsRulesMapper(RulesMapperBase):
                                 else None
                             )
                             if not corresponding_b:
-                                s = i18n.t("No corresponding $b in corresponding 338")
+                                s = i18n_cache.t("No corresponding $b in corresponding 338")
                                 Helper.log_data_issue(legacy_id, s, "")
                                 self.migration_report.add("InstanceFormat", s)
                             else:
@@ -452,14 +462,14 @@ class BibsRulesMapper(RulesMapperBase):
 
             if not ret:
                 self.migration_report.add(
-                    "MatchedModesOfIssuanceCode", i18n.t("Unmatched level") + f": {level}"
+                    "MatchedModesOfIssuanceCode", i18n_cache.t("Unmatched level") + f": {level}"
                 )
 
                 return self.other_mode_of_issuance_id
             return ret
         except IndexError:
             self.migration_report.add(
-                "PossibleCleaningTasks", i18n.t("No Leader[7] in") + f" {legacy_id}"
+                "PossibleCleaningTasks", i18n_cache.t("No Leader[7] in") + f" {legacy_id}"
             )
 
             return self.other_mode_of_issuance_id
@@ -10,6 +10,7 @@ from folioclient import FolioClient
 from pymarc.field import Field
 from pymarc.record import Record
 
+from folio_migration_tools import i18n_cache
 from folio_migration_tools.custom_exceptions import TransformationFieldMappingError
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
@@ -58,6 +59,9 @@ class RulesMapperHoldings(RulesMapperBase):
             boundwith_relationship_map
         )
         self.location_map = location_map
+        self.location_codes_by_id = {
+            location["id"]: location["code"] for location in self.folio_client.locations
+        }
         self.holdings_id_map: dict = {}
         self.ref_data_dicts: dict = {}
         self.fallback_holdings_type_id = self.task_configuration.fallback_holdings_type_id
@@ -223,7 +227,7 @@ class RulesMapperHoldings(RulesMapperBase):
             ignored_subsequent_fields (_type_): _description_
             index_or_legacy_ids (_type_): _description_
         """
-        self.migration_report.add("Trivia", i18n.t("Total number of Tags processed"))
+        self.migration_report.add("Trivia", i18n_cache.t("Total number of Tags processed"))
         if marc_field.tag not in self.mappings:
             self.report_legacy_mapping(marc_field.tag, True, False)
         elif marc_field.tag not in ignored_subsequent_fields:
@@ -283,6 +287,9 @@ class RulesMapperHoldings(RulesMapperBase):
                 0
             ]
 
+    def get_location_code(self, location_id: str):
+        return self.location_codes_by_id.get(location_id)
+
     @staticmethod
     def set_source_id(task_configuration, folio_rec, holdingssources):
         if task_configuration.create_source_records:
@@ -360,7 +367,7 @@ class RulesMapperHoldings(RulesMapperBase):
                     Helper.log_data_issue(
                         legacy_ids,
                         (
-                            i18n.t("blurbs.HoldingsTypeMapping.title") + " is 'unknown'. "
+                            i18n_cache.t("blurbs.HoldingsTypeMapping.title") + " is 'unknown'. "
                             "(leader 06 is set to 'u') Check if this is correct"
                         ),
                         ldr06,
@@ -374,9 +381,9 @@ class RulesMapperHoldings(RulesMapperBase):
                 folio_holding["holdingsTypeId"] = self.fallback_holdings_type_id
                 self.migration_report.add(
                     "HoldingsTypeMapping",
-                    i18n.t("An Unmapped")
+                    i18n_cache.t("An Unmapped")
                     + f" {ldr06} -> {holdings_type} -> "
-                    + i18n.t("Unmapped"),
+                    + i18n_cache.t("Unmapped"),
                 )
                 Helper.log_data_issue(
                     legacy_ids,
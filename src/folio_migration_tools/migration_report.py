@@ -10,6 +10,7 @@ class MigrationReport:
     def __init__(self):
         self.report = {}
         self.stats = {}
+        self.recordings: list = []
 
     def add(self, blurb_id, measure_to_add, number=1):
         """Add section header and values to migration report.
@@ -19,6 +20,8 @@ class MigrationReport:
             measure_to_add (_type_): _description_
             number (int, optional): _description_. Defaults to 1.
         """
+        for recording in self.recordings:
+            recording.append((blurb_id, measure_to_add, number))
         try:
             self.report[blurb_id][measure_to_add] += number
         except KeyError:
@@ -39,6 +42,54 @@ class MigrationReport:
             self.report[blurb_id] = {}
         self.report[blurb_id][measure_to_add] = number
 
+    def start_recording(self):
+        """Starts keeping a list of everything added to the report, so that it can be
+        added again with replay. Recordings can be started while another one is running
+        """
+        self.recordings.append([])
+
+    def stop_recording(self) -> list:
+        """Stops the recording started last
+
+        Returns:
+            list: (blurb_id, measure, number) for everything added since start_recording
+        """
+        return self.recordings.pop()
+
+    def replay(self, recording: list):
+        """Adds a recording from stop_recording to the report again
+
+        Args:
+            recording (list): The recording
+        """
+        for blurb_id, measure_to_add, number in recording:
+            self.add(blurb_id, measure_to_add, number)
+
+    def discard(self, recording: list):
+        """Takes a recording from stop_recording back out of the report
+
+        Args:
+            recording (list): The recording
+        """
+        for blurb_id, measure_to_add, number in recording:
+            measures = self.report[blurb_id]
+            measures[measure_to_add] -= number
+            if not measures[measure_to_add]:
+                del measures[measure_to_add]
+                if set(measures) <= {"blurb_id"}:
+                    del self.report[blurb_id]
+
+    def merge(self, other_report: "MigrationReport"):
+        """Adds the values of another migration report to this one.
+
+        Args:
+            other_report (MigrationReport): Report from a separate process or part of the run
+        """
+        for blurb_id, measures in other_report.report.items():
+            for measure, number in measures.items():
+                if measure != "blurb_id":
+                    self.add(blurb_id, measure, number)
+
     def add_general_statistics(self, measure_to_add: str):
         """Shortcut for adding to the first breakdown
 
@@ -71,6 +71,18 @@ class AuthorityTransformer(MigrationTaskBase):
                 ),
             ),
         ] = True
+        authority_sources_sample_rate: Annotated[
+            int,
+            Field(
+                title="Authority sources sample rate",
+                description=(
+                    "Count the $0 and $2 authority sources of every Nth record only. The "
+                    "AuthoritySources section of the migration report then holds the counts "
+                    "of the sampled records. Set to 1 to count the sources of every record"
+                ),
+                ge=1,
+            ),
+        ] = 1
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
@@ -1,19 +1,28 @@
 import copy
+import hashlib
 import json
 import logging
+import os
+import shutil
 import sys
 import time
 import traceback
 import i18n
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import Annotated
 from typing import List
+from typing import Optional
 from uuid import uuid4
 
 import httpx
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from pydantic import Field
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.library_configuration import FileDefinition
@@ -22,10 +31,26 @@ from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks.migration_task_base import MigrationTaskBase
 from folio_migration_tools.task_configuration import AbstractTaskConfiguration
 
+# Records posted one by one are acknowledged in the checkpoint this often
+checkpoint_interval = 100
+# Counters that are kept in the checkpoint and added up over the processes
+posting_counters = [
+    "processed",
+    "num_posted",
+    "num_failures",
+    "failed_batches",
+    "users_created",
+    "users_updated",
+    "records_failed_individually",
+]
+
 
 def write_failed_batch_to_file(batch, file):
     for record in batch:
-        file.write(f"{json.dumps(record)}\n")
+        if isinstance(record, str):
+            file.write(f"{record}\n")
+        else:
+            file.write(f"{json.dumps(record)}\n")
 
 
 class BatchPoster(MigrationTaskBase):
@@ -71,6 +96,110 @@ class BatchPoster(MigrationTaskBase):
                 )
             ),
         ] = True
+        concurrent_batches: Annotated[
+            int,
+            Field(
+                description=(
+                    "Number of batches allowed to be in flight against FOLIO at the same time. "
+                    "Responses are still handled in the order the batches were read from the "
+                    "file. Defaults to 1 (strictly sequential posting)"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        bisect_failed_batches: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Toggles whether batches that FOLIO refuses for the records in them "
+                    "(HTTP 422) should be split in halves and reposted until the failing "
+                    "records are isolated, instead of saving the entire batch as failed. "
+                    "The isolated records are not rerun"
+                )
+            ),
+        ] = False
+        adaptive_batch_size: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Toggles adaptive batch sizing. When on, batchSize is only the starting "
+                    "point. The batch size grows while FOLIO responds faster than "
+                    "adaptiveTargetSeconds and is halved on slow responses, HTTP 413 and "
+                    "5XX responses, staying within minBatchSize and maxBatchSize"
+                )
+            ),
+        ] = False
+        min_batch_size: Annotated[
+            int, Field(description="Smallest batch size used in adaptive mode", ge=1)
+        ] = 1
+        max_batch_size: Annotated[
+            int, Field(description="Largest batch size used in adaptive mode", ge=1)
+        ] = 1000
+        adaptive_target_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "Response time per batch that adaptive batch sizing aims to stay under"
+                ),
+                gt=0,
+            ),
+        ] = 10.0
+        max_workers: Annotated[
+            int,
+            Field(
+                description=(
+                    "Number of processes posting files at the same time. Each file listed "
+                    "in files is posted by one process, with its own connection to FOLIO. "
+                    "Defaults to 1 (the files are posted one after another)"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        resume_from_checkpoint: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Toggles whether to resume a previous, interrupted run of this task. "
+                    "The task keeps a checkpoint file in the results folder that records "
+                    "how far into the files FOLIO has acknowledged the posted records. "
+                    "When resuming, the task skips straight to that position"
+                )
+            ),
+        ] = False
+        srs_snapshot_count: Annotated[
+            int,
+            Field(
+                description=(
+                    "Number of SRS snapshots to spread the records over. The batches are "
+                    "assigned to the snapshots in turn, so that batches in flight at the "
+                    "same time go to different snapshots. All snapshots are committed "
+                    "when the task is done. Only used for SRS. Defaults to 1"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        snapshot_timeout_seconds: Annotated[
+            float,
+            Field(
+                description=(
+                    "Maximum number of seconds to wait for FOLIO to report a newly "
+                    "created SRS snapshot before giving up"
+                ),
+                gt=0,
+            ),
+        ] = 300.0
+        skip_unchanged_records: Annotated[
+            bool,
+            Field(
+                description=(
+                    "Toggles incremental posting. When on, the task keeps the hash of every "
+                    "record FOLIO accepted, keyed by the record id, in a file shared by all "
+                    "iterations. Records identical to the ones posted by an earlier run "
+                    "against the same tenant are skipped. Remove the file after resetting "
+                    "the tenant"
+                )
+            ),
+        ] = False
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
@@ -91,87 +220,249 @@ class BatchPoster(MigrationTaskBase):
             self.task_configuration.object_type,
             self.task_configuration.use_safe_inventory_endpoints,
         )
-        self.snapshot_id = str(uuid4())
+        self.snapshot_ids = [
+            str(uuid4()) for _ in range(self.task_configuration.srs_snapshot_count)
+        ]
+        self.snapshot_id = self.snapshot_ids[0]
+        self.snapshots_ready = False
+        self.post_rows_as_text = self.api_info.get("is_batch") and not (
+            self.api_info["addSnapshotId"]
+            or (
+                self.task_configuration.object_type in ["Instances", "Holdings", "Items"]
+                and not self.task_configuration.use_safe_inventory_endpoints
+            )
+        )
         self.failed_objects: list = []
         self.batch_size = self.task_configuration.batch_size
         logging.info("Batch size is %s", self.batch_size)
+        self.batch_sizer = None
+        if self.task_configuration.adaptive_batch_size and self.api_info.get("is_batch"):
+            self.batch_sizer = AdaptiveBatchSizer(
+                self.batch_size,
+                self.task_configuration.min_batch_size,
+                self.task_configuration.max_batch_size,
+                self.task_configuration.adaptive_target_seconds,
+            )
+            logging.info(
+                "Adaptive batch sizing between %s and %s records",
+                self.batch_sizer.min_size,
+                self.batch_sizer.max_size,
+            )
         self.processed = 0
         self.failed_batches = 0
         self.users_created = 0
         self.users_updated = 0
+        self.records_failed_individually = 0
         self.users_per_group: dict = {}
         self.failed_fields: set = set()
         self.num_failures = 0
         self.num_posted = 0
         self.okapi_headers = self.folio_client.okapi_headers
         self.http_client = None
+        self.executor = None
+        self.in_flight: deque = deque()
+        self.current_position = (0, 0, 0)
+        self.resume_position = None
+        self.previous_failed_recs_path: Optional[Path] = None
+        self.checkpoints_enabled = self.task_configuration.resume_from_checkpoint
+        self.is_worker = False
+        self.previous_hashes: dict = {}
+        self.posted_hashes: dict = {}
+        self.use_processes = (
+            self.task_configuration.max_workers > 1 and len(self.task_configuration.files) > 1
+        )
+        if self.task_configuration.resume_from_checkpoint and not self.use_processes:
+            self.resume_position = self.load_checkpoint()
 
     def do_work(self):
-        with httpx.Client(timeout=None, headers=self.folio_client.okapi_headers) as httpx_client:
+        if self.use_processes:
+            self.do_work_in_processes()
+            return
+        if self.task_configuration.skip_unchanged_records:
+            self.load_posted_hashes()
+        with httpx.Client(
+            timeout=None, headers=self.folio_client.okapi_headers
+        ) as httpx_client, ThreadPoolExecutor(
+            max_workers=self.task_configuration.concurrent_batches
+        ) as executor:
             self.http_client = httpx_client
+            if self.task_configuration.concurrent_batches > 1:
+                logging.info(
+                    "Keeping up to %s batches in flight",
+                    self.task_configuration.concurrent_batches,
+                )
+                self.executor = executor
             try:
                 batch = []
-                if self.task_configuration.object_type == "SRS":
-                    self.create_snapshot()
+                if self.task_configuration.object_type == "SRS" and not self.is_worker:
+                    # The first batch is read while FOLIO sets up the snapshots
+                    self.create_snapshots()
                 with open(self.folder_structure.failed_recs_path, "w") as failed_recs_file:
-                    for file_def in self.task_configuration.files:
-                        path = self.folder_structure.results_folder / file_def.file_name
-                        with open(path) as rows:
+                    self.copy_previous_failed_records(failed_recs_file)
+                    for file_index, file_def in enumerate(self.task_configuration.files):
+                        path = self.folder_structure.get_results_file_path(file_def.file_name)
+                        offset = self.get_resume_offset(file_index)
+                        if offset is None:
+                            logging.info("Skipping %s since it was posted already", path)
+                            continue
+                        with open_results_file(path, "rb") as rows:
                             logging.info("Running %s", path)
-                            last_row = ""
-                            for self.processed, row in enumerate(rows, start=1):
-                                last_row = row
-                                if row.strip():
-                                    try:
-                                        if self.task_configuration.object_type == "Extradata":
-                                            self.post_extra_data(
-                                                row, self.processed, failed_recs_file
-                                            )
-                                        elif not self.api_info["is_batch"]:
-                                            self.post_single_records(
-                                                row, self.processed, failed_recs_file
-                                            )
-                                        else:
-                                            batch = self.post_record_batch(
-                                                batch, failed_recs_file, row
-                                            )
-                                    except UnicodeDecodeError as unicode_error:
-                                        self.handle_unicode_error(unicode_error, last_row)
-                                    except TransformationProcessError as tpe:
-                                        self.handle_generic_exception(
-                                            tpe,
-                                            last_row,
-                                            batch,
-                                            self.processed,
-                                            failed_recs_file,
-                                        )
-                                        logging.critical("Halting %s", tpe)
-                                        print(f"\n\t{tpe.message}")
-                                        sys.exit(1)
-                                    except TransformationRecordFailedError as exception:
-                                        self.handle_generic_exception(
-                                            exception,
-                                            last_row,
-                                            batch,
-                                            self.processed,
-                                            failed_recs_file,
-                                        )
-                                        batch = []
+                            if offset:
+                                logging.info("Resuming at byte %s of %s", offset, path)
+                                rows.seek(offset)
+                            else:
+                                self.processed = 0
+                            for raw_row in rows:
+                                self.processed += 1
+                                offset += len(raw_row)
+                                self.current_position = (file_index, offset, self.processed)
+                                if raw_row.strip():
+                                    batch = self.post_row(raw_row, batch, failed_recs_file, path)
+                            if self.posts_single_records():
+                                self.save_checkpoint(self.current_position)
 
                     if self.task_configuration.object_type != "Extradata" and any(batch):
                         try:
-                            self.post_batch(batch, failed_recs_file, self.processed)
+                            self.submit_batch(batch, failed_recs_file, self.processed)
+                        except TransformationRecordFailedError as exception:
+                            self.handle_failed_batch(
+                                exception, "", batch, self.processed, failed_recs_file
+                            )
                         except Exception as exception:
                             self.handle_generic_exception(
-                                exception, last_row, batch, self.processed, failed_recs_file
+                                exception, "", batch, self.processed, failed_recs_file
                             )
+                    self.drain_in_flight(failed_recs_file)
                     logging.info("Done posting %s records. ", (self.processed))
             except Exception as ee:
-                if self.task_configuration.object_type == "SRS":
-                    self.commit_snapshot()
+                if self.task_configuration.object_type == "SRS" and not self.is_worker:
+                    self.commit_snapshots()
                 raise ee
+            finally:
+                self.executor = None
+
+    def post_row(self, raw_row: bytes, batch: list, failed_recs_file, path) -> list:
+        """Posts a row from a results file, or adds it to the batch to post.
+
+        Records that are posted one by one save the checkpoint every checkpoint_interval
+        rows. Batches save it when FOLIO has answered them.
+
+        Args:
+            raw_row (bytes): The row as read from the file
+            batch (list): The batch being filled
+            failed_recs_file: File to write failed records to
+            path: Path of the file the row was read from
+
+        Returns:
+            list: The batch being filled, which is emptied when it is posted
+        """
+        row = ""
+        try:
+            row = raw_row.decode("utf-8")
+            if self.task_configuration.object_type == "Extradata":
+                self.post_extra_data(row, self.processed, failed_recs_file)
+            elif self.task_configuration.skip_unchanged_records and self.is_unchanged(row):
+                self.migration_report.add_general_statistics(i18n.t("Unchanged records skipped"))
+                return batch
+            elif not self.api_info["is_batch"]:
+                self.post_single_records(row, self.processed, failed_recs_file)
+            else:
+                return self.post_record_batch(batch, failed_recs_file, row)
+            if self.processed % checkpoint_interval == 0:
+                self.save_checkpoint(self.current_position)
+        except UnicodeDecodeError as unicode_error:
+            self.handle_unicode_error(unicode_error, raw_row, path)
+        except TransformationProcessError as tpe:
+            self.handle_generic_exception(tpe, row, batch, self.processed, failed_recs_file)
+            logging.critical("Halting %s", tpe)
+            print(f"\n\t{tpe.message}")
+            sys.exit(1)
+        except TransformationRecordFailedError as exception:
+            self.handle_failed_batch(exception, row, batch, self.processed, failed_recs_file)
+            return []
+        return batch
+
+    def posts_single_records(self) -> bool:
+        return self.task_configuration.object_type == "Extradata" or not self.api_info["is_batch"]
+
+    def do_work_in_processes(self):
+        """Posts the files in parallel, one file per process.
+
+        Every process writes the records that fail to a shard of its own. When all files
+        are posted, the counters and migration reports of the processes are added to the
+        ones of this task, and the shards are merged into the failed records file. The
+        shards are kept if the posting is interrupted and resumeFromCheckpoint is on, so that
+        the processes can pick up their failed records when the posting is resumed.
+
+        Raises:
+            Exception: Any error that stopped the posting, once the SRS snapshots are committed
+        """
+        logging.info(
+            "Posting %s files using %s processes",
+            len(self.task_configuration.files),
+            self.task_configuration.max_workers,
+        )
+        if self.task_configuration.object_type == "SRS":
+            self.create_snapshots()
+            self.wait_for_snapshots()
+        shard_paths = [
+            self.folder_structure.failed_recs_path.with_name(
+                f"{self.folder_structure.failed_recs_path.stem}_{file_index}.txt"
+            )
+            for file_index in range(len(self.task_configuration.files))
+        ]
+        finished = False
+        try:
+            with ProcessPoolExecutor(max_workers=self.task_configuration.max_workers) as pool:
+                futures = [
+                    pool.submit(
+                        post_file_in_worker,
+                        self.task_configuration,
+                        self.library_configuration,
+                        file_index,
+                        self.snapshot_ids,
+                        shard_path,
+                    )
+                    for file_index, shard_path in enumerate(shard_paths)
+                ]
+                for file_def, future in zip(self.task_configuration.files, futures):
+                    worker_result = future.result()
+                    logging.info(
+                        "Done posting %s. %s rows processed, %s failed",
+                        file_def.file_name,
+                        worker_result["processed"],
+                        worker_result["num_failures"],
+                    )
+                    for counter in posting_counters:
+                        setattr(self, counter, getattr(self, counter) + worker_result[counter])
+                    self.migration_report.merge(worker_result["migration_report"])
+                    self.posted_hashes.update(worker_result["posted_hashes"])
+            finished = True
+        except Exception as ee:
+            if self.task_configuration.object_type == "SRS":
+                self.commit_snapshots()
+            raise ee
+        finally:
+            with open(self.folder_structure.failed_recs_path, "w") as failed_recs_file:
+                for shard_path in shard_paths:
+                    if shard_path.is_file():
+                        with open(shard_path) as shard:
+                            failed_recs_file.writelines(shard)
+                        if finished or not self.checkpoints_enabled:
+                            os.remove(shard_path)
+        logging.info("Done posting %s records. ", (self.processed))
 
     def post_record_batch(self, batch, failed_recs_file, row):
+        if self.post_rows_as_text:
+            # Nothing needs to be added to the records. Post the rows as they are
+            text_rec = row.split("\t")[-1].strip()
+            if self.processed == 1:
+                logging.info(text_rec)
+            batch.append(text_rec)
+            if len(batch) >= int(self.batch_size):
+                self.submit_batch(batch, failed_recs_file, self.processed)
+                batch = []
+            return batch
         json_rec = json.loads(row.split("\t")[-1])
         if (
             self.task_configuration.object_type in ["Instances", "Holdings", "Items"]
@@ -186,11 +477,58 @@ class BatchPoster(MigrationTaskBase):
         if self.processed == 1:
             logging.info(json.dumps(json_rec, indent=True))
         batch.append(json_rec)
-        if len(batch) == int(self.batch_size):
-            self.post_batch(batch, failed_recs_file, self.processed)
+        if len(batch) >= int(self.batch_size):
+            self.submit_batch(batch, failed_recs_file, self.processed)
             batch = []
+            self.next_snapshot()
         return batch
 
+    def next_snapshot(self):
+        """Moves on to the next SRS snapshot, so that the batches are spread over them"""
+        if len(self.snapshot_ids) > 1:
+            index = (self.snapshot_ids.index(self.snapshot_id) + 1) % len(self.snapshot_ids)
+            self.snapshot_id = self.snapshot_ids[index]
+
+    def submit_batch(self, batch, failed_recs_file, num_records):
+        """Posts the batch, either right away or by handing it over to the executor.
+
+        When more than one batch is allowed in flight, the batch is posted on a worker
+        thread and the response is handled later by drain_in_flight, in submission order,
+        so that counters and the failed records file are only touched from this thread.
+
+        Args:
+            batch (list): The records to post
+            failed_recs_file: File to write failed records to
+            num_records (int): Number of rows read from the file when the batch was full
+        """
+        position = self.current_position
+        if self.task_configuration.object_type == "SRS" and not self.snapshots_ready:
+            self.wait_for_snapshots()
+        if not self.executor:
+            try:
+                self.post_batch(batch, failed_recs_file, num_records)
+            except TransformationRecordFailedError as exception:
+                self.handle_failed_batch(exception, "", batch, num_records, failed_recs_file)
+            self.save_checkpoint(position)
+            return
+        while len(self.in_flight) >= self.task_configuration.concurrent_batches:
+            self.handle_oldest_in_flight(failed_recs_file)
+        self.in_flight.append(
+            (self.executor.submit(self.do_post, batch), batch, num_records, position)
+        )
+
+    def handle_oldest_in_flight(self, failed_recs_file):
+        future, batch, num_records, position = self.in_flight.popleft()
+        try:
+            self.handle_batch_response(future.result(), batch, failed_recs_file, num_records)
+        except TransformationRecordFailedError as exception:
+            self.handle_failed_batch(exception, "", batch, num_records, failed_recs_file)
+        self.save_checkpoint(position)
+
+    def drain_in_flight(self, failed_recs_file):
+        while self.in_flight:
+            self.handle_oldest_in_flight(failed_recs_file)
+
     def post_extra_data(self, row: str, num_records: int, failed_recs_file):
         (object_name, data) = row.split("\t")
         endpoint = get_extradata_endpoint(object_name, data)
@@ -243,10 +581,14 @@ class BatchPoster(MigrationTaskBase):
 
     def post_objects(self, url, body):
         if self.http_client and not self.http_client.is_closed:
-            return self.http_client.post(url, data=body.encode("utf-8"))
+            return self.rate_limiter.call(self.http_client.post, url, data=body.encode("utf-8"))
         else:
-            return httpx.post(
-                url, headers=self.okapi_headers, data=body.encode("utf-8"), timeout=None
+            return self.rate_limiter.call(
+                httpx.post,
+                url,
+                headers=self.okapi_headers,
+                data=body.encode("utf-8"),
+                timeout=None,
             )
 
     def handle_generic_exception(self, exception, last_row, batch, num_records, failed_recs_file):
@@ -263,24 +605,267 @@ class BatchPoster(MigrationTaskBase):
             logging.critical("Halting")
             sys.exit(1)
 
-    def handle_unicode_error(self, unicode_error, last_row):
+    def handle_failed_batch(self, exception, last_row, batch, num_records, failed_recs_file):
+        """Handles a batch that FOLIO refused.
+
+        If bisection is turned on and FOLIO refused the batch for the records in it, the
+        batch is split in halves that are reposted one by one. Halves that fail are split
+        again, until the failing records are isolated and written to the failed records
+        file. Otherwise the whole batch is written to the file, since other failures, like
+        server errors, would just fail again for every half.
+
+        Args:
+            exception (TransformationRecordFailedError): The error raised for the batch
+            last_row (str): The last row read from the file
+            batch (list): The failed batch
+            num_records (int): Number of rows read from the file when the batch was full
+            failed_recs_file: File to write failed records to
+        """
+        if not (self.task_configuration.bisect_failed_batches and is_record_failure(exception)):
+            self.handle_generic_exception(
+                exception, last_row, batch, num_records, failed_recs_file
+            )
+            return
+        if len(batch) < 2:
+            self.records_failed_individually += len(batch)
+            self.handle_generic_exception(
+                exception, last_row, batch, num_records, failed_recs_file
+            )
+            return
+        logging.info("Batch of %s records failed. Reposting it in halves", len(batch))
+        self.migration_report.add_general_statistics(i18n.t("Failed batches split in halves"))
+        middle = len(batch) // 2
+        for half in (batch[:middle], batch[middle:]):
+            try:
+                self.post_batch(half, failed_recs_file, num_records)
+            except TransformationRecordFailedError as half_exception:
+                self.handle_failed_batch(
+                    half_exception, last_row, half, num_records, failed_recs_file
+                )
+
+    def handle_unicode_error(self, unicode_error, raw_row, path):
         self.migration_report.add("Details", i18n.t("Encoding errors"))
         logging.info("=========ERROR==============")
         logging.info(
             "%s Posting failed. Encoding error reading file",
             unicode_error,
         )
+        logging.info("Failing row %s in %s", self.processed, path)
+        logging.info(raw_row)
+        logging.info("=========Stack trace==============")
+        logging.info(traceback.format_exc())
+        logging.info("=======================")
+
+    def is_unchanged(self, row: str) -> bool:
+        """Checks if the record was posted as it is by an earlier run.
+
+        The hash of the record is added to the hashes to save for the next run.
+
+        Args:
+            row (str): The row from the results file
+
+        Returns:
+            bool: True if the record is identical to the one posted before
+        """
+        record_text = row.split("\t")[-1].strip()
+        record_id = json.loads(record_text).get("id", "")
+        if not record_id:
+            return False
+        record_hash = hashlib.blake2b(record_text.encode("utf-8"), digest_size=16).hexdigest()
+        self.posted_hashes[record_id] = record_hash
+        return self.previous_hashes.get(record_id) == record_hash
+
+    def load_posted_hashes(self):
+        """Loads the hashes of the records posted by earlier runs of the task.
+
+        Hashes saved for another tenant are ignored. A rerun of the failed records keeps
+        the hashes saved by the run it follows.
+        """
+        self.previous_hashes = {}
+        hashes_path = self.folder_structure.posted_hashes_path
+        if hashes_path.is_file():
+            with open(hashes_path) as hashes_file:
+                saved = json.load(hashes_file)
+            if saved["tenant"] == self.get_tenant_key():
+                self.previous_hashes = saved["hashes"]
+            else:
+                logging.info(
+                    "Posted records in %s are from %s. Posting all records",
+                    hashes_path,
+                    saved["tenant"],
+                )
+        logging.info("Loaded hashes of %s posted records", len(self.previous_hashes))
+        self.posted_hashes = dict(self.previous_hashes) if self.performing_rerun else {}
+
+    def save_posted_hashes(self):
+        """Saves the hashes of the posted records, leaving out the ones that failed"""
+        posted_hashes = dict(self.posted_hashes)
+        if self.folder_structure.failed_recs_path.is_file():
+            with open(self.folder_structure.failed_recs_path) as failed_recs_file:
+                for row in failed_recs_file:
+                    try:
+                        posted_hashes.pop(json.loads(row.split("\t")[-1]).get("id", ""), None)
+                    except ValueError:
+                        continue
+        temp_path = self.folder_structure.posted_hashes_path.with_suffix(".tmp")
+        with open(temp_path, "w") as hashes_file:
+            json.dump({"tenant": self.get_tenant_key(), "hashes": posted_hashes}, hashes_file)
+        os.replace(temp_path, self.folder_structure.posted_hashes_path)
+        logging.info(
+            "Saved hashes of %s posted records to %s",
+            len(posted_hashes),
+            self.folder_structure.posted_hashes_path,
+        )
+
+    def get_tenant_key(self):
+        return f"{self.library_configuration.okapi_url} {self.library_configuration.tenant_id}"
+
+    def get_resume_offset(self, file_index: int):
+        """Returns the byte offset to start reading the file at, given the checkpoint.
+
+        Args:
+            file_index (int): Index of the file in the task configuration
+
+        Returns:
+            The offset, or None if the file was posted entirely before the interruption
+        """
+        if not self.resume_position:
+            return 0
+        resume_index, resume_offset = self.resume_position
+        if file_index < resume_index:
+            return None
+        return resume_offset if file_index == resume_index else 0
+
+    def load_checkpoint(self):
+        """Loads the checkpoint left by a previous run and restores its counters
+
+        The failed records file of the previous run is remembered, so that its records
+        are copied into the failed records file of this run.
+
+        Raises:
+            TransformationProcessError: If the checkpoint does not match the configured files,
+                or if the files have changed since the checkpoint was saved
+
+        Returns:
+            tuple: file index and byte offset to resume from, or None if there is no checkpoint
+        """
+        checkpoint_path = self.folder_structure.checkpoint_path
+        if not checkpoint_path.is_file():
+            logging.info("No checkpoint found at %s. Starting from the top", checkpoint_path)
+            return None
+        with open(checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        file_names = [f.file_name for f in self.task_configuration.files]
+        if checkpoint["files"] != file_names[: len(checkpoint["files"])]:
+            raise TransformationProcessError(
+                "",
+                "Files in checkpoint do not match the files in the task configuration. "
+                f"Remove {checkpoint_path} or turn off resumeFromCheckpoint",
+                ", ".join(checkpoint["files"]),
+            )
+        if checkpoint["file_stats"] != self.get_results_file_stats(checkpoint["files"]):
+            raise TransformationProcessError(
+                "",
+                "Files have changed since the checkpoint was saved. "
+                f"Remove {checkpoint_path} or turn off resumeFromCheckpoint",
+                ", ".join(checkpoint["files"]),
+            )
+        for counter in posting_counters:
+            setattr(self, counter, checkpoint[counter])
+        self.previous_failed_recs_path = Path(checkpoint["failed_records_file"])
         logging.info(
-            "Failing row, either the one shown here or the next row in %s",
-            self.task_configuration.file.file_name,
+            "Resuming from checkpoint at byte %s of %s. Records that failed before the "
+            "interruption are copied from %s",
+            checkpoint["offset"],
+            checkpoint["files"][-1],
+            checkpoint["failed_records_file"],
         )
-        logging.info(last_row)
-        logging.info("=========Stack trace==============")
-        traceback.logging.info_exc()
-        logging.info("=======================", flush=True)
+        return len(checkpoint["files"]) - 1, checkpoint["offset"]
+
+    def save_checkpoint(self, position):
+        """Records how far into the files the posting has come.
+
+        The checkpoint is written to a temporary file that then replaces the previous
+        checkpoint, so that an interruption never leaves a half written checkpoint behind.
+        Nothing is written unless resumeFromCheckpoint is on.
+
+        Args:
+            position (tuple): Index of the file, the byte offset after the last handled row,
+                and the number of rows read from the file up to that offset
+        """
+        if self.performing_rerun or not self.checkpoints_enabled:
+            return
+        file_index, offset, processed = position
+        file_names = [f.file_name for f in self.task_configuration.files[: file_index + 1]]
+        checkpoint = {counter: getattr(self, counter) for counter in posting_counters}
+        checkpoint.update(
+            {
+                "files": file_names,
+                "file_stats": self.get_results_file_stats(file_names),
+                "offset": offset,
+                "processed": processed,
+                "failed_records_file": str(self.folder_structure.failed_recs_path),
+            }
+        )
+        temp_path = self.folder_structure.checkpoint_path.with_suffix(".tmp")
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, self.folder_structure.checkpoint_path)
+
+    def get_results_file_stats(self, file_names: List[str]) -> List[List[int]]:
+        """Returns the size and modification time of the results files, as kept in checkpoints
+
+        Args:
+            file_names (List[str]): Names of the files in the results folder
+
+        Returns:
+            List[List[int]]: Size in bytes and modification time in nanoseconds of each file
+        """
+        stats = []
+        for file_name in file_names:
+            stat = self.folder_structure.get_results_file_path(file_name).stat()
+            stats.append([stat.st_size, stat.st_mtime_ns])
+        return stats
+
+    def copy_previous_failed_records(self, failed_recs_file):
+        """Copies the records that failed before the interruption into this run's file
+
+        Args:
+            failed_recs_file: File to write failed records to
+        """
+        previous_path = self.previous_failed_recs_path
+        if not previous_path or previous_path == self.folder_structure.failed_recs_path:
+            return
+        if not previous_path.is_file():
+            logging.warning(
+                "Failed records file %s from before the interruption is missing", previous_path
+            )
+            return
+        with open(previous_path) as previous_file:
+            shutil.copyfileobj(previous_file, failed_recs_file)
+        logging.info("Copied the failed records from %s", previous_path)
+
+    def remove_checkpoints(self):
+        """Removes the checkpoints once all files are posted, so the next run starts over"""
+        checkpoint_path = self.folder_structure.checkpoint_path
+        checkpoint_paths = [checkpoint_path] + [
+            checkpoint_path.with_name(f"{checkpoint_path.stem}_{file_index}.json")
+            for file_index in range(len(self.task_configuration.files))
+        ]
+        for path in checkpoint_paths:
+            if path.is_file():
+                os.remove(path)
+                logging.info("Removed checkpoint %s", path)
 
     def post_batch(self, batch, failed_recs_file, num_records, recursion_depth=0):
         response = self.do_post(batch)
+        self.handle_batch_response(response, batch, failed_recs_file, num_records, recursion_depth)
+
+    def handle_batch_response(
+        self, response, batch, failed_recs_file, num_records, recursion_depth=0
+    ):
+        if self.batch_sizer:
+            self.batch_size = self.batch_sizer.register_response(response, len(batch))
         if response.status_code == 201:
             logging.info(
                 (
@@ -345,13 +930,15 @@ class BatchPoster(MigrationTaskBase):
             logging.error(response.text)
             raise TransformationProcessError("", "HTTP 400. Somehting is wrong. Quitting")
         elif self.task_configuration.object_type == "SRS" and response.status_code >= 500:
+            delay = self.rate_limiter.get_delay(response, recursion_depth)
             logging.info(
-                "Post failed. Size: %s Waiting 30s until reposting. Number of tries: %s of 5",
+                "Post failed. Size: %s Waiting %.1fs until reposting. Number of tries: %s of 5",
                 get_req_size(response),
+                delay,
                 recursion_depth,
             )
             logging.info(response.text)
-            time.sleep(30)
+            time.sleep(delay)
             if recursion_depth > 4:
                 raise TransformationRecordFailedError(
                     "",
@@ -388,6 +975,14 @@ class BatchPoster(MigrationTaskBase):
     def do_post(self, batch):
         path = self.api_info["api_endpoint"]
         url = self.folio_client.okapi_url + path
+        if batch and isinstance(batch[0], str):
+            body = self.get_text_payload(batch).encode("utf-8")
+            if self.http_client and not self.http_client.is_closed:
+                return self.rate_limiter.call(self.http_client.post, url, content=body)
+            else:
+                return self.rate_limiter.call(
+                    httpx.post, url, headers=self.okapi_headers, content=body, timeout=None
+                )
         if self.api_info["object_name"] == "users":
             payload = {self.api_info["object_name"]: list(batch), "totalRecords": len(batch)}
         elif self.api_info["total_records"]:
@@ -395,15 +990,34 @@ class BatchPoster(MigrationTaskBase):
         else:
             payload = {self.api_info["object_name"]: batch}
         if self.http_client and not self.http_client.is_closed:
-            return self.http_client.post(url, json=payload)
+            return self.rate_limiter.call(self.http_client.post, url, json=payload)
         else:
-            return httpx.post(url, headers=self.okapi_headers, json=payload, timeout=None)
+            return self.rate_limiter.call(
+                httpx.post, url, headers=self.okapi_headers, json=payload, timeout=None
+            )
+
+    def get_text_payload(self, batch: List[str]) -> str:
+        """Builds the request body from rows of JSON text, without parsing them.
+
+        Args:
+            batch (List[str]): The records, one JSON object per string
+
+        Returns:
+            str: The same payload as do_post would serialize from the parsed records
+        """
+        records = ", ".join(batch)
+        if self.api_info["object_name"] == "users":
+            return f'{{"users": [{records}], "totalRecords": {len(batch)}}}'
+        elif self.api_info["total_records"]:
+            return f'{{"records": [{records}], "totalRecords": {len(batch)}}}'
+        else:
+            return f'{{{json.dumps(self.api_info["object_name"])}: [{records}]}}'
 
     def wrap_up(self):
         logging.info("Done. Wrapping up")
         self.extradata_writer.flush()
         if self.task_configuration.object_type == "SRS":
-            self.commit_snapshot()
+            self.commit_snapshots()
         if self.task_configuration.object_type != "Extradata":
             logging.info(
                 (
@@ -421,6 +1035,10 @@ class BatchPoster(MigrationTaskBase):
         self.migration_report.set("GeneralStatistics", f"Records processed {run}", self.processed)
         self.migration_report.set("GeneralStatistics", f"Records posted {run}", self.num_posted)
         self.migration_report.set("GeneralStatistics", f"Failed to post {run}", self.num_failures)
+        if self.task_configuration.skip_unchanged_records:
+            self.save_posted_hashes()
+        if self.checkpoints_enabled and not self.performing_rerun:
+            self.remove_checkpoints()
         self.rerun_run()
         with open(self.folder_structure.migration_reports_file, "w+") as report_file:
             self.migration_report.write_migration_report(
@@ -431,13 +1049,22 @@ class BatchPoster(MigrationTaskBase):
         self.clean_out_empty_logs()
 
     def rerun_run(self):
-        if self.task_configuration.rerun_failed_records and (self.num_failures > 0):
+        if self.num_failures > 0 and self.num_failures == self.records_failed_individually:
+            logging.info(
+                "Failed batches were bisected. The %s failed records saved to %s "
+                "failed individually and will not be rerun",
+                self.num_failures,
+                str(self.folder_structure.failed_recs_path),
+            )
+        elif self.task_configuration.rerun_failed_records and (self.num_failures > 0):
             logging.info(
                 "Rerunning the %s failed records from the load with a batchsize of 1",
                 self.num_failures,
             )
             try:
                 self.task_configuration.batch_size = 1
+                self.task_configuration.adaptive_batch_size = False
+                self.task_configuration.resume_from_checkpoint = False
                 self.task_configuration.files = [
                     FileDefinition(file_name=str(self.folder_structure.failed_recs_path.name))
                 ]
@@ -463,57 +1090,212 @@ class BatchPoster(MigrationTaskBase):
                 str(self.folder_structure.failed_recs_path),
             )
 
-    def create_snapshot(self):
+    def create_snapshots(self):
+        """Posts the SRS snapshots without waiting for FOLIO to finish setting them up.
+
+        wait_for_snapshots must be called before the first batch is posted.
+        """
+        for snapshot_id in self.snapshot_ids:
+            self.create_snapshot(snapshot_id)
+
+    def create_snapshot(self, snapshot_id: str):
         snapshot = {
-            "jobExecutionId": self.snapshot_id,
+            "jobExecutionId": snapshot_id,
             "status": "PARSING_IN_PROGRESS",
             "processingStartedDate": datetime.utcnow().isoformat(timespec="milliseconds"),
         }
         try:
             url = f"{self.folio_client.okapi_url}/source-storage/snapshots"
             if self.http_client and not self.http_client.is_closed:
-                res = self.http_client.post(url, json=snapshot)
+                res = self.rate_limiter.call(self.http_client.post, url, json=snapshot)
             else:
-                res = httpx.post(url, headers=self.okapi_headers, json=snapshot, timeout=None)
+                res = self.rate_limiter.call(
+                    httpx.post, url, headers=self.okapi_headers, json=snapshot, timeout=None
+                )
             res.raise_for_status()
             logging.info("Posted Snapshot to FOLIO: %s", json.dumps(snapshot, indent=4))
-            get_url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{self.snapshot_id}"
-            getted = False
-            while not getted:
-                logging.info("Sleeping while waiting for the snapshot to get created")
-                time.sleep(5)
-                if self.http_client and not self.http_client.is_closed:
-                    res = self.http_client.get(get_url)
-                else:
-                    res = httpx.get(get_url, headers=self.okapi_headers, timeout=None)
-                if res.status_code == 200:
-                    getted = True
-                else:
-                    logging.info(res.status_code)
         except Exception:
             logging.exception("Could not post the snapshot")
             sys.exit(1)
 
-    def commit_snapshot(self):
-        snapshot = {"jobExecutionId": self.snapshot_id, "status": "COMMITTED"}
+    def wait_for_snapshots(self):
+        """Polls FOLIO until all SRS snapshots are created.
+
+        The polling starts after half a second and the wait is doubled between polls,
+        up to five seconds. The task halts if a snapshot is not there within
+        snapshotTimeoutSeconds.
+
+        Raises:
+            TransformationProcessError: If a snapshot is not created in time
+        """
+        deadline = time.monotonic() + self.task_configuration.snapshot_timeout_seconds
+        for snapshot_id in self.snapshot_ids:
+            get_url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{snapshot_id}"
+            delay = 0.5
+            try:
+                while True:
+                    if self.http_client and not self.http_client.is_closed:
+                        res = self.rate_limiter.call(self.http_client.get, get_url)
+                    else:
+                        res = self.rate_limiter.call(
+                            httpx.get, get_url, headers=self.okapi_headers, timeout=None
+                        )
+                    if res.status_code == 200:
+                        break
+                    if time.monotonic() + delay > deadline:
+                        raise TransformationProcessError(
+                            "",
+                            "Timed out waiting for the SRS snapshot to get created",
+                            snapshot_id,
+                        )
+                    logging.info(
+                        "HTTP %s. Waiting %ss for the snapshot to get created",
+                        res.status_code,
+                        delay,
+                    )
+                    time.sleep(delay)
+                    delay = min(delay * 2, 5)
+            except TransformationProcessError:
+                raise
+            except Exception:
+                logging.exception("Could not get the snapshot %s", snapshot_id)
+                sys.exit(1)
+        self.snapshots_ready = True
+
+    def commit_snapshots(self):
+        for snapshot_id in self.snapshot_ids:
+            self.commit_snapshot(snapshot_id)
+
+    def commit_snapshot(self, snapshot_id: str):
+        snapshot = {"jobExecutionId": snapshot_id, "status": "COMMITTED"}
         try:
-            url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{self.snapshot_id}"
+            url = f"{self.folio_client.okapi_url}/source-storage/snapshots/{snapshot_id}"
             if self.http_client and not self.http_client.is_closed:
-                res = self.http_client.put(url, json=snapshot)
+                res = self.rate_limiter.call(self.http_client.put, url, json=snapshot)
             else:
-                res = httpx.put(url, headers=self.okapi_headers, json=snapshot, timeout=None)
+                res = self.rate_limiter.call(
+                    httpx.put, url, headers=self.okapi_headers, json=snapshot, timeout=None
+                )
             res.raise_for_status()
             logging.info("Posted Committed snapshot to FOLIO: %s", json.dumps(snapshot, indent=4))
         except Exception:
             logging.exception(
                 "Could not commit snapshot with id %s. Post this to /source-storage/snapshots/%s:",
-                self.snapshot_id,
-                self.snapshot_id,
+                snapshot_id,
+                snapshot_id,
             )
             logging.info("%s", json.dumps(snapshot, indent=4))
             sys.exit(1)
 
 
+def post_file_in_worker(
+    task_configuration: BatchPoster.TaskConfiguration,
+    library_configuration: LibraryConfiguration,
+    file_index: int,
+    snapshot_ids: List[str],
+    failed_recs_path,
+) -> dict:
+    """Posts one of the files in the task configuration in a separate process.
+
+    Args:
+        task_configuration (BatchPoster.TaskConfiguration): The configuration of the parent task
+        library_configuration (LibraryConfiguration): The library configuration
+        file_index (int): Index of the file to post in the task configuration
+        snapshot_ids (List[str]): The SRS snapshots created by the parent task
+        failed_recs_path: Path to the shard of the failed records file for this process
+
+    Returns:
+        dict: The counters and migration report of the process
+    """
+    # The processes share the request rate between them
+    library_configuration = library_configuration.copy(
+        update={
+            "max_requests_per_second": (
+                library_configuration.max_requests_per_second / task_configuration.max_workers
+            )
+        }
+    )
+    worker_configuration = task_configuration.copy(
+        update={
+            "files": [task_configuration.files[file_index]],
+            "max_workers": 1,
+            "resume_from_checkpoint": False,
+        }
+    )
+    poster = BatchPoster(worker_configuration, library_configuration, use_logging=False)
+    poster.is_worker = True
+    poster.snapshot_ids = snapshot_ids
+    # Start the processes on different snapshots
+    poster.snapshot_id = snapshot_ids[file_index % len(snapshot_ids)]
+    poster.snapshots_ready = True
+    poster.folder_structure.failed_recs_path = failed_recs_path
+    poster.folder_structure.checkpoint_path = poster.folder_structure.checkpoint_path.with_name(
+        f"{poster.folder_structure.checkpoint_path.stem}_{file_index}.json"
+    )
+    poster.checkpoints_enabled = task_configuration.resume_from_checkpoint
+    if task_configuration.resume_from_checkpoint:
+        poster.resume_position = poster.load_checkpoint()
+    poster.do_work()
+    worker_result = {counter: getattr(poster, counter) for counter in posting_counters}
+    worker_result["migration_report"] = poster.migration_report
+    worker_result["posted_hashes"] = poster.posted_hashes
+    return worker_result
+
+
+class AdaptiveBatchSizer:
+    """Keeps track of a batch size that follows how well FOLIO copes with the load.
+
+    The size grows by a quarter after every batch answered quicker than the target time
+    and is halved after slow responses, payloads rejected as too large (HTTP 413)
+    and server errors (HTTP 5XX). The largest request accepted by FOLIO is remembered
+    after a 413, so that the size never grows back over the gateway's payload limit.
+    """
+
+    def __init__(self, start_size: int, min_size: int, max_size: int, target_seconds: float):
+        self.min_size = min(min_size, max_size)
+        self.max_size = max(min_size, max_size)
+        self.size = min(max(start_size, self.min_size), self.max_size)
+        self.target_seconds = target_seconds
+        self.max_request_bytes = 0
+
+    def register_response(self, response: httpx.Response, batch_length: int) -> int:
+        """Adjusts the batch size given the response to a posted batch.
+
+        Args:
+            response (httpx.Response): The response to the batch
+            batch_length (int): Number of records in the posted batch
+
+        Returns:
+            int: The batch size to use for the next batch
+        """
+        request_bytes = len(response.request.content)
+        elapsed = response.elapsed.total_seconds()
+        if response.status_code == 413:
+            self.max_request_bytes = int(request_bytes * 0.9)
+            self.shrink()
+        elif response.status_code >= 500 or elapsed > 2 * self.target_seconds:
+            self.shrink()
+        elif response.status_code in [200, 201] and elapsed < self.target_seconds:
+            self.grow(request_bytes / max(batch_length, 1))
+        return self.size
+
+    def shrink(self):
+        previous = self.size
+        self.size = max(self.min_size, self.size // 2)
+        if self.size != previous:
+            logging.info("Decreasing batch size from %s to %s", previous, self.size)
+
+    def grow(self, bytes_per_record: float):
+        new_size = min(self.max_size, int(self.size * 1.25) + 1)
+        if self.max_request_bytes and bytes_per_record:
+            new_size = min(
+                new_size, max(self.min_size, int(self.max_request_bytes // bytes_per_record))
+            )
+        if new_size > self.size:
+            logging.debug("Increasing batch size from %s to %s", self.size, new_size)
+        self.size = new_size
+
+
 def get_api_info(object_type: str, use_safe: bool = True):
     choices = {
         "Extradata": {
@@ -601,6 +1383,18 @@ def get_api_info(object_type: str, use_safe: bool = True):
         sys.exit(1)
 
 
+def is_record_failure(exception: TransformationRecordFailedError) -> bool:
+    """Checks if FOLIO refused a batch for the records in it, rather than failing to handle it
+
+    Args:
+        exception (TransformationRecordFailedError): The error raised for the batch
+
+    Returns:
+        bool: True if FOLIO answered with HTTP 422
+    """
+    return str(exception.message).startswith("HTTP 422")
+
+
 def chunks(records, number_of_chunks):
     """Yield successive n-sized chunks from lst.
 
@@ -144,6 +144,31 @@ class BibsTransformer(MigrationTaskBase):
                 ),
             ),
         ] = False
+        worker_processes: Annotated[
+            int,
+            Field(
+                title="Worker processes",
+                description=(
+                    "Number of processes transforming the records in parallel. The output is "
+                    "written in the same order as with a single process. Enumerated HRIDs "
+                    "are reserved for every record read, so records that fail leave gaps in "
+                    "the HRID sequence. Only used with hridHandling set to default"
+                ),
+                ge=1,
+            ),
+        ] = 1
+        authority_sources_sample_rate: Annotated[
+            int,
+            Field(
+                title="Authority sources sample rate",
+                description=(
+                    "Count the $0 and $2 authority sources of every Nth record only. The "
+                    "AuthoritySources section of the migration report then holds the counts "
+                    "of the sampled records. Set to 1 to count the sources of every record"
+                ),
+                ge=1,
+            ),
+        ] = 1
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
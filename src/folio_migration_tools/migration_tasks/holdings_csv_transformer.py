@@ -14,6 +14,7 @@ from folio_uuid.folio_namespaces import FOLIONamespaces
 from httpx import HTTPError
 from pydantic import Field
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -130,7 +131,7 @@ class HoldingsCsvTransformer(MigrationTaskBase):
                     logging.info("Processing %s", file_name)
                     self.holdings.update(
                         HoldingsHelper.load_previously_generated_holdings(
-                            self.folder_structure.results_folder / file_name,
+                            self.folder_structure.get_results_file_path(file_name),
                             self.task_config.holdings_merge_criteria,
                             self.mapper.migration_report,
                             self.task_config.holdings_type_uuid_for_boundwiths,
@@ -243,7 +244,9 @@ class HoldingsCsvTransformer(MigrationTaskBase):
                 "Saving holdings created to %s",
                 self.folder_structure.created_objects_path,
             )
-            with open(self.folder_structure.created_objects_path, "w+") as holdings_file:
+            with open_results_file(
+                self.folder_structure.created_objects_path, "w+"
+            ) as holdings_file:
                 for holding in self.holdings.values():
                     for legacy_id in holding["formerIds"]:
                         # Prevent the first item in a boundwith to be overwritten
@@ -153,6 +153,19 @@ class HoldingsMarcTransformer(MigrationTaskBase):
                 description="The UUID of the Holdings type that will be used for unmapped values",
             ),
         ]
+        worker_processes: Annotated[
+            int,
+            Field(
+                title="Worker processes",
+                description=(
+                    "Number of processes transforming the records in parallel. The output is "
+                    "written in the same order as with a single process. Enumerated HRIDs "
+                    "are reserved for every record read, so records that fail leave gaps in "
+                    "the HRID sequence. Only used with hridHandling set to default"
+                ),
+                ge=1,
+            ),
+        ] = 1
 
     @staticmethod
     def get_object_type() -> FOLIONamespaces:
@@ -15,6 +15,7 @@ from typing import Optional
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from pydantic import Field
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -202,7 +203,7 @@ class ItemsTransformer(MigrationTaskBase):
 
     def do_work(self):
         logging.info("Starting....")
-        with open(self.folder_structure.created_objects_path, "w+") as results_file:
+        with open_results_file(self.folder_structure.created_objects_path, "w+") as results_file:
             for file_def in self.task_config.files:
                 try:
                     self.process_single_file(file_def, results_file)
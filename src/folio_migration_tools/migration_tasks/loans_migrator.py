@@ -67,6 +67,7 @@ class LoansMigrator(MigrationTaskBase):
             self.folio_client,
             task_configuration.fallback_service_point_id,
             self.migration_report,
+            self.rate_limiter,
         )
         logging.info("Check that SMTP is disabled before migrating loans")
         self.check_smtp_config()
@@ -86,26 +87,26 @@ class LoansMigrator(MigrationTaskBase):
         for file_def in task_configuration.open_loans_files:
             loans_file_path = self.folder_structure.legacy_records_folder / file_def.file_name
             with open(loans_file_path, "r", encoding="utf-8") as loans_file:
-                total_rows, empty_rows, reader = MappingFileMapperBase._get_delimited_file_reader(
+                row_counter, reader = MappingFileMapperBase._get_delimited_file_reader(
                     loans_file, loans_file_path
                 )
-                logging.info("Source data file contains %d rows", total_rows)
-                logging.info("Source data file contains %d empty rows", empty_rows)
+                self.semi_valid_legacy_loans.extend(
+                    self.load_and_validate_legacy_loans(
+                        reader,
+                        file_def.service_point_id or task_configuration.fallback_service_point_id,
+                    )
+                )
+                logging.info("Source data file contains %d rows", row_counter.total_rows)
+                logging.info("Source data file contains %d empty rows", row_counter.empty_rows)
                 self.migration_report.set(
                     "GeneralStatistics",
                     f"Total rows in {loans_file_path.name}",
-                    total_rows,
+                    row_counter.total_rows,
                 )
                 self.migration_report.set(
                     "GeneralStatistics",
                     f"Empty rows in {loans_file_path.name}",
-                    empty_rows,
-                )
-                self.semi_valid_legacy_loans.extend(
-                    self.load_and_validate_legacy_loans(
-                        reader,
-                        file_def.service_point_id or task_configuration.fallback_service_point_id,
-                    )
+                    row_counter.empty_rows,
                 )
 
                 logging.info(
@@ -486,7 +487,8 @@ class LoansMigrator(MigrationTaskBase):
             loan_to_put["loanDate"] = out_date.isoformat()
             loan_to_put["renewalCount"] = renewal_count
             url = f"{self.folio_client.okapi_url}/circulation/loans/{loan_to_put['id']}"
-            req = self.http_client.put(
+            req = self.rate_limiter.call(
+                self.http_client.put,
                 url,
                 headers=self.folio_client.okapi_headers,
                 json=loan_to_put,
@@ -637,13 +639,15 @@ class LoansMigrator(MigrationTaskBase):
         full_url = f"{self.folio_client.okapi_url}{url}"
         try:
             if verb == "PUT":
-                resp = self.http_client.put(
+                resp = self.rate_limiter.call(
+                    self.http_client.put,
                     full_url,
                     headers=self.folio_client.okapi_headers,
                     json=data_dict,
                 )
             elif verb == "POST":
-                resp = self.http_client.post(
+                resp = self.rate_limiter.call(
+                    self.http_client.post,
                     full_url,
                     headers=self.folio_client.okapi_headers,
                     json=data_dict,
@@ -691,8 +695,8 @@ class LoansMigrator(MigrationTaskBase):
             api_path = f"{folio_loan['id']}/change-due-date"
             api_url = f"{self.folio_client.okapi_url}/circulation/loans/{api_path}"
             body = {"dueDate": du_parser.isoparse(str(legacy_loan.due_date)).isoformat()}
-            req = self.http_client.post(
-                api_url, headers=self.folio_client.okapi_headers, json=body
+            req = self.rate_limiter.call(
+                self.http_client.post, api_url, headers=self.folio_client.okapi_headers, json=body
             )
             if req.status_code == 422:
                 error_message = json.loads(req.text)["errors"][0]["message"]
@@ -14,6 +14,7 @@ from folioclient import FolioClient
 from genericpath import isfile
 
 from folio_migration_tools import library_configuration
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.extradata_writer import ExtradataWriter
@@ -24,6 +25,7 @@ from folio_migration_tools.marc_rules_transformation.marc_file_processor import
 from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
     MARCReaderWrapper,
 )
+from folio_migration_tools.rate_limiter import RateLimiter
 
 
 class MigrationTaskBase:
@@ -54,10 +56,15 @@ class MigrationTaskBase:
             task_configuration.name,
             library_configuration.iteration_identifier,
             library_configuration.add_time_stamp_to_file_names,
+            library_configuration.results_file_compression.value,
         )
 
         self.library_configuration = library_configuration
         self.object_type = self.get_object_type()
+        self.rate_limiter = RateLimiter(
+            library_configuration.max_requests_per_second,
+            library_configuration.max_concurrent_requests,
+        )
         try:
             self.folder_structure.setup_migration_file_structure()
             # Initiate Worker
@@ -252,17 +259,27 @@ class MigrationTaskBase:
         if self.folder_structure.failed_marc_recs_file.is_file():
             os.remove(self.folder_structure.failed_marc_recs_file)
             logging.info("Removed failed marc records file to prevent duplicating data")
-        with open(self.folder_structure.created_objects_path, "w+") as created_records_file:
+        with open_results_file(
+            self.folder_structure.created_objects_path, "w+"
+        ) as created_records_file:
             self.processor = MarcFileProcessor(
                 self.mapper, self.folder_structure, created_records_file
             )
-            for file_def in self.task_configuration.files:
-                MARCReaderWrapper.process_single_file(
-                    file_def,
-                    self.processor,
-                    self.folder_structure.failed_marc_recs_file,
-                    self.folder_structure,
-                )
+            pool = MARCReaderWrapper.create_process_pool(
+                self.processor, getattr(self.task_configuration, "worker_processes", 1)
+            )
+            try:
+                for file_def in self.task_configuration.files:
+                    MARCReaderWrapper.process_single_file(
+                        file_def,
+                        self.processor,
+                        self.folder_structure.failed_marc_recs_file,
+                        self.folder_structure,
+                        pool,
+                    )
+            finally:
+                if pool:
+                    pool.shutdown()
 
     def load_ref_data_mapping_file(
         self,
@@ -13,6 +13,7 @@ from typing import Optional
 
 from folio_uuid.folio_namespaces import FOLIONamespaces
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -131,7 +132,7 @@ class OrganizationTransformer(MigrationTaskBase):
         return files
 
     def process_single_file(self, filename):
-        with open(filename, encoding="utf-8-sig") as records_file, open(
+        with open(filename, encoding="utf-8-sig") as records_file, open_results_file(
             self.folder_structure.created_objects_path, "w+"
         ) as results_file:
             self.mapper.migration_report.add_general_statistics(
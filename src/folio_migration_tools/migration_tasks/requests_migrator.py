@@ -46,6 +46,7 @@ class RequestsMigrator(MigrationTaskBase):
             self.folio_client,
             "",
             self.migration_report,
+            self.rate_limiter,
         )
         try:
             logging.info("Attempting to retrieve tenant timezone configuration...")
@@ -155,7 +156,10 @@ class RequestsMigrator(MigrationTaskBase):
                 res, legacy_request = self.prepare_legacy_request(legacy_request)
                 if res:
                     if self.circulation_helper.create_request(
-                        self.folio_client, legacy_request, self.migration_report
+                        self.folio_client,
+                        legacy_request,
+                        self.migration_report,
+                        self.rate_limiter,
                     ):
                         self.migration_report.add_general_statistics(
                             i18n.t("Successfully migrated requests")
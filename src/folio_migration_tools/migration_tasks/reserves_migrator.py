@@ -168,13 +168,15 @@ class ReservesMigrator(MigrationTaskBase):
         full_url = f"{self.folio_client.okapi_url}{url}"
         try:
             if verb == "PUT":
-                resp = httpx.put(
+                resp = self.rate_limiter.call(
+                    httpx.put,
                     full_url,
                     headers=self.folio_client.okapi_headers,
                     json=data_dict,
                 )
             elif verb == "POST":
-                resp = httpx.post(
+                resp = self.rate_limiter.call(
+                    httpx.post,
                     full_url,
                     headers=self.folio_client.okapi_headers,
                     json=data_dict,
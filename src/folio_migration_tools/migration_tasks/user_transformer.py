@@ -6,6 +6,7 @@ from typing import Optional
 
 from folio_uuid.folio_namespaces import FOLIONamespaces
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.helper import Helper
@@ -104,10 +105,8 @@ class UserTransformer(MigrationTaskBase):
         )
 
         try:
-            with open(
-                self.folder_structure.created_objects_path,
-                "w+",
-                encoding="utf-8",
+            with open_results_file(
+                self.folder_structure.created_objects_path, "w+"
             ) as results_file:
                 with open(source_path, encoding="utf8") as object_file:
                     logging.info(f"processing {source_path}")
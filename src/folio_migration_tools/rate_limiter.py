@@ -0,0 +1,153 @@
+import email.utils
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Callable
+
+import httpx
+
+THROTTLING_STATUS_CODES = [429]
+GATEWAY_STATUS_CODES = [502, 503, 504]
+IDEMPOTENT_METHODS = ["GET", "HEAD", "OPTIONS", "PUT", "DELETE"]
+
+
+class RateLimiter:
+    """Throttles the requests a task sends to FOLIO and backs off when FOLIO pushes back.
+
+    Requests are spread out by a token bucket refilled at requests_per_second, and at most
+    max_concurrent_requests are sent at the same time. Responses with HTTP 429 are retried
+    after the time given in the Retry-After header, or after an exponentially growing delay
+    with random jitter. HTTP 502, 503 and 504 are retried the same way, but only for
+    idempotent methods, since FOLIO may have stored a POST before the gateway gave up on it.
+    A limit set to 0 means no limit.
+    The limiter is thread safe, so one instance can be shared by all threads of a task.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 0,
+        max_concurrent_requests: int = 0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 120.0,
+    ):
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.tokens = max(requests_per_second, 1.0)
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+        self.slots = (
+            threading.BoundedSemaphore(max_concurrent_requests)
+            if max_concurrent_requests > 0
+            else None
+        )
+
+    def call(self, method: Callable[..., httpx.Response], *args, **kwargs) -> httpx.Response:
+        """Sends a request through the limiter, retrying it while FOLIO pushes back.
+
+        Args:
+            method (Callable[..., httpx.Response]): The function sending the request,
+                like httpx.post or the put method of a httpx.Client
+            args: Positional arguments for the method
+            kwargs: Keyword arguments for the method
+
+        Returns:
+            httpx.Response: The response to the last attempt
+        """
+        attempt = 0
+        while True:
+            self.wait_for_token()
+            if self.slots:
+                with self.slots:
+                    response = method(*args, **kwargs)
+            else:
+                response = method(*args, **kwargs)
+            if not is_retryable(response) or attempt >= self.max_retries:
+                return response
+            delay = self.get_delay(response, attempt)
+            attempt += 1
+            logging.info(
+                "HTTP %s from %s. Retrying in %.1fs (attempt %s of %s)",
+                response.status_code,
+                response.request.url.path,
+                delay,
+                attempt,
+                self.max_retries,
+            )
+            time.sleep(delay)
+
+    def wait_for_token(self):
+        if self.requests_per_second <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                max(self.requests_per_second, 1.0),
+                self.tokens + (now - self.last_refill) * self.requests_per_second,
+            )
+            self.last_refill = now
+            self.tokens -= 1
+            wait = -self.tokens / self.requests_per_second if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+    def get_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Returns how long to wait before retrying a request
+
+        Args:
+            response (httpx.Response): The response asking for a retry
+            attempt (int): Number of retries made so far
+
+        Returns:
+            float: Number of seconds to wait
+        """
+        retry_after = get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * 2**attempt)
+        return backoff / 2 + random.uniform(0, backoff / 2)  # noqa: S311
+
+
+def is_retryable(response: httpx.Response) -> bool:
+    """Checks if a request can safely be sent again after the response
+
+    Args:
+        response (httpx.Response): The response
+
+    Returns:
+        bool: True for throttled requests, and for idempotent requests that timed out
+    """
+    if response.status_code in THROTTLING_STATUS_CODES:
+        return True
+    return (
+        response.status_code in GATEWAY_STATUS_CODES
+        and response.request.method in IDEMPOTENT_METHODS
+    )
+
+
+def get_retry_after(response: httpx.Response):
+    """Parses the Retry-After header, given either in seconds or as an HTTP date
+
+    Args:
+        response (httpx.Response): The response
+
+    Returns:
+        The number of seconds to wait, or None if the header is missing or invalid
+    """
+    retry_after = response.headers.get("retry-after", "").strip()
+    if not retry_after:
+        return None
+    if retry_after.isdigit():
+        return float(retry_after)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,74 @@
+import re
+from functools import lru_cache
+
+from folio_migration_tools.custom_exceptions import TransformationProcessError
+
+NON_ALPHANUMERIC = re.compile(r"[^A-Za-z0-9 ]+")
+ALPHABETIC_PREFIX = re.compile("^[A-Za-z]+")
+TRAILING_PUNCTUATION = re.compile(r"[\s:\/]{0,3}$")
+REPEATED_SPACES = re.compile(" +")
+ARRAY_INDEX = re.compile(r"\[\d+\]")
+ARRAY_INDEX_GROUP = re.compile(r"\[([\d]+)\]")
+ITEM_STATUS_IN_CHECKOUT_ERROR = re.compile(
+    r"(?<=has the item status\s).*(?=\sand cannot be checked out)"
+)
+COMPOSITE_PO_LINE_ID = re.compile(r"compositePoLines\[(\d+)\]\.id")
+NOTES_PROPERTY = re.compile(r"notes\[\d+\]\.")
+ADDRESS_CATEGORIES = re.compile(r"addresses\[(\d+)\]\.categories\[(\d+)\]")
+EMAIL_CATEGORIES = re.compile(r"emails\[(\d+)\]\.categories\[(\d+)\]")
+PHONE_NUMBER_CATEGORIES = re.compile(r"phoneNumbers\[(\d+)\]\.categories\[(\d+)\]")
+INTERFACE_CREDENTIAL_ID = re.compile(r"interfaces\[(\d+)\]\.interfaceCredential.interfaceId")
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Compiles a regular expression supplied by a mapping file or mapping rules.
+
+    The patterns are compiled once and reused for every record.
+
+    Args:
+        pattern (str): The regular expression
+
+    Raises:
+        TransformationProcessError: If the pattern is not a valid regular expression
+
+    Returns:
+        re.Pattern: The compiled pattern
+    """
+    try:
+        return re.compile(pattern)
+    except re.error as ee:
+        raise TransformationProcessError("", f"Invalid regular expression: {ee}", pattern) from ee
+
+
+def first_match_or_empty_pattern(pattern: str) -> re.Pattern:
+    """Compiles a regexGetFirstMatchOrEmpty rule from a mapping file.
+
+    Args:
+        pattern (str): The regular expression from the mapping file
+
+    Returns:
+        re.Pattern: A pattern that matches the rule, or the empty string at the end of the value
+    """
+    return compile_pattern(f"{pattern}|$")
+
+
+def first_match_or_empty(pattern: str, value: str):
+    """Returns the first match of a regexGetFirstMatchOrEmpty rule in a value.
+
+    Behaves like re.findall(f"{pattern}|$", value)[0] without scanning the rest of the value.
+
+    Args:
+        pattern (str): The regular expression from the mapping file
+        value (str): The value to search
+
+    Returns:
+        The first match, its group, or its groups, just like re.findall
+    """
+    compiled = first_match_or_empty_pattern(pattern)
+    match = compiled.search(value)
+    if compiled.groups == 0:
+        return match.group(0)
+    if compiled.groups == 1:
+        return match.group(1) or ""
+    return match.groups(default="")
@@ -1,6 +1,19 @@
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest.mock import Mock
+
+import httpx
+import pytest
 from folio_uuid.folio_namespaces import FOLIONamespaces
 
+from folio_migration_tools.custom_exceptions import TransformationProcessError
+from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
+from folio_migration_tools.library_configuration import FileDefinition
+from folio_migration_tools.migration_report import MigrationReport
 from folio_migration_tools.migration_tasks import batch_poster
+from folio_migration_tools.migration_tasks.batch_poster import AdaptiveBatchSizer
 from folio_migration_tools.migration_tasks.batch_poster import BatchPoster
 
 
@@ -42,3 +55,363 @@ def test_get_extradata_endpoint_interface_credential():
         endpoint
         == "organizations-storage/interfaces/7e131c38-5384-44ed-9f4a-da6ca2f36498/credentials"
     )
+
+
+def test_submit_batch_handles_responses_in_order():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.concurrent_batches = 2
+    mocked_batch_poster.task_configuration.object_type = "Instances"
+    mocked_batch_poster.in_flight = deque()
+    mocked_batch_poster.current_position = (0, 0, 0)
+    mocked_batch_poster.do_post = lambda batch: f"response {batch[0]}"
+    mocked_batch_poster.handle_oldest_in_flight = (
+        lambda failed_recs_file: BatchPoster.handle_oldest_in_flight(
+            mocked_batch_poster, failed_recs_file
+        )
+    )
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        mocked_batch_poster.executor = executor
+        for i in range(1, 4):
+            BatchPoster.submit_batch(mocked_batch_poster, [i], None, i)
+        assert len(mocked_batch_poster.in_flight) == 2
+        BatchPoster.drain_in_flight(mocked_batch_poster, None)
+
+    assert not mocked_batch_poster.in_flight
+    handled = [c.args for c in mocked_batch_poster.handle_batch_response.call_args_list]
+    assert handled == [
+        ("response 1", [1], None, 1),
+        ("response 2", [2], None, 2),
+        ("response 3", [3], None, 3),
+    ]
+
+
+def fake_response(status_code: int, seconds: float, content: bytes = b"{}"):
+    response = httpx.Response(
+        status_code, request=httpx.Request("POST", "https://okapi.example", content=content)
+    )
+    response.elapsed = timedelta(seconds=seconds)
+    return response
+
+
+def test_adaptive_batch_sizer_grows_and_shrinks():
+    sizer = AdaptiveBatchSizer(100, 10, 200, 10)
+    assert sizer.register_response(fake_response(201, 1), 100) == 126
+    assert sizer.register_response(fake_response(201, 15), 126) == 126
+    assert sizer.register_response(fake_response(201, 25), 126) == 63
+    assert sizer.register_response(fake_response(503, 1), 63) == 31
+    assert sizer.register_response(fake_response(422, 1), 31) == 31
+    for _ in range(20):
+        sizer.register_response(fake_response(201, 1), sizer.size)
+    assert sizer.size == 200
+    for _ in range(20):
+        sizer.register_response(fake_response(500, 1), sizer.size)
+    assert sizer.size == 10
+
+
+def test_adaptive_batch_sizer_respects_payload_limit():
+    sizer = AdaptiveBatchSizer(100, 1, 1000, 10)
+    assert sizer.register_response(fake_response(413, 1, b"x" * 10000), 100) == 50
+    for _ in range(20):
+        sizer.register_response(fake_response(201, 1, b"x" * 100 * sizer.size), sizer.size)
+    assert sizer.size == 90
+
+
+def test_handle_failed_batch_bisects_down_to_failing_records():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.bisect_failed_batches = True
+    mocked_batch_poster.migration_report = MigrationReport()
+    mocked_batch_poster.records_failed_individually = 0
+    posted = []
+
+    def post_batch(batch, failed_recs_file, num_records):
+        if "bad" in batch:
+            raise TransformationRecordFailedError("", "HTTP 422", "")
+        posted.extend(batch)
+
+    mocked_batch_poster.post_batch = post_batch
+    mocked_batch_poster.handle_failed_batch = lambda *args: BatchPoster.handle_failed_batch(
+        mocked_batch_poster, *args
+    )
+    batch = ["a", "b", "c", "bad", "d", "e", "f", "g"]
+    BatchPoster.handle_failed_batch(
+        mocked_batch_poster,
+        TransformationRecordFailedError("", "HTTP 422", ""),
+        "",
+        batch,
+        8,
+        None,
+    )
+
+    assert posted == ["a", "b", "c", "d", "e", "f", "g"]
+    failed = [c.args[2] for c in mocked_batch_poster.handle_generic_exception.call_args_list]
+    assert failed == [["bad"]]
+    assert mocked_batch_poster.records_failed_individually == 1
+
+
+def test_handle_failed_batch_does_not_bisect_server_errors():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.bisect_failed_batches = True
+    mocked_batch_poster.records_failed_individually = 0
+    batch = ["a", "b", "c", "d"]
+    BatchPoster.handle_failed_batch(
+        mocked_batch_poster,
+        TransformationRecordFailedError("", "HTTP 503\tService Unavailable", ""),
+        "",
+        batch,
+        4,
+        None,
+    )
+
+    mocked_batch_poster.post_batch.assert_not_called()
+    failed = [c.args[2] for c in mocked_batch_poster.handle_generic_exception.call_args_list]
+    assert failed == [batch]
+    assert mocked_batch_poster.records_failed_individually == 0
+
+
+def mocked_batch_poster_with_checkpoint(tmp_path, file_names):
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.performing_rerun = False
+    mocked_batch_poster.checkpoints_enabled = True
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.files = [
+        FileDefinition(file_name=file_name) for file_name in file_names
+    ]
+    mocked_batch_poster.folder_structure = Mock()
+    mocked_batch_poster.folder_structure.checkpoint_path = tmp_path / "checkpoint_post.json"
+    mocked_batch_poster.folder_structure.failed_recs_path = tmp_path / "failed_records.txt"
+    mocked_batch_poster.folder_structure.get_results_file_path = lambda name: tmp_path / name
+    for file_name in file_names:
+        if not (tmp_path / file_name).exists():
+            (tmp_path / file_name).write_text('{"id": "1"}\n' * 1000)
+    mocked_batch_poster.get_results_file_stats = lambda names: BatchPoster.get_results_file_stats(
+        mocked_batch_poster, names
+    )
+    mocked_batch_poster.processed = 0
+    mocked_batch_poster.num_posted = 20
+    mocked_batch_poster.num_failures = 2
+    mocked_batch_poster.failed_batches = 1
+    mocked_batch_poster.users_created = 0
+    mocked_batch_poster.users_updated = 0
+    mocked_batch_poster.records_failed_individually = 0
+    return mocked_batch_poster
+
+
+def test_save_and_load_checkpoint(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json", "c.json"])
+    BatchPoster.save_checkpoint(poster, (1, 4096, 22))
+
+    resumed = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json", "c.json"])
+    resumed.num_posted = resumed.num_failures = resumed.failed_batches = 0
+    resumed.resume_position = BatchPoster.load_checkpoint(resumed)
+
+    assert resumed.resume_position == (1, 4096)
+    assert resumed.processed == 22
+    assert resumed.num_posted == 20
+    assert resumed.num_failures == 2
+    assert BatchPoster.get_resume_offset(resumed, 0) is None
+    assert BatchPoster.get_resume_offset(resumed, 1) == 4096
+    assert BatchPoster.get_resume_offset(resumed, 2) == 0
+
+
+def test_load_checkpoint_for_other_files_fails(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json"])
+    BatchPoster.save_checkpoint(poster, (1, 4096, 22))
+
+    resumed = mocked_batch_poster_with_checkpoint(tmp_path, ["c.json", "b.json"])
+    with pytest.raises(TransformationProcessError):
+        BatchPoster.load_checkpoint(resumed)
+
+
+def test_load_checkpoint_for_changed_files_fails(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json"])
+    BatchPoster.save_checkpoint(poster, (1, 4096, 22))
+    (tmp_path / "a.json").write_text('{"id": "2"}\n')
+
+    resumed = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json"])
+    with pytest.raises(TransformationProcessError):
+        BatchPoster.load_checkpoint(resumed)
+
+
+def test_resume_copies_records_that_failed_before_the_interruption(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json"])
+    poster.folder_structure.failed_recs_path.write_text('{"id": "3"}\n')
+    BatchPoster.save_checkpoint(poster, (0, 4096, 22))
+
+    resumed = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json"])
+    resumed.folder_structure.failed_recs_path = tmp_path / "failed_records_resumed.txt"
+    BatchPoster.load_checkpoint(resumed)
+    with open(resumed.folder_structure.failed_recs_path, "w") as failed_recs_file:
+        BatchPoster.copy_previous_failed_records(resumed, failed_recs_file)
+
+    assert resumed.folder_structure.failed_recs_path.read_text() == '{"id": "3"}\n'
+
+
+def test_remove_checkpoints(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json", "b.json"])
+    BatchPoster.save_checkpoint(poster, (1, 4096, 22))
+    worker_checkpoint = tmp_path / "checkpoint_post_1.json"
+    worker_checkpoint.write_text("{}")
+    BatchPoster.remove_checkpoints(poster)
+
+    assert not poster.folder_structure.checkpoint_path.exists()
+    assert not worker_checkpoint.exists()
+
+
+def test_save_checkpoint_only_when_resume_is_on(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json"])
+    poster.checkpoints_enabled = False
+    BatchPoster.save_checkpoint(poster, (0, 4096, 22))
+    assert not poster.folder_structure.checkpoint_path.exists()
+
+
+def test_post_row_saves_checkpoint_every_interval(tmp_path):
+    poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json"])
+    poster.task_configuration.object_type = "Organizations"
+    poster.task_configuration.skip_unchanged_records = False
+    poster.api_info = batch_poster.get_api_info("Organizations")
+    saved = []
+    poster.save_checkpoint = saved.append
+    for processed in range(1, 2 * batch_poster.checkpoint_interval + 2):
+        poster.processed = processed
+        poster.current_position = (0, processed * 10, processed)
+        assert BatchPoster.post_row(poster, b'{"id": "1"}\n', [], None, "a.json") == []
+    assert poster.post_single_records.call_count == 2 * batch_poster.checkpoint_interval + 1
+    assert saved == [
+        (0, batch_poster.checkpoint_interval * 10, batch_poster.checkpoint_interval),
+        (0, batch_poster.checkpoint_interval * 20, 2 * batch_poster.checkpoint_interval),
+    ]
+
+
+def test_get_text_payload():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    rows = ['{"id": "1", "title": "tab\\there"}', '{"id": "2", "title": "Bogotá"}']
+    for object_type in ["Instances", "Holdings", "Items", "Users", "SRS"]:
+        mocked_batch_poster.api_info = batch_poster.get_api_info(object_type)
+        payload = json.loads(BatchPoster.get_text_payload(mocked_batch_poster, rows))
+        object_name = mocked_batch_poster.api_info["object_name"]
+        if object_type == "Instances":
+            assert payload == {"instances": [json.loads(row) for row in rows]}
+        if object_type in ["Users", "SRS"]:
+            assert payload[object_name] == [json.loads(row) for row in rows]
+            assert payload["totalRecords"] == 2
+        else:
+            assert list(payload.keys()) == [object_name]
+
+
+def test_write_failed_batch_to_file_keeps_text_rows(tmp_path):
+    path = tmp_path / "failed.txt"
+    with open(path, "w") as failed_recs_file:
+        batch_poster.write_failed_batch_to_file(['{"id": "1"}'], failed_recs_file)
+        batch_poster.write_failed_batch_to_file([{"id": "2"}], failed_recs_file)
+
+    assert path.read_text() == '{"id": "1"}\n{"id": "2"}\n'
+
+
+def test_next_snapshot_spreads_batches_over_snapshots():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.snapshot_ids = ["a", "b", "c"]
+    mocked_batch_poster.snapshot_id = "a"
+    used = []
+    for _ in range(4):
+        BatchPoster.next_snapshot(mocked_batch_poster)
+        used.append(mocked_batch_poster.snapshot_id)
+    assert used == ["b", "c", "a", "b"]
+
+
+def test_submit_batch_waits_for_snapshots_once():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.object_type = "SRS"
+    mocked_batch_poster.current_position = (0, 0, 0)
+    mocked_batch_poster.executor = None
+    mocked_batch_poster.snapshots_ready = False
+
+    def wait_for_snapshots():
+        assert not mocked_batch_poster.post_batch.called
+        mocked_batch_poster.snapshots_ready = True
+
+    mocked_batch_poster.wait_for_snapshots = Mock(side_effect=wait_for_snapshots)
+    for i in range(1, 3):
+        BatchPoster.submit_batch(mocked_batch_poster, [i], None, i)
+    assert mocked_batch_poster.wait_for_snapshots.call_count == 1
+    assert mocked_batch_poster.post_batch.call_count == 2
+
+
+def test_wait_for_snapshots_polls_until_created(monkeypatch):
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.snapshot_timeout_seconds = 60
+    mocked_batch_poster.folio_client = Mock()
+    mocked_batch_poster.folio_client.okapi_url = "https://okapi.example"
+    mocked_batch_poster.snapshot_ids = ["a", "b"]
+    mocked_batch_poster.http_client = Mock()
+    mocked_batch_poster.http_client.is_closed = False
+    responses = iter([fake_response(404, 0), fake_response(200, 0), fake_response(200, 0)])
+    mocked_batch_poster.rate_limiter = Mock()
+    mocked_batch_poster.rate_limiter.call = lambda method, url: next(responses)
+    sleeps = []
+    monkeypatch.setattr(batch_poster.time, "sleep", sleeps.append)
+    BatchPoster.wait_for_snapshots(mocked_batch_poster)
+    assert sleeps == [0.5]
+    assert mocked_batch_poster.snapshots_ready
+
+
+def test_wait_for_snapshots_times_out(monkeypatch):
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.snapshot_timeout_seconds = 0
+    mocked_batch_poster.folio_client = Mock()
+    mocked_batch_poster.folio_client.okapi_url = "https://okapi.example"
+    mocked_batch_poster.snapshot_ids = ["a"]
+    mocked_batch_poster.http_client = Mock()
+    mocked_batch_poster.http_client.is_closed = False
+    mocked_batch_poster.rate_limiter = Mock()
+    mocked_batch_poster.rate_limiter.call = lambda method, url: fake_response(404, 0)
+    monkeypatch.setattr(batch_poster.time, "sleep", lambda delay: None)
+    with pytest.raises(TransformationProcessError):
+        BatchPoster.wait_for_snapshots(mocked_batch_poster)
+
+
+def mocked_batch_poster_with_hashes(tmp_path, tenant="https://okapi.example diku"):
+    mocked_batch_poster = mocked_batch_poster_with_checkpoint(tmp_path, ["a.json"])
+    mocked_batch_poster.folder_structure.posted_hashes_path = tmp_path / "posted_hashes_post.json"
+    mocked_batch_poster.get_tenant_key = lambda: tenant
+    mocked_batch_poster.previous_hashes = {}
+    mocked_batch_poster.posted_hashes = {}
+    return mocked_batch_poster
+
+
+def test_skip_unchanged_records_between_runs(tmp_path):
+    rows = ['{"id": "1", "title": "a"}', '{"id": "2", "title": "b"}', '{"id": "3"}']
+    poster = mocked_batch_poster_with_hashes(tmp_path)
+    assert not any(BatchPoster.is_unchanged(poster, row) for row in rows)
+    (tmp_path / "failed_records.txt").write_text('{"id": "3"}\n')
+    BatchPoster.save_posted_hashes(poster)
+
+    next_run = mocked_batch_poster_with_hashes(tmp_path)
+    BatchPoster.load_posted_hashes(next_run)
+    changed_rows = ['{"id": "1", "title": "a"}', '{"id": "2", "title": "c"}', '{"id": "3"}']
+    assert [BatchPoster.is_unchanged(next_run, row) for row in changed_rows] == [
+        True,
+        False,
+        False,
+    ]
+
+    other_tenant = mocked_batch_poster_with_hashes(tmp_path, "https://okapi.example other")
+    BatchPoster.load_posted_hashes(other_tenant)
+    assert not BatchPoster.is_unchanged(other_tenant, rows[0])
+
+
+def test_rerun_run_skips_records_that_failed_individually():
+    mocked_batch_poster = Mock(spec=BatchPoster)
+    mocked_batch_poster.task_configuration = Mock(spec=BatchPoster.TaskConfiguration)
+    mocked_batch_poster.task_configuration.rerun_failed_records = True
+    mocked_batch_poster.folder_structure = Mock()
+    mocked_batch_poster.num_failures = 3
+    mocked_batch_poster.records_failed_individually = 3
+    BatchPoster.rerun_run(mocked_batch_poster)
+
+    mocked_batch_poster.do_work.assert_not_called()
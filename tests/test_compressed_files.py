@@ -0,0 +1,47 @@
+import io
+
+import pytest
+
+from folio_migration_tools.compressed_files import open_results_file
+
+
+def test_open_results_file_round_trips_gzip(tmp_path):
+    path = tmp_path / "folio_instances.json.gz"
+    with open_results_file(path, "w+") as results_file:
+        results_file.write('{"id": "1", "title": "Bogotá"}\n{"id": "2"}\n')
+    assert path.read_bytes()[:2] == b"\x1f\x8b"
+    with open_results_file(path, "rb") as rows:
+        assert [row.decode("utf-8") for row in rows] == [
+            '{"id": "1", "title": "Bogotá"}\n',
+            '{"id": "2"}\n',
+        ]
+
+
+def test_open_results_file_seeks_in_decompressed_data(tmp_path):
+    path = tmp_path / "folio_instances.json.gz"
+    with open_results_file(path, "w+") as results_file:
+        results_file.write('{"id": "1"}\n{"id": "2"}\n')
+    with open_results_file(path, "rb") as rows:
+        rows.seek(len(b'{"id": "1"}\n'))
+        assert list(rows) == [b'{"id": "2"}\n']
+
+
+def test_open_results_file_seeks_forward_in_zstd_data(tmp_path):
+    pytest.importorskip("zstandard")
+    path = tmp_path / "folio_instances.json.zst"
+    rows = [f'{{"id": "{i}"}}\n' for i in range(50000)]
+    with open_results_file(path, "w+") as results_file:
+        results_file.writelines(rows)
+    offset = sum(len(row) for row in rows[:40000])
+    with open_results_file(path, "rb") as results_file:
+        assert results_file.seek(offset) == offset
+        assert next(results_file) == rows[40000].encode("utf-8")
+        with pytest.raises(io.UnsupportedOperation):
+            results_file.seek(0)
+
+
+def test_open_results_file_plain(tmp_path):
+    path = tmp_path / "folio_instances.json"
+    with open_results_file(path, "w+") as results_file:
+        results_file.write('{"id": "1"}\n')
+    assert path.read_text() == '{"id": "1"}\n'
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from unittest.mock import Mock
 
 from folioclient import FolioClient
@@ -5,6 +6,7 @@ from pymarc import Field
 from pymarc import Subfield
 
 from folio_migration_tools.marc_rules_transformation.conditions import Conditions
+from folio_migration_tools.migration_report import MigrationReport
 
 
 def test_condition_trim_period():
@@ -69,3 +71,45 @@ def test_condition_set_contributor_type_text():
         mock, legacy_id, value_700, {}, marc_fields[1]
     )
     assert res_700 == "editor"
+
+
+def test_get_ref_data_tuple_indexes_once():
+    mock = Mock(spec=Conditions)
+    mock.ref_data_dicts = {}
+    locations = [{"id": "1", "code": "MAIN", "name": "Main library"}]
+    res = Conditions.get_ref_data_tuple(mock, locations, "locations", "missing", "code")
+    assert res == ()
+    index = mock.ref_data_dicts["locationscode"]
+    res = Conditions.get_ref_data_tuple(mock, locations, "locations", "Main", "code")
+    assert res == ("1", "Main library")
+    assert mock.ref_data_dicts["locationscode"] is index
+
+
+def test_get_cached_condition_replays_report_entries():
+    mock = Mock(spec=Conditions)
+    mock.cacheable_conditions = Conditions.cacheable_conditions
+    mock.condition_results = OrderedDict()
+    mock.condition_results_size = 10
+    mock.mapper = Mock()
+    mock.mapper.migration_report = MigrationReport()
+
+    def call_condition(name, legacy_id, value, parameter, marc_field):
+        return Conditions.condition_set_publisher_role(
+            mock, legacy_id, value, parameter, marc_field
+        )
+
+    mock.call_condition.side_effect = call_condition
+    marc_field = Field(tag="264", indicators=[" ", "1"], subfields=[Subfield(code="a", value="x")])
+    for legacy_id in ["1", "2", "3"]:
+        res = Conditions.get_cached_condition(
+            mock, "set_publisher_role", legacy_id, "", {}, marc_field
+        )
+        assert res == "Publication"
+    assert mock.call_condition.call_count == 1
+    assert (
+        mock.mapper.migration_report.report["MappedPublisherRoleFromIndicator2"][
+            "264 ind2 1->Publication"
+        ]
+        == 3
+    )
+    assert not mock.mapper.migration_report.recordings
@@ -94,3 +94,32 @@ def test_setup_migration_file_structure():
         str(folder_structure.transformation_extra_data_path)
         == "iterations/test_iteration/results/extradata_test_task.extradata"
     )
+
+
+@patch.object(FolderStructure, "verify_folder", fake_verify_folder)
+def test_setup_migration_file_structure_compressed_results():
+    folder_structure = FolderStructure(
+        "", FOLIONamespaces.instances, "test_task", "test_iteration", False, "gzip"
+    )
+    folder_structure.setup_migration_file_structure()
+    assert str(folder_structure.created_objects_path).endswith("folio_instances_test_task.json.gz")
+    assert str(folder_structure.srs_records_path).endswith("folio_srs_instances_test_task.json.gz")
+    assert str(folder_structure.failed_marc_recs_file).endswith("failed_records_test_task.mrc")
+
+
+@patch.object(FolderStructure, "verify_folder", fake_verify_folder)
+def test_get_results_file_path_adds_compression_suffix(tmp_path):
+    folder_structure = FolderStructure(
+        "", FOLIONamespaces.instances, "test_task", "test_iteration", False, "gzip"
+    )
+    folder_structure.results_folder = tmp_path
+    assert folder_structure.get_results_file_path("folio_items.json") == (
+        tmp_path / "folio_items.json.gz"
+    )
+    assert folder_structure.get_results_file_path("folio_items.json.zst") == (
+        tmp_path / "folio_items.json.zst"
+    )
+    (tmp_path / "folio_items.json").write_text("")
+    assert folder_structure.get_results_file_path("folio_items.json") == (
+        tmp_path / "folio_items.json"
+    )
@@ -3,6 +3,7 @@ from copy import deepcopy
 
 import pytest
 
+from folio_migration_tools.compressed_files import open_results_file
 from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.holdings_helper import HoldingsHelper
 from folio_migration_tools.migration_report import MigrationReport
@@ -334,3 +335,16 @@ def test_holdings_notes2():
     folio_rec = {"notes": [{"note": "", "holdingsNoteTypeId": "apa"}]}
     HoldingsHelper.handle_notes(folio_rec)
     assert "notes" not in folio_rec
+
+
+def test_load_previously_generated_holdings_from_gzip_file(tmp_path):
+    path = tmp_path / "folio_holdings.json.gz"
+    with open_results_file(path, "w+") as holdings_file:
+        holdings_file.write(
+            '{"id": "1", "instanceId": "i1", "permanentLocationId": "l1", "formerIds": ["a"]}\n'
+            '{"id": "2", "instanceId": "i2", "permanentLocationId": "l1", "formerIds": ["b"]}\n'
+        )
+    res = HoldingsHelper.load_previously_generated_holdings(
+        path, ["instanceId", "permanentLocationId"], MigrationReport()
+    )
+    assert [h["id"] for h in res.values()] == ["1", "2"]
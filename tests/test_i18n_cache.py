@@ -0,0 +1,28 @@
+from pathlib import Path
+
+import i18n
+
+from folio_migration_tools import i18n_cache
+
+
+def test_t_translates_plain_messages():
+    i18n.load_config(Path(__file__).parents[1] / "i18n_config.py")
+    assert i18n_cache.t("blurbs.Introduction.title") == "Introduction"
+    assert i18n_cache.t("blurbs.Introduction.title") == i18n.t("blurbs.Introduction.title")
+
+
+def test_t_interpolates_arguments():
+    i18n.load_config(Path(__file__).parents[1] / "i18n_config.py")
+    assert i18n_cache.t("Changed %{a} to %{b}", a="x", b="c") == i18n.t(
+        "Changed %{a} to %{b}", a="x", b="c"
+    )
+
+
+def test_t_does_not_keep_messages_looked_up_before_the_translations_load(monkeypatch):
+    monkeypatch.setattr(i18n_cache, "translations", {})
+    with monkeypatch.context() as unloaded:
+        unloaded.setitem(i18n.config.settings, "load_path", [])
+        unloaded.setattr(i18n.translations, "container", {})
+        assert i18n_cache.t("blurbs.Introduction.title") == "blurbs.Introduction.title"
+    i18n.load_config(Path(__file__).parents[1] / "i18n_config.py")
+    assert i18n_cache.t("blurbs.Introduction.title") == "Introduction"
@@ -8,6 +8,7 @@ import pytest
 from folio_uuid.folio_namespaces import FOLIONamespaces
 from folioclient import FolioClient
 
+from folio_migration_tools.custom_exceptions import TransformationProcessError
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
 from folio_migration_tools.library_configuration import LibraryConfiguration
 from folio_migration_tools.mapping_file_transformation.mapping_file_mapper_base import (
@@ -1623,10 +1624,9 @@ def test__get_delimited_file_reader():
             delimited_file_tab = (Path("/tmp/delimited_data.tsv"), delimited_data_tab_file)
             delimited_file_comma = (Path("/tmp/delimited_data.csv"), delimited_data_comma_file)
             for file in (delimited_file_tab, delimited_file_comma):
-                total_rows, empty_rows, reader = MappingFileMapperBase._get_delimited_file_reader(
+                row_counter, reader = MappingFileMapperBase._get_delimited_file_reader(
                     file[1], file[0]
                 )
-                assert total_rows == 2 and empty_rows == 1
                 for idx, row in enumerate(reader):
                     if idx == 0:
                         for key in row.keys():
@@ -1637,6 +1637,27 @@ def test__get_delimited_file_reader():
                             and row["header_2"] == "value_2"
                             and row["header_3"] == "value_3"
                         )
+                assert row_counter.total_rows == 2 and row_counter.empty_rows == 1
+
+
+def test_get_objects_reports_row_counts_after_reading(mocked_folio_client):
+    the_map = {
+        "data": [
+            {
+                "folio_field": "legacyIdentifier",
+                "legacy_field": "header_1",
+                "value": "",
+                "description": "",
+            }
+        ]
+    }
+    mapper = MyTestableFileMapper({}, the_map, mocked_folio_client)
+    with io.StringIO(delimited_data_comma) as delimited_data_comma_file:
+        rows = list(mapper.get_objects(delimited_data_comma_file, Path("/tmp/data.csv")))
+    assert len(rows) == 2
+    statistics = mapper.migration_report.report["GeneralStatistics"]
+    assert statistics["Number of rows in data.csv"] == 2
+    assert statistics["Number of empty rows in data.csv"] == 1
 
 
 def test_map_string_first_level(mocked_folio_client: FolioClient):
@@ -4061,6 +4082,23 @@ def test_get_legacy_value_mapped_value():
     assert res == "Leif"
 
 
+def mock_mapper_with_mapping_plan(record_map):
+    mock_self = Mock(spec=MappingFileMapperBase)
+    mock_self.record_map = record_map
+    mock_self.folio_keys = [k["folio_field"] for k in record_map["data"]]
+    MappingFileMapperBase.compile_mapping_plan(mock_self)
+    mock_self.get_map_entries_by_folio_prop_name = (
+        MappingFileMapperBase.get_map_entries_by_folio_prop_name
+    )
+    mock_self.get_map_entries = lambda folio_prop_name: MappingFileMapperBase.get_map_entries(
+        mock_self, folio_prop_name
+    )
+    mock_self.get_legacy_value_cache = (
+        lambda map_entry: MappingFileMapperBase.get_legacy_value_cache(mock_self, map_entry)
+    )
+    return mock_self
+
+
 def test_get_prop_same_as_get_legacy_value_mapped_value():
     legacy_object = {"title": "Leif"}
     mapping_file_entry = {
@@ -4073,8 +4111,7 @@ def test_get_prop_same_as_get_legacy_value_mapped_value():
     res = MappingFileMapperBase.get_legacy_value(
         legacy_object, mapping_file_entry, MigrationReport(), ""
     )
-    mock_self = Mock(spec=MappingFileMapperBase)
-    mock_self.record_map = {"data": [mapping_file_entry]}
+    mock_self = mock_mapper_with_mapping_plan({"data": [mapping_file_entry]})
     mock_self.mapped_from_legacy_data = {"title": "title"}
     mock_self.migration_report = MigrationReport()
     mock_self.library_configuration = Mock(spec=LibraryConfiguration)
@@ -4100,8 +4137,7 @@ def test_get_prop_concatenated():
         },
     ]
 
-    mock_self = Mock(spec=MappingFileMapperBase)
-    mock_self.record_map = {"data": mapping_file_entries}
+    mock_self = mock_mapper_with_mapping_plan({"data": mapping_file_entries})
     mock_self.mapped_from_legacy_data = {"title": ["firstname", "lastname"]}
     mock_self.migration_report = MigrationReport()
     mock_self.library_configuration = Mock(spec=LibraryConfiguration)
@@ -4154,6 +4190,29 @@ def test_get_legacy_value_regex():
     assert res == "leif"
 
 
+def test_invalid_regex_rule_halts_when_mapping_file_loads(mocked_folio_client):
+    schema = {"type": "object", "properties": {"title": {"type": "string"}}}
+    the_map = {
+        "data": [
+            {
+                "folio_field": "legacyIdentifier",
+                "legacy_field": "id",
+                "value": "",
+                "description": "",
+            },
+            {
+                "folio_field": "title",
+                "legacy_field": "title",
+                "value": "",
+                "description": "",
+                "rules": {"regexGetFirstMatchOrEmpty": "(.*@.*"},
+            },
+        ]
+    }
+    with pytest.raises(TransformationProcessError, match="regexGetFirstMatchOrEmpty"):
+        MyTestableFileMapper(schema, the_map, mocked_folio_client)
+
+
 def test_get_legacy_value_fallback_field():
     legacy_object = {"title": "", "alternative_title": "billy@leifochbilly.se"}
     mapping_file_entry = {
@@ -4210,6 +4269,85 @@ def test_get_prop(mocked_folio_client):
     assert res == "Alpha Omega"
 
 
+def test_mapping_plan_indexes_map_entries(mocked_folio_client):
+    schema = {}
+    the_map = {
+        "data": [
+            {
+                "folio_field": "legacyIdentifier",
+                "legacy_field": "id",
+                "value": "",
+                "description": "",
+            },
+            {"folio_field": "title", "legacy_field": "title", "value": "", "description": ""},
+            {
+                "folio_field": "title",
+                "legacy_field": "alternative_title",
+                "value": "",
+                "description": "",
+            },
+            {
+                "folio_field": "formerIds[0]",
+                "legacy_field": "former_id",
+                "value": "",
+                "description": "",
+            },
+        ]
+    }
+    mapper = MyTestableFileMapper(schema, the_map, mocked_folio_client)
+    assert mapper.legacy_basic_property("title") == "title"
+    assert mapper.legacy_basic_property("notMapped") == ""
+    map_entries = mapper.get_map_entries("title")
+    assert [e["legacy_field"] for e in map_entries] == ["title", "alternative_title"]
+    assert mapper.get_map_entries("title") is map_entries
+    assert mapper.get_folio_keys_starting_with("formerIds") == ["formerIds[0]"]
+    assert mapper.get_array_item_paths("formerIds[0") == {"formerIds[0]"}
+
+
+def test_do_map_skips_unmapped_schema_properties(mocked_folio_client):
+    schema = {
+        "type": "object",
+        "required": ["title"],
+        "properties": {
+            "id": {"type": "string"},
+            "title": {"type": "string"},
+            "formerIds": {"type": "array", "items": {"type": "string"}},
+            "status": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "circulationNotes": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"note": {"type": "string"}}},
+            },
+            "lastCheckIn": {"type": "object", "properties": {"dateTime": {"type": "string"}}},
+        },
+    }
+    the_map = {
+        "data": [
+            {
+                "folio_field": "legacyIdentifier",
+                "legacy_field": "id",
+                "value": "",
+                "description": "",
+            },
+            {"folio_field": "title", "legacy_field": "title", "value": "", "description": ""},
+            {
+                "folio_field": "formerIds[0]",
+                "legacy_field": "former_id",
+                "value": "",
+                "description": "",
+            },
+        ]
+    }
+    mapper = MyTestableFileMapper(schema, the_map, mocked_folio_client)
+    assert list(mapper.get_mapped_schema_properties()) == ["title", "formerIds"]
+    folio_rec, _ = mapper.do_map(
+        {"id": "1", "title": "Alpha", "former_id": "a1"}, "1", FOLIONamespaces.holdings
+    )
+    assert folio_rec["title"] == "Alpha"
+    assert folio_rec["formerIds"] == ["a1"]
+    assert "circulationNotes" not in folio_rec
+    assert "status" not in folio_rec
+
+
 def test_get_prop_one_value(mocked_folio_client):
     legacy_object = {"id": "1", "title": "Alpha", "alternative_title": "Omega"}
     schema = {}
@@ -4563,3 +4701,22 @@ def test_add_default_from_schema(mocked_folio_client: FolioClient):
     assert folio_recs[1]["compositePoLines"][0]["checkinItems"] is True
     assert folio_recs[1]["compositePoLines"][0]["receiptStatus"] == "Ongoing"
     assert folio_recs[1]["compositePoLines"][0]["cost"]["discountType"] == "amount"
+
+
+def test_get_legacy_value_caches_rule_results():
+    mapping_file_entry = {
+        "folio_field": "title",
+        "legacy_field": "title",
+        "value": "",
+        "description": "",
+        "rules": {"replaceValues": {"0": "Graduate", "a": "Alumni"}},
+    }
+    migration_report = MigrationReport()
+    value_cache: dict = {}
+    for _ in range(2):
+        res = MappingFileMapperBase.get_legacy_value(
+            {"title": "0"}, mapping_file_entry, migration_report, "", "", value_cache
+        )
+        assert res == "Graduate"
+    assert value_cache == {"0": ("Graduate", "Replaced 0 in title with Graduate")}
+    assert migration_report.report["FieldMappingDetails"]["Replaced 0 in title with Graduate"] == 2
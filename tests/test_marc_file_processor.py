@@ -1,3 +1,4 @@
+import io
 from unittest.mock import Mock
 
 import pytest
@@ -6,7 +7,9 @@ from pymarc import Record
 from pymarc import Subfield
 
 from folio_migration_tools.custom_exceptions import TransformationRecordFailedError
+from folio_migration_tools.library_configuration import FileDefinition
 from folio_migration_tools.marc_rules_transformation.marc_file_processor import (
+    ChunkRecorder,
     MarcFileProcessor,
 )
 from folio_migration_tools.marc_rules_transformation.rules_mapper_holdings import (
@@ -136,3 +139,94 @@ def test_add_mapped_location_code_to_record_no_852():
         first_852.delete_subfield("b")
         first_852.add_subfield("b", "new_loc", 0)
         assert record["852"].get_subfields("b")[0] == "new_loc"
+
+
+def test_merge_chunk_drops_records_with_used_legacy_ids():
+    mock_processor = Mock(spec=MarcFileProcessor)
+    mock_processor.mapper = Mock(spec=RulesMapperHoldings)
+    mock_processor.mapper.migration_report = MigrationReport()
+    mock_processor.mapper.id_map = {"a": ("a", "id_a")}
+    mock_processor.mapper.mapped_folio_fields = {"hrid": [1]}
+    mock_processor.mapper.mapped_legacy_fields = {}
+    mock_processor.mapper.parsed_records = 1
+    mock_processor.mapper.extradata_writer = Mock()
+    mock_processor.mapper.extradata_writer.cache = []
+    mock_processor.legacy_ids = {"a"}
+    mock_processor.records_count = 1
+    mock_processor.failed_records_count = 0
+    mock_processor.start = 0
+    mock_processor.get_hrid_counter.return_value = 2
+    mock_processor.created_objects_file = io.StringIO()
+    mock_processor.srs_records_file = io.StringIO()
+    chunk_report = MigrationReport()
+    chunk_report.add("GeneralStatistics", "Inventory records written to disk", 2)
+    chunk_result = {
+        "records": [
+            (
+                [("a", ("a", "id_a2"))],
+                "duplicate\n",
+                "duplicate srs\n",
+                [("GeneralStatistics", "Inventory records written to disk", 1)],
+                ["precedingSucceedingTitles\t{}\n"],
+            ),
+            (
+                [("b", ("b", "id_b"))],
+                "b\n",
+                "b srs\n",
+                [("GeneralStatistics", "Inventory records written to disk", 1)],
+                ["boundwithPart\t{}\n"],
+            ),
+        ],
+        "failed_marc_records": b"",
+        "extradata": [],
+        "migration_report": chunk_report,
+        "mapped_folio_fields": {"hrid": [2, 2], "id": [2]},
+        "mapped_legacy_fields": {},
+        "parsed_records": 2,
+        "records_count": 2,
+        "failed_records_count": 0,
+        "hrid_counter": 9,
+    }
+    MarcFileProcessor.merge_chunk(mock_processor, chunk_result, io.BytesIO())
+
+    assert mock_processor.created_objects_file.getvalue() == "b\n"
+    assert mock_processor.srs_records_file.getvalue() == "b srs\n"
+    assert mock_processor.mapper.id_map == {"a": ("a", "id_a"), "b": ("b", "id_b")}
+    assert mock_processor.failed_records_count == 1
+    assert (
+        mock_processor.mapper.migration_report.report["GeneralStatistics"][
+            "Inventory records written to disk"
+        ]
+        == 1
+    )
+    assert mock_processor.mapper.extradata_writer.cache == ["boundwithPart\t{}\n"]
+    assert mock_processor.mapper.mapped_folio_fields == {"hrid": [3, 2], "id": [2]}
+    mock_processor.set_hrid_counter.assert_called_with(9)
+
+
+def test_chunk_recorder_keeps_report_entries_and_extradata_per_record():
+    mock_processor = Mock(spec=MarcFileProcessor)
+    mock_processor.mapper = Mock(spec=RulesMapperHoldings)
+    mock_processor.mapper.migration_report = MigrationReport()
+    mock_processor.mapper.id_map = {}
+    mock_processor.mapper.extradata_writer = Mock()
+    mock_processor.mapper.extradata_writer.cache = []
+    mock_processor.created_objects_file = io.StringIO()
+    mock_processor.srs_records_file = io.StringIO()
+
+    def process_record(idx, marc_record, file_def):
+        mock_processor.mapper.id_map[str(idx)] = (str(idx), f"id_{idx}")
+        mock_processor.mapper.migration_report.add("GeneralStatistics", "Records")
+        mock_processor.mapper.extradata_writer.cache.append(f"extradata {idx}\n")
+
+    mock_processor.process_record.side_effect = process_record
+    recorder = ChunkRecorder(mock_processor)
+    recorder.process_record(1, Record(), FileDefinition(file_name=""))
+    recorder.process_record(2, Record(), FileDefinition(file_name=""))
+
+    assert [(r[0], r[3], r[4]) for r in recorder.records] == [
+        ([("1", ("1", "id_1"))], [("GeneralStatistics", "Records", 1)], ["extradata 1\n"]),
+        ([("2", ("2", "id_2"))], [("GeneralStatistics", "Records", 1)], ["extradata 2\n"]),
+    ]
+    assert mock_processor.mapper.extradata_writer.cache == []
+    assert mock_processor.mapper.migration_report.report["GeneralStatistics"]["Records"] == 2
@@ -0,0 +1,90 @@
+import io
+
+import pymarc
+from pymarc import MARCReader
+
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCJSONLinesReader,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    MARCXMLReader,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    RawMARCReader,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    map_marc_file,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    read_raw_records,
+)
+from folio_migration_tools.marc_rules_transformation.marc_reader_wrapper import (
+    split_marc_records,
+)
+
+
+def test_read_raw_records_splits_into_chunks():
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        data = marc_file.read()
+    chunks = list(read_raw_records(io.BytesIO(data), 3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+    assert b"".join(b"".join(chunk) for chunk in chunks) == data
+    assert all(record.endswith(b"\x1d") for chunk in chunks for record in chunk)
+
+
+def test_read_raw_records_memory_maps_files():
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        chunks = list(read_raw_records(marc_file, 5))
+    assert [len(chunk) for chunk in chunks] == [5, 3]
+
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        with map_marc_file(marc_file) as data:
+            assert data[:5].isdigit()
+    assert data.closed
+
+
+def test_split_marc_records_recovers_from_bad_record_length():
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        data = marc_file.read()
+    records = list(split_marc_records(data))
+    broken = b"99999" + records[1][5:]
+    split = list(split_marc_records(records[0] + broken + b"".join(records[2:]) + b"\n"))
+    assert split == [records[0], broken, *records[2:]]
+
+
+def test_raw_marc_reader_reads_like_marc_reader():
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        data = marc_file.read()
+    reader = MARCReader(io.BytesIO(data), to_unicode=True, permissive=True)
+    reader.hide_utf8_warnings = True
+    reader.force_utf8 = False
+    expected = [record.as_json() for record in reader]
+    raw_reader = RawMARCReader(split_marc_records(data))
+    assert [record.as_json() for record in raw_reader] == expected
+
+
+def test_raw_marc_reader_returns_none_for_bad_records():
+    reader = RawMARCReader([b"not a record\x1d"])
+    assert list(reader) == [None]
+    assert reader.current_chunk == b"not a record\x1d"
+    assert reader.current_exception
+
+
+def test_marcxml_reader_reads_like_parse_xml():
+    file_path = "./tests/test_data/mfhd/mfhd_test1.xml"
+    expected = [record.as_dict() for record in pymarc.parse_xml_to_array(file_path)]
+    with open(file_path, "rb") as xml_file:
+        assert [record.as_dict() for record in MARCXMLReader(xml_file)] == expected
+
+
+def test_marc_json_lines_reader():
+    with open("./tests/test_data/diacritics/diac_from_oclc.mrc", "rb") as marc_file:
+        records = list(MARCReader(marc_file, to_unicode=True, permissive=True))
+    lines = b"".join(record.as_json().encode("utf-8") + b"\n" for record in records)
+    reader = MARCJSONLinesReader(io.BytesIO(lines + b"\n" + b'{"fields": []}\n'))
+    read_records = list(reader)
+    assert [record.as_dict() for record in read_records[:-1]] == [
+        record.as_dict() for record in records
+    ]
+    assert read_records[-1] is None
+    assert reader.current_chunk == b'{"fields": []}\n'
@@ -1,8 +1,61 @@
 from dateutil import parser
 
+from folio_migration_tools.migration_report import MigrationReport
+
 
 def test_time_diff():
     start = parser.parse("2022-06-29T20:21:22")
     end = parser.parse("2022-06-30T21:22:23")
     nice_diff = str(end - start)
     assert nice_diff == "1 day, 1:01:01"
+
+
+def test_merge():
+    migration_report = MigrationReport()
+    migration_report.add("Details", "a", 2)
+    migration_report.set("GeneralStatistics", "Records processed", 10)
+    other_report = MigrationReport()
+    other_report.add("Details", "a")
+    other_report.add("Details", "b")
+    other_report.set("GeneralStatistics", "Records processed", 5)
+
+    migration_report.merge(other_report)
+
+    assert migration_report.report["Details"] == {"blurb_id": "Details", "a": 3, "b": 1}
+    assert migration_report.report["GeneralStatistics"]["Records processed"] == 15
+
+
+def test_replay_recording():
+    migration_report = MigrationReport()
+    migration_report.start_recording()
+    migration_report.add("GeneralStatistics", "Records", 2)
+    recording = migration_report.stop_recording()
+    migration_report.replay(recording)
+    assert recording == [("GeneralStatistics", "Records", 2)]
+    assert migration_report.report["GeneralStatistics"]["Records"] == 4
+    assert not migration_report.recordings
+
+
+def test_nested_recordings():
+    migration_report = MigrationReport()
+    migration_report.start_recording()
+    migration_report.add("GeneralStatistics", "Records")
+    migration_report.start_recording()
+    migration_report.add("Details", "a")
+    assert migration_report.stop_recording() == [("Details", "a", 1)]
+    assert migration_report.stop_recording() == [
+        ("GeneralStatistics", "Records", 1),
+        ("Details", "a", 1),
+    ]
+
+
+def test_discard_recording():
+    migration_report = MigrationReport()
+    migration_report.add("GeneralStatistics", "Records")
+    migration_report.start_recording()
+    migration_report.add("GeneralStatistics", "Records")
+    migration_report.add("Details", "a")
+    migration_report.discard(migration_report.stop_recording())
+    assert migration_report.report == {
+        "GeneralStatistics": {"blurb_id": "GeneralStatistics", "Records": 1}
+    }
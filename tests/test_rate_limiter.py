@@ -0,0 +1,107 @@
+import time
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from email.utils import format_datetime
+from unittest.mock import patch
+
+import httpx
+
+from folio_migration_tools.rate_limiter import RateLimiter
+from folio_migration_tools.rate_limiter import get_retry_after
+
+
+def make_response(status_code, headers=None, method="PUT"):
+    return httpx.Response(
+        status_code,
+        headers=headers or {},
+        request=httpx.Request(method, "https://okapi.example/item-storage/items"),
+    )
+
+
+def test_call_returns_first_good_response():
+    limiter = RateLimiter()
+    responses = iter([make_response(201), make_response(503)])
+    response = limiter.call(lambda url: next(responses), "url")
+    assert response.status_code == 201
+
+
+def test_call_retries_on_back_pressure():
+    limiter = RateLimiter(max_retries=3)
+    responses = iter(
+        [
+            make_response(429, {"Retry-After": "2"}),
+            make_response(503),
+            make_response(201),
+        ]
+    )
+    with patch("folio_migration_tools.rate_limiter.time.sleep") as mocked_sleep:
+        response = limiter.call(lambda: next(responses))
+    assert response.status_code == 201
+    delays = [c.args[0] for c in mocked_sleep.call_args_list]
+    assert delays[0] == 2
+    assert 1 <= delays[1] <= 2
+
+
+def test_call_gives_up_after_max_retries():
+    limiter = RateLimiter(max_retries=2)
+    calls = []
+
+    def send():
+        calls.append(1)
+        return make_response(504)
+
+    with patch("folio_migration_tools.rate_limiter.time.sleep"):
+        response = limiter.call(send)
+    assert response.status_code == 504
+    assert len(calls) == 3
+
+
+def test_call_does_not_retry_other_errors():
+    limiter = RateLimiter()
+    calls = []
+
+    def send():
+        calls.append(1)
+        return make_response(500)
+
+    assert limiter.call(send).status_code == 500
+    assert len(calls) == 1
+
+
+def test_call_retries_posts_only_when_throttled():
+    limiter = RateLimiter()
+    calls = []
+
+    def send(status_code):
+        calls.append(1)
+        return make_response(status_code, method="POST")
+
+    assert limiter.call(send, 504).status_code == 504
+    assert len(calls) == 1
+    with patch("folio_migration_tools.rate_limiter.time.sleep"):
+        responses = iter([make_response(429, method="POST"), make_response(201, method="POST")])
+        assert limiter.call(lambda: next(responses)).status_code == 201
+
+
+def test_get_delay_grows_exponentially():
+    limiter = RateLimiter(base_delay=1, max_delay=10)
+    response = make_response(503)
+    assert 4 <= limiter.get_delay(response, 3) <= 8
+    assert 5 <= limiter.get_delay(response, 10) <= 10
+
+
+def test_get_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+    response = make_response(503, {"Retry-After": format_datetime(retry_at, usegmt=True)})
+    assert 25 < get_retry_after(response) <= 30
+    assert get_retry_after(make_response(503, {"Retry-After": "soon"})) is None
+    assert get_retry_after(make_response(503)) is None
+
+
+def test_wait_for_token_spreads_requests():
+    limiter = RateLimiter(requests_per_second=50)
+    start = time.monotonic()
+    for _ in range(60):
+        limiter.wait_for_token()
+    assert time.monotonic() - start >= 0.15
@@ -26,6 +26,9 @@ def test_get_hybrid_mapping():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -41,6 +44,9 @@ def test_get_hybrid_mapping2():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[0]
 
@@ -56,6 +62,9 @@ def test_get_hybrid_mapping3_4():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -71,6 +80,9 @@ def test_get_hybrid_mapping3_5():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[2]
 
@@ -91,6 +103,9 @@ def test_get_hybrid_mapping_none():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res is None
 
@@ -106,6 +121,9 @@ def test_get_hybrid_mapping3():
     mock.hybrid_mappings = [{"location": "sprad", "loan_type": "* ", "material_type": "*"}]
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res is None
 
@@ -121,10 +139,60 @@ def test_normal_refdata_mapping_strip():
     mock.regular_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.regular_mappings_index = RefDataMapping.index_regular_mappings(
+        mock.regular_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_ref_data_mapping(mock, legacy_object)
     assert res == mappings[2]
 
 
+def test_normal_refdata_mapping_miss():
+    mappings = [
+        {"location": "l_1", "loan_type": "lt1", "material_type": "mt1"},
+        {"location": "l_1", "loan_type": "lt1", "material_type": "mt2"},
+        {"location": "l_1", "loan_type": "lt1", "material_type": "mt2"},
+    ]
+    mock = Mock(spec=RefDataMapping)
+    mock.regular_mappings = mappings
+    mock.cache = {}
+    mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.regular_mappings_index = RefDataMapping.index_regular_mappings(
+        mock.regular_mappings, mock.mapped_legacy_keys
+    )
+    legacy_object = {"location": "l_1", "loan_type": "lt1", "material_type": "mt2"}
+    assert RefDataMapping.get_ref_data_mapping(mock, legacy_object) is mappings[1]
+    legacy_object = {"location": "l_1", "loan_type": "lt2", "material_type": "mt2"}
+    assert RefDataMapping.get_ref_data_mapping(mock, legacy_object) is None
+    assert mock.cache == {}
+
+
+def test_get_hybrid_mapping_caches_misses():
+    mappings = [
+        {"location": "*", "loan_type": "lt_1", "material_type": "*"},
+        {"location": "l_1", "loan_type": "*", "material_type": "*"},
+        {"location": "*", "loan_type": "*", "material_type": "mt_1"},
+        {"location": "l_1", "loan_type": "*", "material_type": "mt_1"},
+    ]
+    mock = Mock(spec=RefDataMapping)
+    mock.hybrid_mappings = mappings
+    mock.cache = {}
+    mock.mapped_legacy_keys = ["location", "loan_type", "material_type"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
+    assert [len(level) for level in mock.hybrid_mapping_levels] == [1, 3]
+    legacy_object = {"location": "l_1", "loan_type": "lt_1", "material_type": "mt_1"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[3]
+    legacy_object = {"location": "l_2", "loan_type": "lt_1", "material_type": "mt_1"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[0]
+    legacy_object = {"location": "l_2", "loan_type": "lt_2", "material_type": "mt_2"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is None
+    assert mock.cache[("l_2", "lt_2", "mt_2")] is None
+    mock.hybrid_mapping_levels = []
+    legacy_object = {"location": "l_1", "loan_type": "lt_1", "material_type": "mt_1"}
+    assert RefDataMapping.get_hybrid_mapping(mock, legacy_object) is mappings[3]
+
+
 def test_mapping_for_multiple_fields():
     mappings = [
         {
@@ -161,6 +229,9 @@ def test_mapping_for_multiple_fields():
     mock.hybrid_mappings = mappings
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
     assert res == mappings[1]
 
@@ -230,11 +301,17 @@ def test_multiple_emails_array_objects_with_different_ref_data_mappings():
     mock.hybrid_mappings = mapping_a
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res_1 = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
 
     mock.hybrid_mappings = mapping_b
     mock.cache = {}
     mock.mapped_legacy_keys = ["email1_categories", "email2_categories"]
+    mock.hybrid_mapping_levels = RefDataMapping.index_hybrid_mappings(
+        mock.hybrid_mappings, mock.mapped_legacy_keys
+    )
     res_2 = RefDataMapping.get_hybrid_mapping(mock, legacy_object)
 
     assert res_1 == res_2
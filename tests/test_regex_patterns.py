@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+from folio_migration_tools import regex_patterns
+from folio_migration_tools.custom_exceptions import TransformationProcessError
+
+
+@pytest.mark.parametrize(
+    "pattern,value",
+    [
+        ("(.*)@.*", "leif@leifochbilly.se"),
+        ("(.*)@.*", "no at sign"),
+        (".*@.*", "leif@leifochbilly.se"),
+        (r".*, (\S+)|$", "Lastname, Firstname Middle"),
+        (r"(\w+), (\w+)", "Lastname, Firstname"),
+        (r"(\w+), (\w+)?", "Lastname, "),
+    ],
+)
+def test_first_match_or_empty_behaves_like_findall(pattern, value):
+    assert regex_patterns.first_match_or_empty(pattern, value) == (
+        re.findall(f"{pattern}|$", value)[0]
+    )
+
+
+def test_compile_pattern_is_reused():
+    assert regex_patterns.compile_pattern("^(.*)$") is regex_patterns.compile_pattern("^(.*)$")
+
+
+def test_compile_pattern_invalid():
+    with pytest.raises(TransformationProcessError):
+        regex_patterns.compile_pattern("(unclosed")
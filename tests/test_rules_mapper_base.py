@@ -1,5 +1,7 @@
 import datetime
 import json
+from collections import Counter
+from unittest.mock import Mock
 from uuid import uuid4
 
 import pytest
@@ -10,12 +12,16 @@ from pymarc.reader import MARCReader
 from pymarc.record import Field
 from pymarc.record import Record
 
+from folio_migration_tools.marc_rules_transformation.rules_mapper_base import (
+    MappingPlan,
+)
 from folio_migration_tools.marc_rules_transformation.rules_mapper_base import (
     RulesMapperBase,
 )
 from folio_migration_tools.marc_rules_transformation.rules_mapper_bibs import (
     BibsRulesMapper,
 )
+from folio_migration_tools.migration_report import MigrationReport
 
 # flake8: noqa: E501
 
@@ -211,3 +217,110 @@ def test_create_srs_uuid():
     assert str(created_id) == "6734f228-cba2-54c7-b129-c6437375a864"
     created_id_2 = RulesMapperBase.create_srs_id(FOLIONamespaces.instances, "some_url", "id_1")
     assert str(created_id) != str(created_id_2)
+
+
+def test_get_srs_string_matches_parsed_and_raw_content():
+    path = "./tests/test_data/diacritics/diac_from_oclc.mrc"
+    with open(path, "rb") as marc_file:
+        reader = MARCReader(marc_file, to_unicode=True, permissive=True)
+        reader.hide_utf8_warnings = True
+        records = 0
+        for record in reader:
+            records += 1
+            instance = {"id": str(uuid4()), "hrid": "my hrid"}
+            srs_id = str(uuid4())
+            srs_record_string = RulesMapperBase.get_srs_string(
+                record, instance, srs_id, {}, False, FOLIONamespaces.instances
+            )
+            my_tuple_json = record.as_json()
+            expected = {
+                "id": srs_id,
+                "deleted": False,
+                "matchedId": srs_id,
+                "generation": 0,
+                "recordType": "MARC_BIB",
+                "rawRecord": {"id": srs_id, "content": my_tuple_json},
+                "parsedRecord": {"id": srs_id, "content": json.loads(my_tuple_json)},
+                "additionalInfo": {"suppressDiscovery": False},
+                "externalIdsHolder": {"instanceId": instance["id"], "instanceHrid": "my hrid"},
+                "metadata": {},
+                "state": "ACTUAL",
+                "leaderRecordStatus": record.leader[5]
+                if record.leader[5] in [*"acdnposx"]
+                else "d",
+            }
+            assert srs_record_string == json.dumps(expected)
+    assert records == 8
+
+
+def test_get_srs_string_without_001():
+    record = Record()
+    record.add_field(
+        Field(tag="245", indicators=["0", "0"], subfields=[Subfield(code="a", value="Title")])
+    )
+    for record_type, id_holder in [
+        (FOLIONamespaces.instances, {"instanceId": "1", "instanceHrid": "in1"}),
+        (FOLIONamespaces.holdings, {"holdingsId": "1", "holdingsHrid": "in1"}),
+    ]:
+        srs_record = json.loads(
+            RulesMapperBase.get_srs_string(
+                record, {"id": "1", "hrid": "in1"}, "2", {}, False, record_type
+            )
+        )
+        assert srs_record["externalIdsHolder"] == id_holder
+        assert srs_record["parsedRecord"]["content"]["fields"] == [
+            {"245": {"ind1": "0", "ind2": "0", "subfields": [{"a": "Title"}]}}
+        ]
+
+
+def test_mapping_plan():
+    mapping = {
+        "target": "identifiers.value",
+        "subfield": ["a", "b", "c"],
+        "subFieldDelimiter": [
+            {"value": "--", "subfields": ["b", "c"]},
+            {"value": " ", "subfields": []},
+        ],
+        "rules": [{"conditions": [{"type": "trim_period, trim", "parameter": {"name": "ISBN"}}]}],
+    }
+    plan = MappingPlan(mapping)
+    assert plan.target_key == "value"
+    assert plan.has_conditions
+    assert not plan.has_value_to_add
+    assert plan.condition_types == ["trim_period", "trim"]
+    assert plan.parameter == {"name": "ISBN"}
+    assert plan.delimiter_groups == [("--", ["b", "c"]), (" ", [])]
+
+
+def test_mapping_plan_value_to_add():
+    plan = MappingPlan({"target": "discoverySuppress", "rules": [{"value": "false"}]})
+    assert plan.has_value_to_add
+    assert plan.value_to_add is False
+    assert not plan.delimiter_groups
+
+
+def test_report_marc_field_stats():
+    mock_mapper = Mock(spec=RulesMapperBase)
+    mock_mapper.marc_field_stats = Counter()
+    mock_mapper.migration_report = MigrationReport()
+    mock_mapper.get_authority_source_code = RulesMapperBase.get_authority_source_code
+    marc_field = Field(
+        tag="650",
+        indicators=[" ", "7"],
+        subfields=[
+            Subfield(code="a", value="Cats"),
+            Subfield(code="2", value="fast"),
+            Subfield(code="0", value="(OCoLC)fst00849059"),
+            Subfield(code="0", value="http://id.worldcat.org/fast/849059"),
+        ],
+    )
+    for _ in range(2):
+        mock_mapper.marc_field_stats[("650", "", "")] += 1
+        RulesMapperBase.report_source_and_links(mock_mapper, marc_field)
+    RulesMapperBase.report_marc_field_stats(mock_mapper)
+    report = mock_mapper.migration_report.report
+    assert report["Trivia"]["Total number of Tags processed"] == 2
+    assert report["AuthoritySources"]["Source of heading or term: fast"] == 2
+    assert report["AuthoritySources"]["$0 base uri or source code: OCoLC"] == 2
+    assert report["AuthoritySources"]["$0 base uri or source code: http://id.worldcat.org"] == 2
+    assert not mock_mapper.marc_field_stats